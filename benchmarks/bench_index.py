@@ -0,0 +1,106 @@
+# This program is Free Software see LICENSE file for details
+""" Widget selection over a cached playlist: item scan against the column index
+
+The movies of the synthetic library are turned into records, as cached by
+the service, and the widget items are picked for every method and
+unwatched / resume option:
+
+    scan     _selectItems() without index: _isCandidate() on every record,
+             then selection.top() / selection.sample()
+    array    resources/lib/index.py with the standard library only
+    numpy    resources/lib/index.py with NumPy, when it is installed
+
+Last widgets walk the recency index whatever the backend.
+
+Times are the best of --repeat runs, in milliseconds.  The index build time
+is printed once, it is paid when a playlist is read.  Then --added new items
+are added one at a time to the index (recency index insertion), against a
+build of a new index.
+
+Usage:
+    python benchmarks/bench_index.py [--size 100000] [--limit 10] [--repeat 5]
+                                     [--added 1000]
+"""
+
+import argparse
+import time
+from typing import Callable
+
+import harness  # noqa: F401  (kodistubs on sys.path)
+from fakelibrary import FakeLibrary
+
+import randomandlastitems as rali
+from resources.lib import index, records
+
+_OPTIONS = {'all': ('False', 'False'), 'unwatched': ('True', 'False'),
+            'resume': ('False', 'True'), 'both': ('True', 'True')}
+
+
+def _best(run: Callable[[], object], repeat: int) -> float:
+    """Gets the shortest time of run() in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--size', type=int, default=100000,
+                        help='movies in the playlist')
+    parser.add_argument('--limit', type=int, default=10, help='widget LIMIT')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per case')
+    parser.add_argument('--added', type=int, default=1000,
+                        help='new items added to the index')
+    args = parser.parse_args()
+
+    library = FakeLibrary(movies=args.size + args.added, episodes=0, songs=0,
+                          musicvideos=0)
+    movies = [records.Movie(movie, 'title') for movie in library.movies]
+    items, added = movies[:args.size], movies[args.size:]
+    del library
+    source = {'items': items}
+    rali._SOURCE_CACHE = None
+    rali._RALI_GLOBALS.update({'LIMIT': args.limit, 'REVERSE': False})
+
+    backends = {'array': None}
+    if index.numpy is not None:
+        backends['numpy'] = index.numpy
+    start = time.perf_counter()
+    item_index = index.ItemIndex(items)
+    print(f'{len(items)} items, index built in '
+          f'{(time.perf_counter() - start) * 1000:.1f} ms')
+    print(f'{"method":<9} {"filter":<10} {"scan ms":>8} '
+          + ' '.join(f'{name + " ms":>9}' for name in backends)
+          + f' {"speedup":>8}')
+    for method in ('Last', 'Playlist', 'Random'):
+        for name, (unwatched, resume) in _OPTIONS.items():
+            rali._RALI_GLOBALS.update({'METHOD': method, 'UNWATCHED': unwatched,
+                                       'RESUME': resume})
+            scan = _best(lambda: rali._selectItems(('movies', 'bench'), source),
+                         args.repeat)
+            times = []
+            for backend in backends.values():
+                index.numpy = backend
+                times.append(_best(lambda: item_index.select(
+                    method, args.limit, unwatched == 'True', resume == 'True'),
+                    args.repeat))
+            print(f'{method:<9} {name:<10} {scan:>8.2f} '
+                  + ' '.join(f'{elapsed:>9.3f}' for elapsed in times)
+                  + f' {scan / min(times):>7.0f}x')
+    index.numpy = backends.get('numpy')
+
+    start = time.perf_counter()
+    for item in added:
+        item_index.add(item)
+    elapsed = time.perf_counter() - start
+    rebuild = _best(lambda: index.ItemIndex(items + added), 1)
+    print(f'{len(added)} items added in {elapsed * 1000:.1f} ms '
+          f'({elapsed / max(1, len(added)) * 1e6:.1f} us each), '
+          f'index rebuild {rebuild:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# This program is Free Software see LICENSE file for details
+""" Memory per item: JSON dicts against the records kept by the service
+
+For every media type, lists a smart playlist of the synthetic library with
+the properties the script requests and measures the Python memory held per
+item as:
+
+    full    dicts of a library query with every widget property
+    light   dicts of the playlist listing (candidate properties only)
+    record  resources/lib/records.py records built from the listing
+
+Usage:
+    python benchmarks/bench_records.py [--size 10000]
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+from typing import Callable, List
+
+import harness
+from fakelibrary import FakeLibrary
+
+import randomandlastitems as rali
+from resources.lib import records
+
+# widget type: smart playlist type, library query, full properties, record
+_TYPES = {
+    'Movie': ('movies', 'VideoLibrary.GetMovies', 'movies',
+              rali._MOVIE_PROPERTIES, records.Movie),
+    'Episode': ('episodes', 'VideoLibrary.GetEpisodes', 'episodes',
+                rali._EPISODE_PROPERTIES, records.Episode),
+    'MusicVideo': ('musicvideos', 'VideoLibrary.GetMusicVideos', 'musicvideos',
+                   rali._MUSICVIDEO_PROPERTIES, records.MusicVideo),
+    'Album': ('albums', 'AudioLibrary.GetAlbums', 'albums',
+              rali._ALBUM_PROPERTIES, records.Album),
+    'Song': ('songs', 'AudioLibrary.GetSongs', 'songs',
+             rali._SONG_PROPERTIES, records.Song),
+}
+
+
+def _held(build: Callable[[], list]) -> int:
+    """Gets the bytes still allocated by what build() returns"""
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def _call(library: FakeLibrary, method: str, params: dict) -> str:
+    return library.execute(json.dumps({'jsonrpc': '2.0', 'id': 1,
+                                       'method': method, 'params': params}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--size', type=int, default=10000,
+                        help='movies, episodes and songs in the library')
+    args = parser.parse_args()
+
+    library = FakeLibrary(movies=args.size, episodes=args.size, songs=args.size,
+                          musicvideos=args.size)
+    library.playlists = harness.PLAYLISTS
+    print(f'{"type":<11} {"items":>7} {"full B":>8} {"light B":>8} {"record B":>8} '
+          f'{"saved":>6}')
+    for name, (kind, method, listkey, fields, record) in _TYPES.items():
+        playlist = harness.write_playlist(f'bench_{kind}', kind, '')
+        light = rali._CANDIDATE_PROPERTIES
+        if kind == 'episodes':
+            light += ('tvshowid', 'studio', 'mpaa')
+        full_text = _call(library, method, {'properties': list(fields)})
+        light_text = _call(library, 'Files.GetDirectory',
+                           {'directory': playlist, 'properties': list(light)})
+
+        def _records() -> List[records.Record]:
+            return [record(item) for item in json.loads(light_text)['result']['files']]
+
+        items = len(json.loads(light_text)['result']['files'])
+        if not items:
+            continue
+        full = _held(lambda: json.loads(full_text)['result'][listkey]) // items
+        dicts = _held(lambda: json.loads(light_text)['result']['files']) // items
+        compact = _held(_records) // items
+        print(f'{name:<11} {items:>7} {full:>8} {dicts:>8} {compact:>8} '
+              f'{1 - compact / dicts:>6.0%}')
+
+
+if __name__ == '__main__':
+    main()
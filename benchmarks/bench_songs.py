@@ -0,0 +1,39 @@
+# This program is Free Software see LICENSE file for details
+""" Song widget benchmark: JSON-RPC cost must not grow with the library size
+
+Runs RunScript(script.randomandlastitems,type=Music,...) against synthetic
+music libraries of growing size, using the Kodi stubs in kodistubs/.  The
+number of details calls must stay bounded by the widget LIMIT.
+
+Usage:
+    python benchmarks/bench_songs.py [songs ...]
+"""
+
+import sys
+
+import harness
+from fakelibrary import FakeLibrary
+
+LIMIT = 10
+SIZES = [1000, 10000, 50000]
+CASES = [['type=Music', f'limit={LIMIT}', 'method=Random'],
+         ['type=Music', f'limit={LIMIT}', 'method=Last']]
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f'{"songs":>8} {"method":<14} {"requests":>8} {"calls":>6} '
+          f'{"details":>7} {"KiB":>8} {"seconds":>8}')
+    for songs in sizes:
+        for case in CASES:
+            library = FakeLibrary(movies=0, episodes=0, songs=songs, musicvideos=0)
+            run = harness.run_script(library, case, memory=False)
+            details = run.methods.get('AudioLibrary.GetSongDetails', 0)
+            print(f'{songs:>8} {case[2]:<14} {run.requests:>8} '
+                  f'{run.calls:>6} {details:>7} '
+                  f'{run.bytes // 1024:>8} {run.seconds:>8.3f}')
+            assert details <= LIMIT, f'{details} song details read for LIMIT {LIMIT}'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# This program is Free Software see LICENSE file for details
+""" Widget benchmark: every TYPE x METHOD x unwatched/resume combination
+
+Runs RunScript(script.randomandlastitems,...) for the library widgets and
+the smart playlist widgets of every media type against synthetic libraries,
+using the Kodi stubs in kodistubs/.  For each run it reports the wall time,
+the executeJSONRPC round trips and JSON-RPC calls, the KiB of JSON parsed,
+the window property writes and the peak Python memory.
+
+Usage:
+    python benchmarks/bench_widgets.py [--sizes 1000,10000] [--latency 2]
+                                       [--only Movie] [--warm]
+                                       [--json results.json]
+"""
+
+import argparse
+import json
+from typing import List, Tuple
+
+import harness
+from fakelibrary import FakeLibrary
+
+LIMIT = 10
+SIZES = [1000, 10000]
+METHODS = ['Last', 'Random', 'Playlist']
+FILTERS = [[], ['unwatched=True'], ['resume=True'], ['unwatched=True', 'resume=True']]
+
+# widget name: arguments selecting the source, playlists are written on start
+_WIDGETS = {
+    'Movie': ['type=Movie'],
+    'MusicVideo': ['type=MusicVideo'],
+    'Episode': ['type=Episode'],
+    'Music': ['type=Music'],
+    'Movie.xsp': ('movies', '<rule field="genre" operator="is"><value>Action</value></rule>'),
+    'MusicVideo.xsp': ('musicvideos',
+                       '<rule field="year" operator="greaterthan"><value>1990</value></rule>'),
+    'Episode.xsp': ('episodes',
+                    '<rule field="genre" operator="isnot"><value>Documentary</value></rule>'),
+    'TvShow.xsp': ('tvshows',
+                   '<rule field="genre" operator="isnot"><value>Documentary</value></rule>'),
+    'Album.xsp': ('albums', '<rule field="genre" operator="is"><value>Comedy</value></rule>'),
+    'Song.xsp': ('songs', '<rule field="genre" operator="is"><value>Drama</value></rule>'),
+}
+
+
+def _widgets(only: List[str]) -> List[Tuple[str, List[str]]]:
+    """Gets the widget sources to run, writing the smart playlists
+
+    Args:
+        only (List[str]): widget names to keep, all if empty
+
+    Returns:
+        List[Tuple[str, List[str]]]: widget name and source arguments
+    """
+    widgets = []
+    for name, source in _WIDGETS.items():
+        if only and name not in only and name.split('.')[0] not in only:
+            continue
+        if isinstance(source, tuple):
+            kind, rules = source
+            path = harness.write_playlist(name.replace('.', '_'), kind, rules)
+            source = [f'playlist={path}']
+            if kind in ('albums', 'songs'):
+                source.insert(0, 'type=Music')
+        widgets.append((name, source))
+    return widgets
+
+
+def _library(size: int, latency: float) -> FakeLibrary:
+    """Builds a library with `size` movies, episodes and songs"""
+    return FakeLibrary(movies=size, episodes=size, songs=size,
+                       musicvideos=max(1, size // 10), latency=latency)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', default=','.join(str(size) for size in SIZES),
+                        help='comma separated library sizes')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='milliseconds per executeJSONRPC call')
+    parser.add_argument('--only', action='append', default=[],
+                        help='widget to run (Movie, Episode.xsp, ...), repeatable')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='do not trace memory, tracing slows the runs down')
+    parser.add_argument('--warm', action='store_true',
+                        help='import the script once and call run() for every widget')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    results = []
+    print(f'{"size":>7} {"widget":<15} {"method":<8} {"filter":<17} {"requests":>8} '
+          f'{"calls":>6} {"KiB":>8} {"writes":>6} {"peak KiB":>8} {"seconds":>8}')
+    widgets = _widgets(args.only)
+    for size in [int(size) for size in args.sizes.split(',')]:
+        library = _library(size, args.latency / 1000.0)
+        for name, source in widgets:
+            for method in METHODS:
+                for flags in FILTERS:
+                    argv = source + [f'limit={LIMIT}', f'method={method}'] + flags
+                    run = harness.run_script(library, argv, memory=not args.no_memory,
+                                             warm=args.warm)
+                    label = ','.join(flag.split('=')[0] for flag in flags) or '-'
+                    print(f'{size:>7} {name:<15} {method:<8} {label:<17} {run.requests:>8} '
+                          f'{run.calls:>6} {run.bytes // 1024:>8} {run.writes:>6} '
+                          f'{run.peak // 1024:>8} {run.seconds:>8.3f}')
+                    results.append({'size': size, 'widget': name, 'argv': argv,
+                                    **run.as_dict()})
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,414 @@
+# This program is Free Software see LICENSE file for details
+"""Synthetic Kodi library served through a fake JSON-RPC endpoint
+
+Only the parts of the Kodi JSON-RPC API used by the script are implemented:
+Files.GetDirectory, the VideoLibrary / AudioLibrary getters (with filter,
+sort and limits), JSONRPC.Version and JSON-RPC 2.0 batch arrays.
+"""
+
+import json
+import random
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional
+
+_GENRES = ['Action', 'Comedy', 'Drama', 'Horror', 'Family', 'Documentary',
+           'Sci-Fi', 'Thriller', 'Animation', 'Romance']
+_STUDIOS = ['Studio A', 'Studio B', 'Studio C', 'Studio D']
+_MPAA = ['Rated G', 'Rated PG', 'Rated PG-13', 'Rated R']
+
+
+def _date(rng: random.Random) -> str:
+    return '%04d-%02d-%02d %02d:%02d:%02d' % (
+        rng.randint(2010, 2023), rng.randint(1, 12), rng.randint(1, 28),
+        rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59))
+
+
+def _resume(rng: random.Random, runtime: int) -> dict:
+    if rng.random() < 0.05:
+        return {'position': float(rng.randint(60, runtime - 1)), 'total': float(runtime)}
+    return {'position': 0.0, 'total': 0.0}
+
+
+def _streamdetails(rng: random.Random, runtime: int) -> dict:
+    width, height = rng.choice([(720, 480), (1280, 720), (1920, 1080), (3840, 2160)])
+    return {'audio': [{'channels': rng.choice([2, 6, 8]), 'codec': rng.choice(['ac3', 'dts', 'aac']),
+                       'language': 'eng'}],
+            'subtitle': [{'language': 'eng'}],
+            'video': [{'aspect': round(width / height, 4), 'codec': rng.choice(['h264', 'hevc']),
+                       'duration': runtime, 'height': height, 'width': width,
+                       'hdrtype': '', 'language': 'eng', 'stereomode': ''}]}
+
+
+def _art(rng: random.Random, kind: str, dbid: int) -> dict:
+    base = f'image://{kind}/{dbid}'
+    return {key: f'{base}/{key}.jpg' for key in
+            ('poster', 'fanart', 'clearlogo', 'clearart', 'landscape', 'banner', 'thumb')}
+
+
+class FakeLibrary:
+    """Builds a deterministic synthetic library and answers JSON-RPC requests
+
+    Args:
+        movies (int): number of movies
+        episodes (int): number of episodes (spread over tvshows)
+        songs (int): number of songs (spread over albums and artists)
+        musicvideos (int): number of music videos
+        latency (float): seconds slept for every executeJSONRPC call
+        group_sets (bool): movie titles node returns sets as directories
+        api (tuple): JSON-RPC version reported by JSONRPC.Version
+        seed (int): random seed for the generated data
+    """
+
+    def __init__(self, movies: int = 1000, episodes: int = 10000, songs: int = 10000,
+                 musicvideos: int = 500, latency: float = 0.0, group_sets: bool = True,
+                 api: tuple = (13, 0, 0), seed: int = 1) -> None:
+        self.latency = latency
+        self.group_sets = group_sets
+        self.api = api
+        # executeJSONRPC() round-trips and JSON-RPC calls served, as counted
+        # by resources/lib/jsonrpc.py
+        self.requests = 0
+        self.calls = 0
+        self.bytes = 0
+        self.methods: Dict[str, int] = {}
+        self.playlists: Dict[str, str] = {}
+        rng = random.Random(seed)
+        self.movies = [self._movie(rng, i + 1) for i in range(movies)]
+        self.sets = {}
+        for movie in self.movies:
+            if movie['setid']:
+                self.sets.setdefault(movie['setid'], []).append(movie)
+        tvshows = max(1, episodes // 50)
+        self.tvshows = [{'tvshowid': i + 1, 'title': f'Show {i + 1}', 'label': f'Show {i + 1}',
+                         'mpaa': rng.choice(_MPAA), 'studio': [rng.choice(_STUDIOS)],
+                         'genre': [rng.choice(_GENRES)], 'year': rng.randint(1990, 2023),
+                         'art': _art(rng, 'tvshow', i + 1)} for i in range(tvshows)]
+        self.episodes = [self._episode(rng, i + 1, self.tvshows[i % tvshows])
+                         for i in range(episodes)]
+        self.musicvideos = [self._musicvideo(rng, i + 1) for i in range(musicvideos)]
+        artists = max(1, songs // 100)
+        albums = max(1, songs // 10)
+        self.artists = [{'artistid': i + 1, 'artist': f'Artist {i + 1}', 'label': f'Artist {i + 1}'} for i in range(artists)]
+        self.albums = [self._album(rng, i + 1, self.artists[i % artists]) for i in range(albums)]
+        self.songs = [self._song(rng, i + 1, self.albums[i % albums]) for i in range(songs)]
+
+    # -- data generation --------------------------------------------------
+
+    def _movie(self, rng: random.Random, dbid: int) -> dict:
+        runtime = rng.randint(4800, 9000)
+        playcount = rng.choice([0, 0, 0, 1, 2])
+        return {'movieid': dbid, 'label': f'Movie {dbid}', 'title': f'Movie {dbid}',
+                'originaltitle': f'Original Movie {dbid}', 'playcount': playcount,
+                'year': rng.randint(1950, 2023), 'genre': rng.sample(_GENRES, 2),
+                'studio': [rng.choice(_STUDIOS)], 'country': ['USA'],
+                'tagline': 'A tagline ' * 3, 'plot': 'A long plot. ' * 40,
+                'runtime': runtime, 'file': f'/media/movies/Movie {dbid}/movie{dbid}.mkv',
+                'plotoutline': 'Outline ' * 10, 'lastplayed': '', 'trailer': '',
+                'rating': round(rng.uniform(1, 10), 6), 'userrating': rng.randint(0, 10),
+                'resume': _resume(rng, runtime), 'art': _art(rng, 'movie', dbid),
+                'streamdetails': _streamdetails(rng, runtime), 'mpaa': rng.choice(_MPAA),
+                'director': [f'Director {dbid % 97}'], 'dateadded': _date(rng),
+                'tag': [], 'setid': (dbid % 40) + 1 if rng.random() < 0.15 else 0,
+                'type': 'movie'}
+
+    def _episode(self, rng: random.Random, dbid: int, show: dict) -> dict:
+        runtime = rng.randint(1200, 3600)
+        return {'episodeid': dbid, 'label': f'Episode {dbid}', 'title': f'Episode {dbid}',
+                'playcount': rng.choice([0, 0, 1]), 'season': (dbid // 12) % 8 + 1,
+                'episode': dbid % 12 + 1, 'showtitle': show['title'],
+                'plot': 'An episode plot. ' * 20,
+                'file': f'/media/tv/{show["title"]}/e{dbid}.mkv',
+                'rating': round(rng.uniform(1, 10), 6), 'userrating': rng.randint(0, 10),
+                'resume': _resume(rng, runtime), 'runtime': runtime,
+                'tvshowid': show['tvshowid'], 'art': {
+                    'thumb': f'image://episode/{dbid}.jpg',
+                    **{f'tvshow.{k}': v for k, v in show['art'].items()}},
+                'streamdetails': _streamdetails(rng, runtime),
+                'firstaired': _date(rng)[:10], 'dateadded': _date(rng),
+                'genre': show['genre'], 'type': 'episode'}
+
+    def _musicvideo(self, rng: random.Random, dbid: int) -> dict:
+        runtime = rng.randint(150, 400)
+        return {'musicvideoid': dbid, 'label': f'Clip {dbid}', 'title': f'Clip {dbid}',
+                'playcount': rng.choice([0, 1]), 'year': rng.randint(1970, 2023),
+                'genre': [rng.choice(_GENRES)], 'studio': [rng.choice(_STUDIOS)],
+                'album': f'Album {dbid % 50}', 'artist': [f'Artist {dbid % 30}'],
+                'track': dbid % 12, 'plot': 'Clip plot. ' * 10, 'tag': ['live'],
+                'rating': round(rng.uniform(1, 10), 6), 'userrating': rng.randint(0, 10),
+                'runtime': runtime, 'file': f'/media/clips/clip{dbid}.mkv',
+                'lastplayed': '', 'resume': _resume(rng, runtime),
+                'art': _art(rng, 'musicvideo', dbid),
+                'streamdetails': _streamdetails(rng, runtime),
+                'director': [f'Director {dbid % 13}'], 'dateadded': _date(rng),
+                'type': 'musicvideo'}
+
+    def _album(self, rng: random.Random, dbid: int, artist: dict) -> dict:
+        return {'albumid': dbid, 'label': f'Album {dbid}', 'title': f'Album {dbid}',
+                'description': 'Album review. ' * 20, 'albumlabel': 'Label',
+                'theme': [], 'mood': ['Calm'], 'style': ['Pop'], 'type': 'album',
+                'artist': [artist['artist']], 'artistid': [artist['artistid']],
+                'genre': [rng.choice(_GENRES)], 'year': rng.randint(1960, 2023),
+                'thumbnail': f'image://album/{dbid}.jpg',
+                'fanart': f'image://album/{dbid}/fanart.jpg',
+                'rating': round(rng.uniform(1, 10), 6), 'userrating': rng.randint(0, 10),
+                'playcount': rng.choice([0, 1]), 'dateadded': _date(rng)}
+
+    def _song(self, rng: random.Random, dbid: int, album: dict) -> dict:
+        return {'songid': dbid, 'label': f'Song {dbid}', 'title': f'Song {dbid}',
+                'artist': album['artist'], 'artistid': album['artistid'],
+                'dateadded': _date(rng), 'genre': album['genre'], 'year': album['year'],
+                'rating': round(rng.uniform(1, 10), 6), 'album': album['title'],
+                'albumid': album['albumid'], 'track': dbid % 14 + 1,
+                'duration': rng.randint(120, 420), 'comment': 'Comment',
+                'thumbnail': album['thumbnail'], 'fanart': album['fanart'],
+                'userrating': rng.randint(0, 10), 'playcount': rng.choice([0, 1]),
+                'file': f'/media/music/{album["title"]}/song{dbid}.flac', 'type': 'song'}
+
+    # -- transport ---------------------------------------------------------
+
+    def execute(self, request: str) -> str:
+        """Entry point used by the stub xbmc.executeJSONRPC"""
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        payload = json.loads(request)
+        if isinstance(payload, list):
+            response: Any = [self._dispatch(req) for req in payload]
+        else:
+            response = self._dispatch(payload)
+        text = json.dumps(response)
+        self.bytes += len(text)
+        return text
+
+    def _dispatch(self, req: dict) -> dict:
+        self.calls += 1
+        method = req.get('method', '')
+        self.methods[method] = self.methods.get(method, 0) + 1
+        handler = getattr(self, '_' + method.replace('.', '_'), None)
+        if handler is None:
+            return {'id': req.get('id'), 'jsonrpc': '2.0',
+                    'error': {'code': -32601, 'message': 'Method not found.'}}
+        return {'id': req.get('id'), 'jsonrpc': '2.0',
+                'result': handler(req.get('params') or {})}
+
+    # -- helpers -------------------------------------------------------------
+
+    @staticmethod
+    def _project(item: dict, idkey: str, properties: List[str]) -> dict:
+        out = {idkey: item[idkey], 'label': item['label']}
+        for prop in properties:
+            if prop in item:
+                out[prop] = item[prop]
+        return out
+
+    @staticmethod
+    def _value(item: dict, field: str) -> Any:
+        if field == 'inprogress':
+            return item.get('resume', {}).get('position', 0) > 0
+        if field == 'tvshow':
+            return item.get('showtitle', '')
+        if field == 'hastrailer':
+            return item.get('trailer', '')
+        if field == 'set':
+            return f'Set {item["setid"]}' if item.get('setid') else ''
+        return item.get(field, '')
+
+    def _match(self, item: dict, rule: Optional[dict]) -> bool:
+        if not rule:
+            return True
+        if 'and' in rule:
+            return all(self._match(item, sub) for sub in rule['and'])
+        if 'or' in rule:
+            return any(self._match(item, sub) for sub in rule['or'])
+        for key in ('albumid', 'artistid', 'genreid', 'setid', 'tvshowid'):
+            if key in rule:
+                value = item.get(key)
+                return rule[key] in value if isinstance(value, list) else value == rule[key]
+        value = self._value(item, rule['field'])
+        operator = rule['operator']
+        expected = rule.get('value', '')
+        values = expected if isinstance(expected, list) else [expected]
+        if operator == 'true':
+            return bool(value)
+        if operator == 'false':
+            return not value
+        texts = [str(v).lower() for v in (value if isinstance(value, list) else [value])]
+        wanted = [str(v).lower() for v in values]
+        if operator == 'is':
+            return any(t == w for t in texts for w in wanted)
+        if operator == 'isnot':
+            return not any(t == w for t in texts for w in wanted)
+        if operator == 'contains':
+            return any(w in t for t in texts for w in wanted)
+        if operator == 'doesnotcontain':
+            return not any(w in t for t in texts for w in wanted)
+        if operator == 'startswith':
+            return any(t.startswith(w) for t in texts for w in wanted)
+        if operator in ('greaterthan', 'lessthan', 'after', 'before', 'inthelast'):
+            try:
+                left, right = float(value), float(values[0])
+            except (TypeError, ValueError):
+                left, right = str(value), str(values[0])
+            if operator in ('greaterthan', 'after'):
+                return left > right
+            return left < right
+        return False
+
+    @staticmethod
+    def _sort_key(method: str):
+        if method == 'playcount':
+            return lambda item: item.get('playcount', 0)
+        if method in ('rating', 'userrating', 'year', 'episode', 'season', 'track'):
+            return lambda item: item.get(method) or 0
+        if method in ('title', 'label', 'sorttitle'):
+            return lambda item: str(item.get('title', item.get('label', ''))).lower()
+        return lambda item: str(item.get(method, ''))
+
+    def _select(self, items: List[dict], params: dict,
+                extra: Optional[dict] = None) -> tuple:
+        items = [item for item in items if self._match(item, params.get('filter'))]
+        for key, value in (extra or {}).items():
+            items = [item for item in items if item.get(key) == value]
+        sort = params.get('sort') or {}
+        method = sort.get('method', 'none')
+        if method == 'random':
+            items = list(items)
+            random.shuffle(items)
+        elif method != 'none':
+            items = sorted(items, key=self._sort_key(method),
+                           reverse=sort.get('order') == 'descending')
+        total = len(items)
+        limits = params.get('limits') or {}
+        start = limits.get('start', 0)
+        end = limits.get('end', -1)
+        end = total if end is None or end <= 0 or end > total else end
+        return items[start:end], {'start': start, 'end': end, 'total': total}
+
+    def _list(self, items: List[dict], params: dict, idkey: str,
+              listkey: str, extra: Optional[dict] = None) -> dict:
+        rows, limits = self._select(items, params, extra)
+        properties = params.get('properties', [])
+        return {listkey: [self._project(item, idkey, properties) for item in rows],
+                'limits': limits}
+
+    # -- JSON-RPC methods ----------------------------------------------------
+
+    def _JSONRPC_Version(self, params: dict) -> dict:
+        major, minor, patch = self.api
+        return {'version': {'major': major, 'minor': minor, 'patch': patch}}
+
+    def _JSONRPC_NotifyAll(self, params: dict) -> str:
+        return 'OK'
+
+    def _Player_Open(self, params: dict) -> str:
+        return 'OK'
+
+    def _VideoLibrary_GetMovies(self, params: dict) -> dict:
+        return self._list(self.movies, params, 'movieid', 'movies')
+
+    def _VideoLibrary_GetMovieSets(self, params: dict) -> dict:
+        sets = [{'setid': setid, 'label': f'Set {setid}', 'title': f'Set {setid}'}
+                for setid in sorted(self.sets)]
+        return self._list(sets, params, 'setid', 'sets')
+
+    def _VideoLibrary_GetEpisodes(self, params: dict) -> dict:
+        extra = {'tvshowid': params['tvshowid']} if 'tvshowid' in params else None
+        return self._list(self.episodes, params, 'episodeid', 'episodes', extra)
+
+    def _VideoLibrary_GetTVShows(self, params: dict) -> dict:
+        return self._list(self.tvshows, params, 'tvshowid', 'tvshows')
+
+    def _VideoLibrary_GetMusicVideos(self, params: dict) -> dict:
+        return self._list(self.musicvideos, params, 'musicvideoid', 'musicvideos')
+
+    def _details(self, items: List[dict], idkey: str, params: dict, key: str) -> dict:
+        dbid = params[idkey]
+        if 0 < dbid <= len(items):
+            return {key: self._project(items[dbid - 1], idkey, params.get('properties', []))}
+        return {}
+
+    def _VideoLibrary_GetMovieDetails(self, params: dict) -> dict:
+        return self._details(self.movies, 'movieid', params, 'moviedetails')
+
+    def _VideoLibrary_GetEpisodeDetails(self, params: dict) -> dict:
+        return self._details(self.episodes, 'episodeid', params, 'episodedetails')
+
+    def _VideoLibrary_GetMusicVideoDetails(self, params: dict) -> dict:
+        return self._details(self.musicvideos, 'musicvideoid', params, 'musicvideodetails')
+
+    def _AudioLibrary_GetArtists(self, params: dict) -> dict:
+        return self._list(self.artists, params, 'artistid', 'artists')
+
+    def _AudioLibrary_GetAlbums(self, params: dict) -> dict:
+        return self._list(self.albums, params, 'albumid', 'albums')
+
+    def _AudioLibrary_GetSongs(self, params: dict) -> dict:
+        return self._list(self.songs, params, 'songid', 'songs')
+
+    def _AudioLibrary_GetAlbumDetails(self, params: dict) -> dict:
+        return self._details(self.albums, 'albumid', params, 'albumdetails')
+
+    def _AudioLibrary_GetSongDetails(self, params: dict) -> dict:
+        return self._details(self.songs, 'songid', params, 'songdetails')
+
+    def _Files_GetDirectory(self, params: dict) -> dict:
+        directory = params['directory']
+        if directory.endswith('.xsp'):
+            return self._playlist(directory, params)
+        if directory.startswith('videodb://movies/titles'):
+            if self.group_sets:
+                entries = [movie for movie in self.movies if not movie['setid']]
+                entries += [{'id': setid, 'label': f'Set {setid}', 'title': f'Set {setid}',
+                             'type': 'set', 'filetype': 'directory',
+                             'file': f'videodb://movies/sets/{setid}/?setid={setid}',
+                             'dateadded': '', 'playcount': 0}
+                            for setid in sorted(self.sets)]
+                return self._files(entries, params, 'movieid')
+            return self._files(self.movies, params, 'movieid')
+        if directory.startswith('videodb://movies/sets/'):
+            setid = int(directory[len('videodb://movies/sets/'):].split('/')[0])
+            return self._files(self.sets.get(setid, []), params, 'movieid')
+        if directory.startswith('videodb://tvshows/titles'):
+            return self._files(self.tvshows, params, 'tvshowid', 'tvshow')
+        if 'musicvideos' in directory:
+            return self._files(self.musicvideos, params, 'musicvideoid')
+        if directory.startswith('musicdb://songs'):
+            return self._files(self.songs, params, 'songid')
+        if directory.startswith('musicdb://albums'):
+            return self._files(self.albums, params, 'albumid', 'album')
+        return {'files': [], 'limits': {'start': 0, 'end': 0, 'total': 0}}
+
+    def _files(self, items: List[dict], params: dict, idkey: str,
+               itemtype: Optional[str] = None) -> dict:
+        rows, limits = self._select(items, params)
+        properties = params.get('properties', [])
+        files = []
+        for row in rows:
+            entry = {prop: row[prop] for prop in properties if prop in row}
+            entry['id'] = row.get(idkey, row.get('id'))
+            entry['label'] = row['label']
+            entry['type'] = itemtype or row.get('type', 'unknown')
+            entry['filetype'] = row.get('filetype', 'file')
+            entry['file'] = row.get('file', '')
+            files.append(entry)
+        return {'files': files, 'limits': limits}
+
+    def _playlist(self, directory: str, params: dict) -> dict:
+        path = self.playlists.get(directory, directory)
+        root = ET.parse(path).getroot()
+        kind = root.get('type')
+        match = root.findtext('match', 'all')
+        rules = [{'field': rule.get('field'), 'operator': rule.get('operator'),
+                  'value': [value.text or '' for value in rule.findall('value')]}
+                 for rule in root.findall('rule')]
+        source, idkey, itemtype = {
+            'movies': (self.movies, 'movieid', None),
+            'episodes': (self.episodes, 'episodeid', None),
+            'tvshows': (self.tvshows, 'tvshowid', 'tvshow'),
+            'musicvideos': (self.musicvideos, 'musicvideoid', None),
+            'songs': (self.songs, 'songid', None),
+            'albums': (self.albums, 'albumid', 'album')}.get(kind, ([], 'id', None))
+        combined = {('or' if match == 'one' else 'and'): rules} if rules else None
+        items = [item for item in source if self._match(item, combined)]
+        return self._files(items, params, idkey, itemtype)
@@ -0,0 +1,122 @@
+# This program is Free Software see LICENSE file for details
+""" Runs the script against the Kodi stubs and measures one run
+
+Importing this module puts kodistubs/ in front of sys.path, so the script
+and the benchmarks import the stub xbmc, xbmcgui, xbmcvfs and xbmcaddon
+modules.  A run measures what RunScript() costs Kodi: wall time, JSON-RPC
+round trips and calls, bytes of JSON parsed by the script, window property
+writes and peak Python memory.  A warm run reuses the imported module, as
+the service or another add-on calling randomandlastitems.run() would.
+"""
+
+import importlib
+import os
+import runpy
+import sys
+import time
+import tracemalloc
+from typing import List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path[:0] = [os.path.join(HERE, 'kodistubs'), HERE, ROOT]
+
+import xbmc  # noqa: E402  (stub)
+import xbmcgui  # noqa: E402  (stub)
+import xbmcvfs  # noqa: E402  (stub)
+from fakelibrary import FakeLibrary  # noqa: E402
+
+# special:// paths of the playlists written by write_playlist()
+PLAYLISTS = {}
+
+
+class Measurement:
+    """Cost of one script run
+
+    Args:
+        library (FakeLibrary): library the script ran against
+        seconds (float): wall time
+        peak (int): peak traced memory in bytes
+    """
+
+    def __init__(self, library: FakeLibrary, seconds: float, peak: int) -> None:
+        self.seconds = seconds
+        self.requests = library.requests
+        self.calls = library.calls
+        self.bytes = library.bytes
+        self.methods = dict(library.methods)
+        self.writes = xbmcgui.COUNTERS['set'] + xbmcgui.COUNTERS['clear']
+        self.peak = peak
+
+    def as_dict(self) -> dict:
+        return {'seconds': round(self.seconds, 4), 'requests': self.requests,
+                'calls': self.calls, 'bytes': self.bytes, 'writes': self.writes,
+                'peak': self.peak, 'methods': self.methods}
+
+
+def write_playlist(name: str, kind: str, rules: str, match: str = 'all') -> str:
+    """Writes a smart playlist into the stub profile
+
+    Args:
+        name (str): playlist name, also used for the file name
+        kind (str): smart playlist type (movies, episodes, songs, ...)
+        rules (str): <rule> elements
+        match (str): all or one
+
+    Returns:
+        str: special:// path of the playlist
+    """
+    path = f'special://profile/playlists/{name}.xsp'
+    xbmcvfs.mkdirs('special://profile/playlists/')
+    PLAYLISTS[path] = xbmcvfs.translatePath(path)
+    with open(PLAYLISTS[path], 'w', encoding='utf-8') as playlist:
+        playlist.write('<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>\n'
+                       f'<smartplaylist type="{kind}">\n'
+                       f'    <name>{name}</name>\n'
+                       f'    <match>{match}</match>\n'
+                       f'    {rules}\n'
+                       '</smartplaylist>\n')
+    return path
+
+
+def run_script(library: FakeLibrary, argv: List[str], memory: bool = True,
+               warm: bool = False) -> Measurement:
+    """Runs the script once as RunScript() would
+
+    Args:
+        library (FakeLibrary): library served by the stub executeJSONRPC
+        argv (List[str]): script arguments, without the script name
+        memory (bool): trace memory allocations (slows the run down)
+        warm (bool): call run() of the already imported module, keeping the
+            window properties of the previous runs
+
+    Returns:
+        Measurement: cost of the run
+    """
+    if not warm:
+        for name in [name for name in sys.modules
+                     if name == 'randomandlastitems' or name.startswith('resources')]:
+            del sys.modules[name]
+        xbmcgui._PROPERTIES.clear()
+    xbmc.LIBRARY = library
+    library.calls = library.requests = library.bytes = 0
+    library.methods = {}
+    for counter in xbmcgui.COUNTERS:
+        xbmcgui.COUNTERS[counter] = 0
+    library.playlists = PLAYLISTS
+    sys.argv = ['randomandlastitems.py'] + argv
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        if warm:
+            importlib.import_module('randomandlastitems').run(sys.argv)
+        else:
+            runpy.run_path(os.path.join(ROOT, 'randomandlastitems.py'), run_name='__main__')
+    finally:
+        seconds = time.perf_counter() - start
+        peak = 0
+        if memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return Measurement(library, seconds, peak)
@@ -0,0 +1,54 @@
+# This program is Free Software see LICENSE file for details
+"""Stub of Kodi's xbmc module backed by a FakeLibrary"""
+
+import time
+
+LOGDEBUG = 0
+LOGINFO = 1
+LOGWARNING = 2
+LOGERROR = 3
+
+LIBRARY = None
+LOG = []
+BUILTINS = []
+INFOLABELS = {'System.BuildVersion': '21.0 (21.0.0) Git:stub'}
+
+
+def log(msg, level=LOGDEBUG):
+    LOG.append(msg)
+
+
+def executeJSONRPC(request):
+    return LIBRARY.execute(request)
+
+
+def executebuiltin(function, wait=False):
+    BUILTINS.append(function)
+
+
+def getInfoLabel(label):
+    return INFOLABELS.get(label, '')
+
+
+def getCondVisibility(condition):
+    return False
+
+
+def sleep(ms):
+    time.sleep(ms / 1000.0)
+
+
+class Monitor:
+    def __init__(self):
+        pass
+
+    def abortRequested(self):
+        return False
+
+    def waitForAbort(self, timeout=0):
+        if timeout:
+            time.sleep(min(timeout, 0.01))
+        return False
+
+    def onNotification(self, sender, method, data):
+        pass
@@ -0,0 +1,14 @@
+# This program is Free Software see LICENSE file for details
+"""Stub of Kodi's xbmcaddon module"""
+
+INFO = {'id': 'script.randomandlastitems', 'name': 'Random and Last items script',
+        'version': '3.1.0', 'profile': 'special://profile/addon_data/script.randomandlastitems/',
+        'path': ''}
+
+
+class Addon:
+    def __init__(self, addon_id=None):
+        pass
+
+    def getAddonInfo(self, key):
+        return INFO.get(key, '')
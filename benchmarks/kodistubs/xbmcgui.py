@@ -0,0 +1,22 @@
+# This program is Free Software see LICENSE file for details
+"""Stub of Kodi's xbmcgui module: window properties kept in dicts"""
+
+_PROPERTIES = {}
+COUNTERS = {'set': 0, 'clear': 0, 'get': 0}
+
+
+class Window:
+    def __init__(self, window_id=10000):
+        self._props = _PROPERTIES.setdefault(window_id, {})
+
+    def setProperty(self, key, value):
+        COUNTERS['set'] += 1
+        self._props[key.lower()] = value
+
+    def getProperty(self, key):
+        COUNTERS['get'] += 1
+        return self._props.get(key.lower(), '')
+
+    def clearProperty(self, key):
+        COUNTERS['clear'] += 1
+        self._props.pop(key.lower(), None)
@@ -0,0 +1,33 @@
+# This program is Free Software see LICENSE file for details
+"""Stub of Kodi's xbmcvfs module mapping special:// onto a temp dir"""
+
+import os
+import tempfile
+
+ROOT = tempfile.mkdtemp(prefix='kodi-stub-')
+
+
+def translatePath(path):
+    if path.startswith('special://'):
+        return os.path.join(ROOT, path[len('special://'):])
+    return path
+
+
+def exists(path):
+    return os.path.exists(translatePath(path))
+
+
+def mkdirs(path):
+    os.makedirs(translatePath(path), exist_ok=True)
+    return True
+
+
+class Stat:
+    def __init__(self, path):
+        self._stat = os.stat(translatePath(path))
+
+    def st_mtime(self):
+        return int(self._stat.st_mtime)
+
+    def st_size(self):
+        return self._stat.st_size
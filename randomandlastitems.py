@@ -12,51 +12,192 @@ Typical usage example:
     playlist="some playlist")</onload>
 
     This will get library info for the 12 newest (date added) playlist itmes
-    and return as window properties.  It runs as a one-shot (not a service)
+    and return as window properties.  It runs as a one-shot unless the
+    background service (service.py) is running, in which case the request is
+    handed to the service which keeps the library data in memory.
 
     Does not provide results for artist or mixed smart playlists
+
+Inside this add-on (the service, benchmarks/) query() takes a WidgetQuery
+and returns the widget properties without setting them.
 """
 
 
+import itertools
 import json
 import os
-import random
 import sys
 import time
 import urllib.request
-from operator import itemgetter
-from typing import List, Tuple
-from xml.dom.minidom import parse
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import xbmc
 import xbmcaddon
 import xbmcvfs
 from xbmcgui import Window
 
+from resources.lib import (capabilities, index, jsonrpc, moviesets, payloads,
+                           planner, playlist, properties, records, selection,
+                           snapshot, stats)
+
 # Define global variables
 _RALI_GLOBALS = {'LIMIT': 20,
                  'METHOD': 'Random',
                  'REVERSE': False,
                  'MENU': '',
+                 'NAME': None,
                  'PLAYLIST': '',
                  'PROPERTY': '',
                  'RESUME': 'False',
                  'SORTBY': '',
                  'TYPE': '',
                  'UNWATCHED': 'False'}
-START_TIME: float = time.time()
+_DEFAULT_GLOBALS = dict(_RALI_GLOBALS)
+# Library data kept between runs when working as a service (see service.py),
+# by query key: (playlist mtime, data)
+_SOURCE_CACHE: Optional[snapshot.Entries] = None
+# _SOURCE_CACHE changed since it was last saved to disk
+_SOURCE_CACHE_DIRTY = False
+# Items of the cached playlists by id, built when first needed
+_SOURCE_INDEX: Dict[tuple, index.ItemIndex] = {}
+# Movies of every movie set, kept by the service, see _getMovieSets
+_MOVIE_SETS: Optional[moviesets.MovieSetIndex] = None
+# Per-item streamdetails requests saved, see _resolveStreamdetails
+_STREAMDETAILS_AVOIDED = [0]
+# Window properties of the widget being read, see query()
+_RESULT: Dict[str, str] = {}
+# Rendered window properties of the items shown, see resources/lib/payloads.py
+_PAYLOADS = payloads.PayloadCache()
 WINDOW = Window(10000)
-MONITOR = xbmc.Monitor()
-# Nexus JSON RPC 12.9.0 required for userrating
-JSON_RPC_NEXUS: bool = (json.loads(xbmc.executeJSONRPC(
-                        '{"jsonrpc": "2.0", "method": "JSONRPC.Version", "id": 1}'))['result']['version']['major'],
-                        json.loads(xbmc.executeJSONRPC(
-                            '{"jsonrpc": "2.0", "method": "JSONRPC.Version", "id": 1}'))['result']['version']['minor']) >= (12, 9)
+# Widget properties are written through this, see resources/lib/properties.py
+_PROPERTIES = properties.PropertyWriter(WINDOW)
+# All JSON-RPC calls go through this client, see resources/lib/jsonrpc.py
+_RPC = jsonrpc.Client(abort=lambda: MONITOR.abortRequested())
+# JSON-RPC features, read when first needed by _capabilities()
+_CAPABILITIES: Optional[capabilities.Capabilities] = None
+
+# Named explicitly, xbmcaddon.Addon() is the calling add-on when imported
+__addonid__ = 'script.randomandlastitems'
+# API version and add-on metadata read once per Kodi session
+_SESSION = capabilities.SessionCache(WINDOW, f'{__addonid__}.Session',
+                                     xbmc.getInfoLabel('System.BuildVersion'))
+
+# Library item properties, userrating is added for Nexus (see _propertyList)
+_MOVIE_PROPERTIES = ('title', 'originaltitle', 'playcount', 'year', 'genre',
+                     'studio', 'country', 'tagline', 'plot', 'runtime', 'file',
+                     'plotoutline', 'lastplayed', 'trailer', 'rating', 'resume',
+                     'art', 'streamdetails', 'mpaa', 'director', 'dateadded')
+_MUSICVIDEO_PROPERTIES = ('title', 'playcount', 'year', 'genre', 'studio',
+                          'album', 'artist', 'track', 'plot', 'tag', 'rating',
+                          'runtime', 'file', 'lastplayed', 'resume', 'art',
+                          'streamdetails', 'director', 'dateadded')
+_EPISODE_PROPERTIES = ('title', 'playcount', 'season', 'episode', 'showtitle',
+                       'plot', 'file', 'rating', 'resume', 'runtime',
+                       'tvshowid', 'art', 'streamdetails', 'firstaired',
+                       'dateadded')
+_ALBUM_PROPERTIES = ('title', 'description', 'albumlabel', 'theme', 'mood',
+                     'style', 'type', 'artist', 'genre', 'year', 'thumbnail',
+                     'fanart', 'rating', 'playcount')
+_SONG_PROPERTIES = ('title', 'artist', 'artistid', 'dateadded', 'genre', 'year',
+                    'rating', 'album', 'albumid', 'track', 'duration',
+                    'comment', 'thumbnail', 'fanart', 'playcount')
+# Properties needed to count, filter and order playlist items
+_CANDIDATE_PROPERTIES = ('playcount', 'resume', 'dateadded')
+# Music library node used when no music playlist is given
+MUSIC_LIBRARY = 'musicdb://songs/'
+# Video library nodes read like playlists when Kodi cannot filter queries
+_LIBRARY_NODES = {'Movie': 'videodb://movies/titles/',
+                  'Episode': 'videodb://tvshows/titles/',
+                  'MusicVideo': 'videodb://musicvideos/titles/'}
+# Library nodes listing every new item of their kind, see _addItem
+_GROWING_NODES = (_LIBRARY_NODES['Movie'], _LIBRARY_NODES['MusicVideo'])
+# Records the items of the video libraries are kept as, by library result key
+_RECORD_TYPES = {'movies': records.Movie,
+                 'episodes': records.Episode,
+                 'musicvideos': records.MusicVideo}
+# Library data saved between Kodi sessions by the service
+SNAPSHOT_PATH = xbmcvfs.translatePath(
+    f'special://profile/addon_data/{__addonid__}/library.json')
+# Smart playlists parsed by earlier runs
+PLAYLISTS_PATH = xbmcvfs.translatePath(
+    f'special://profile/addon_data/{__addonid__}/playlists.json')
+_PLAYLISTS = playlist.PlaylistCache(PLAYLISTS_PATH)
+# Widget type by smart playlist type
+_PLAYLIST_TYPES = {'movies': 'Movie',
+                   'musicvideos': 'MusicVideo',
+                   'episodes': 'Episode',
+                   'tvshows': 'Episode',
+                   'songs': 'Music',
+                   'albums': 'Music',
+                   'artists': 'Invalid',
+                   'mixed': 'Invalid'}
+# Home window property set while the background service is running
+SERVICE_PROPERTY = f'{__addonid__}.Service'
+# Library notifications applied to the cached library data
+LIBRARY_CHANGES = ('VideoLibrary.OnUpdate',
+                   'VideoLibrary.OnRemove',
+                   'AudioLibrary.OnUpdate',
+                   'AudioLibrary.OnRemove')
+# Library notifications after which items may have changed without their own
+# OnUpdate / OnRemove, with the cached library data (first item of the cache
+# key) dropped: the music database adds and cleans songs and albums in bulk
+LIBRARY_SWEEPS = {'AudioLibrary.OnScanFinished': ('music',),
+                  'AudioLibrary.OnCleanFinished': ('music',),
+                  'VideoLibrary.OnCleanFinished': ('movies', 'episodes', 'musicvideos')}
+# Cached library data (first item of the cache key) by notified item type
+_ITEM_KINDS = {'movie': 'movies',
+               'set': 'movies',
+               'episode': 'episodes',
+               'season': 'episodes',
+               'tvshow': 'episodes',
+               'musicvideo': 'musicvideos',
+               'song': 'music',
+               'album': 'music',
+               'artist': 'music'}
+# Details query giving the playcount and resume point of an updated item
+_ITEM_DETAILS = {'movie': ('VideoLibrary.GetMovieDetails', 'movieid', 'moviedetails'),
+                 'episode': ('VideoLibrary.GetEpisodeDetails', 'episodeid', 'episodedetails'),
+                 'musicvideo': ('VideoLibrary.GetMusicVideoDetails', 'musicvideoid',
+                                'musicvideodetails')}
+# Widget item properties by library item type
+_ITEM_FIELDS = {'movie': _MOVIE_PROPERTIES,
+                'episode': _EPISODE_PROPERTIES,
+                'musicvideo': _MUSICVIDEO_PROPERTIES}
+# Smart playlist fields changing when an item is played or rated
+_VOLATILE_FIELDS = ('playcount', 'lastplayed', 'inprogress', 'userrating')
+# Item fields changing without the item being edited, a rendered item whose
+# fields differ is rendered again.  Episodes also get the studio and MPAA
+# rating of their tv show
+_PAYLOAD_STAMP = ('playcount', 'resume', 'userrating', 'mpaa', 'studio')
+
+
+class LibraryMonitor(xbmc.Monitor):
+    """Applies library notifications to the library data kept by the service
+
+    Only the cached playlists an item change affects are updated, see
+    _applyLibraryChange.  The data a library scan or clean may have changed
+    in bulk is dropped, see _dropLibraryData.  Without service nothing is
+    kept and the notifications are ignored.
+    """
+
+    def onNotification(self, sender: str, method: str, data: str) -> None:
+        """Kodi callback for JSON-RPC notifications
+
+        Args:
+            sender (str): notification sender
+            method (str): notification name
+            data (str): JSON encoded notification data
+        """
+        if _SOURCE_CACHE is None:
+            return
+        if method in LIBRARY_CHANGES:
+            _applyLibraryChange(method, json.loads(data))
+        elif method in LIBRARY_SWEEPS:
+            _dropLibraryData(method)
+
 
-__addon__ = xbmcaddon.Addon()
-__addonversion__ = __addon__.getAddonInfo('version')
-__addonid__ = __addon__.getAddonInfo('id')
-__addonname__ = __addon__.getAddonInfo('name')
+MONITOR = LibraryMonitor()
 
 
 def log(txt: str) -> None:
@@ -67,43 +208,71 @@ def log(txt: str) -> None:
 
     Returns: None
     """
-    message = f'{__addonname__}: {txt}'
+    _name = _SESSION.get('name', lambda: xbmcaddon.Addon(__addonid__).getAddonInfo('name'))
+    message = f'{_name}: {txt}'
     xbmc.log(msg=message, level=xbmc.LOGDEBUG)
 
 
+def _probeVersion() -> List[int]:
+    """Reads the JSON-RPC API version
+
+    Returns:
+        List[int]: major, minor and patch version
+    """
+    _version = _RPC.call('JSONRPC.Version')['result']['version']
+    return [_version['major'], _version['minor'], _version.get('patch', 0)]
+
+
+def _capabilities() -> capabilities.Capabilities:
+    """Gets the features of the Kodi JSON-RPC API
+
+    The API version is queried by the first run of a Kodi session, importing
+    the module sends no JSON-RPC call.
+
+    Returns:
+        capabilities.Capabilities: feature flags
+    """
+    global _CAPABILITIES
+    if _CAPABILITIES is None:
+        _CAPABILITIES = capabilities.Capabilities(_SESSION.get('api', _probeVersion))
+        if not _CAPABILITIES.batch:
+            _RPC.batch_size = 1
+    return _CAPABILITIES
+
+
+def _readPlaylist(_playlist: str) -> Optional[playlist.SmartPlaylist]:
+    """Gets the metadata of a smart playlist, parsed once per edit of the file
+
+    Args:
+        _playlist (str): playlist path
+
+    Returns:
+        Optional[playlist.SmartPlaylist]: type, name, order and rules, None if
+        the file is not a readable smart playlist
+    """
+    try:
+        return _PLAYLISTS.get(xbmcvfs.translatePath(_playlist))
+    except (OSError, ValueError) as error:
+        log(f'PLAYLIST {_playlist} COULD NOT BE READ: {error}')
+        return None
+
+
 def _getPlaylistType() -> None:
     """sets global variables for a playlist
 
         Returns:  None
     """
-    _doc = parse(xbmcvfs.translatePath(_RALI_GLOBALS['PLAYLIST']))
-    _type = _doc.getElementsByTagName('smartplaylist')[0].attributes.getNamedItem(
-        'type').nodeValue  # type: ignore
-    if _type == 'movies':
-        _RALI_GLOBALS['TYPE'] = 'Movie'
-    if _type == 'musicvideos':
-        _RALI_GLOBALS['TYPE'] = 'MusicVideo'
-    if _type == 'episodes' or _type == 'tvshows':
-        _RALI_GLOBALS['TYPE'] = 'Episode'
-    if _type == 'songs' or _type == 'albums':
-        _RALI_GLOBALS['TYPE'] = 'Music'
-    if _type == "artists" or _type == 'mixed':
-        _RALI_GLOBALS['TYPE'] = 'Invalid'
-    # get playlist name
-    _name = ''
-    if _doc.getElementsByTagName('name'):
-        try:
-            _name = _doc.getElementsByTagName(
-                'name')[0].firstChild.nodeValue  # type: ignore
-        except Exception:
-            _name = ''
-    _setProperty(f'{_RALI_GLOBALS["PROPERTY"]}.Name', str(_name))
+    _xsp = _readPlaylist(_RALI_GLOBALS['PLAYLIST'])
+    if _xsp is None:
+        return
+    if _xsp.type in _PLAYLIST_TYPES:
+        _RALI_GLOBALS['TYPE'] = _PLAYLIST_TYPES[_xsp.type]
+    _RALI_GLOBALS['NAME'] = _xsp.name
     # get playlist order
     if _RALI_GLOBALS['METHOD'] == 'Playlist':
-        if _doc.getElementsByTagName('order'):
-            _RALI_GLOBALS['SORTBY'] = _doc.getElementsByTagName('order')[
-                0].firstChild.nodeValue
-            if _doc.getElementsByTagName('order')[0].attributes.getNamedItem('direction').nodeValue == 'descending':
+        if _xsp.order:
+            _RALI_GLOBALS['SORTBY'] = _xsp.order
+            if _xsp.direction == 'descending':
                 _RALI_GLOBALS['REVERSE'] = True
         else:
             _RALI_GLOBALS['METHOD'] = ''
@@ -115,1098 +284,1572 @@ def _timeTook(t: float) -> str:
     Args:
         t (float): start time
 
-    Returns:
-        str: elapsed time to .001 sec
+    Returns:
+        str: elapsed time to .001 sec
+    """
+    t = time.time() - t
+    if t >= 60:
+        return '%.3fm' % (t / 60.0)
+    return '%.3fs' % (t)
+
+
+def _isCandidate(_item: records.Record) -> bool:
+    """Gets watched / in progress status for a library item
+
+    RESUME and UNWATCHED are bools to determine when an item is valid for inclusion
+    in the _result item list.  eg, if UNWATCHED is true any watched item is
+    excluded.
+
+    Args:
+        _item (records.Record): a library item to evaluate watched / in progress status
+
+    Returns:
+        bool: True if the item can be shown
+    """
+    _playcount: int = _item.playcount
+    if _RALI_GLOBALS['RESUME'] == 'True':
+        _resume: int = _item.position
+    else:
+        _resume = 0
+    return ((_RALI_GLOBALS['UNWATCHED'] == 'False' and _RALI_GLOBALS['RESUME'] == 'False')
+            or (_RALI_GLOBALS['UNWATCHED'] == 'True' and _playcount == 0)
+            or (_RALI_GLOBALS['RESUME'] == 'True' and _resume != 0))
+
+
+def _playlistMtime(_playlist: str) -> int:
+    """Gets the modification time of a smart playlist
+
+    Args:
+        _playlist (str): playlist path, may be a library node
+
+    Returns:
+        int: modification time, 0 if the playlist is not a .xsp file
+    """
+    if _playlist.endswith('.xsp') and xbmcvfs.exists(_playlist):
+        return xbmcvfs.Stat(_playlist).st_mtime()
+    return 0
+
+
+def _getSource(_key: Optional[tuple], _fetch: Callable[[], Any]) -> Any:
+    """Gets library data for a playlist, from memory when the service has it
+
+    Data kept for a smart playlist edited since it was read is fetched again
+
+    Args:
+        _key (Optional[tuple]): identifies the library query (kind, playlist,
+            ...), None if the result must not be kept
+        _fetch (Callable[[], Any]): queries the library, returns None on error
+
+    Returns:
+        Any: library data, None if the playlist could not be loaded
+    """
+    global _SOURCE_CACHE_DIRTY
+    if _SOURCE_CACHE is None or _key is None:
+        return _fetch()
+    _mtime = _playlistMtime(_key[1])
+    _entry = _SOURCE_CACHE.get(_key)
+    if _entry is not None and _entry[0] == _mtime:
+        log(f'Using cached library data for {_key}')
+        return _entry[1]
+    _source = _fetch()
+    if _source is not None:
+        _SOURCE_CACHE[_key] = (_mtime, _source)
+        _SOURCE_INDEX.pop(_key, None)
+        _SOURCE_CACHE_DIRTY = True
+    return _source
+
+
+def _propertyList(_fields: Tuple[str, ...]) -> List[str]:
+    """Gets the properties to request, with userrating when supported
+
+    Args:
+        _fields (Tuple[str, ...]): library item properties
+
+    Returns:
+        List[str]: properties for a JSON-RPC query
+    """
+    if _capabilities().userrating:
+        return list(_fields) + ['userrating']
+    return list(_fields)
+
+
+def _fetchLibraryCounts(_method: str, _listkey: str) -> Optional[dict]:
+    """counts watched / unwatched items of the whole library
+
+    The counters are read from the limits.total of count queries sent in one
+    batch, no library item is loaded (see resources/lib/stats.py).
+
+    Args:
+        _method (str): VideoLibrary.Get* method
+        _listkey (str): result key of the item list (movies, episodes...)
+
+    Returns:
+        Optional[dict]: item counters, None if the library could not be loaded
+    """
+    _responses = _RPC.batch(stats.video_queries(_method, _listkey))
+    _counts = stats.video_counts(_listkey, _responses)
+    if _counts is None:
+        log(f'## LIBRARY {_listkey} COULD NOT BE LOADED ##')
+        log(f'JSON RESULT {_responses}')
+    return _counts
+
+
+def _getLibraryCounts(_method: str, _listkey: str) -> Optional[dict]:
+    """Gets the counters of the whole library, see _fetchLibraryCounts
+
+    Args:
+        _method (str): VideoLibrary.Get* method
+        _listkey (str): result key of the item list (movies, episodes...)
+
+    Returns:
+        Optional[dict]: item counters, None if the library could not be loaded
+    """
+    return _getSource((_listkey, ''),
+                      lambda: _fetchLibraryCounts(_method, _listkey))
+
+
+def _fetchLibraryItems(_method: str, _listkey: str, _idkey: str,
+                       _fields: Tuple[str, ...]) -> Optional[List[records.Record]]:
+    """retrieves the items shown by a widget reading the whole library
+
+    Kodi applies the widget order, the unwatched / resume filters and LIMIT
+    (see planner.library_params) so only the items shown are returned.
+
+    Args:
+        _method (str): VideoLibrary.Get* method
+        _listkey (str): result key of the item list (movies, episodes...)
+        _idkey (str): item id key (movieid, episodeid...)
+        _fields (Tuple[str, ...]): item properties
+
+    Returns:
+        Optional[List[records.Record]]: items in widget order, None on error
+    """
+    _params = planner.library_params(_propertyList(_fields),
+                                     _RALI_GLOBALS['METHOD'],
+                                     _RALI_GLOBALS['LIMIT'],
+                                     _RALI_GLOBALS['UNWATCHED'] == 'True',
+                                     _RALI_GLOBALS['RESUME'] == 'True',
+                                     _RALI_GLOBALS['SORTBY'],
+                                     _RALI_GLOBALS['REVERSE'])
+    _json_response = _RPC.call(_method, _params)
+    if 'result' not in _json_response:
+        log(f'## LIBRARY {_listkey} COULD NOT BE LOADED ##')
+        log(f'JSON RESULT {_json_response}')
+        return None
+    _record = _RECORD_TYPES[_listkey]
+    return [_record(_item, details=_item)
+            for _item in _json_response['result'].get(_listkey) or []]
+
+
+def _getLibraryItems(_method: str, _listkey: str, _idkey: str,
+                     _fields: Tuple[str, ...]) -> Optional[List[records.Record]]:
+    """Gets the items shown by a widget reading the whole library
+
+    Random picks are never kept by the service so they change on each run.
+
+    Args:
+        _method (str): VideoLibrary.Get* method
+        _listkey (str): result key of the item list (movies, episodes...)
+        _idkey (str): item id key (movieid, episodeid...)
+        _fields (Tuple[str, ...]): item properties
+
+    Returns:
+        Optional[List[records.Record]]: items in widget order, None on error
+    """
+    _key = None
+    if _RALI_GLOBALS['METHOD'] != 'Random':
+        _key = (_listkey, '', _RALI_GLOBALS['METHOD'], _RALI_GLOBALS['LIMIT'],
+                _RALI_GLOBALS['UNWATCHED'], _RALI_GLOBALS['RESUME'])
+    return _getSource(_key, lambda: _fetchLibraryItems(_method, _listkey,
+                                                       _idkey, _fields))
+
+
+def _fetchFilteredPlaylist(_method: str, _listkey: str,
+                           _fields: Tuple[str, ...]) -> Optional[dict]:
+    """retrieves the counters and the widget items of a smart playlist with library queries
+
+    The playlist rules are sent as the filter of the library getter together
+    with the widget order and LIMIT (see planner.playlist_params), and the
+    counters are read from count queries with the same filter, all in one
+    request.  Only the items shown are returned, with every property.
+
+    Args:
+        _method (str): VideoLibrary.Get* method
+        _listkey (str): result key of the item list (movies, musicvideos)
+        _fields (Tuple[str, ...]): item properties
+
+    Returns:
+        Optional[dict]: counters and widget items, None if the playlist must be
+        read with Files.GetDirectory
+    """
+    if not _RALI_GLOBALS['PLAYLIST'].endswith('.xsp') or not _capabilities().filters:
+        return None
+    _xsp = _readPlaylist(_RALI_GLOBALS['PLAYLIST'])
+    if _xsp is None:
+        return None
+    try:
+        _params = planner.playlist_params(_xsp, _propertyList(_fields),
+                                          _RALI_GLOBALS['METHOD'],
+                                          _RALI_GLOBALS['LIMIT'],
+                                          _RALI_GLOBALS['UNWATCHED'] == 'True',
+                                          _RALI_GLOBALS['RESUME'] == 'True')
+        _rules = planner.playlist_filter(_xsp)
+    except ValueError as error:
+        log(f'Reading playlist {_RALI_GLOBALS["PLAYLIST"]} listing: {error}')
+        return None
+    _responses = _RPC.batch([(_method, _params)]
+                            + stats.video_queries(_method, _listkey, _rules))
+    _library = stats.video_counts(_listkey, _responses[1:])
+    if _library is None or 'result' not in _responses[0]:
+        log(f'Reading playlist {_RALI_GLOBALS["PLAYLIST"]} listing: filter refused')
+        log(f'JSON RESULT {_responses}')
+        return None
+    _record = _RECORD_TYPES[_listkey]
+    _library['items'] = [_record(_item, details=_item)
+                         for _item in _responses[0]['result'].get(_listkey) or []]
+    return _library
+
+
+def _candidateProperties(_fields: Tuple[str, ...], *_extra: str) -> List[str]:
+    """Gets the light properties requested for every playlist item
+
+    Playlists are read in two phases: every item with the properties needed
+    to count, filter and order them, then the full properties for the LIMIT
+    items shown only (see _fetchDetails).
+
+    Args:
+        _fields (Tuple[str, ...]): full properties of the items
+        _extra (str): other properties needed by the caller
+
+    Returns:
+        List[str]: properties for the playlist query
+    """
+    _properties = list(_CANDIDATE_PROPERTIES) + list(_extra)
+    if _RALI_GLOBALS['SORTBY'] in _fields and _RALI_GLOBALS['SORTBY'] not in _properties:
+        _properties.append(_RALI_GLOBALS['SORTBY'])
+    return _properties
+
+
+def _fetchDetails(_items: List[records.Record], _method: str, _idkey: str,
+                  _detailskey: str, _fields: Tuple[str, ...]) -> List[records.Record]:
+    """retrieves the full properties of the items shown by a widget
+
+    Args:
+        _items (List[records.Record]): selected items
+        _method (str): VideoLibrary.Get*Details method
+        _idkey (str): item id key (movieid, episodeid...)
+        _detailskey (str): result key of the details (moviedetails...)
+        _fields (Tuple[str, ...]): full properties of the items
+
+    Returns:
+        List[records.Record]: items with their details, items no longer in the
+        library are left out.  Items read with every property are kept as is
+    """
+    _result = []
+    _properties = _propertyList(_fields)
+    _light = [_item for _item in _items if _item.details is None]
+    _responses = iter(_RPC.batch([(_method, {_idkey: _item.id,
+                                             'properties': _properties})
+                                  for _item in _light]))
+    for _item in _items:
+        if _item.details is not None:
+            _result.append(_item)
+            continue
+        _json_response = next(_responses)
+        _details = _json_response.get('result', {}).get(_detailskey)
+        if _details:
+            # keep the light item as is, it may be cached by the service
+            _result.append(_item.with_details(_details))
+        else:
+            log(f'## {_idkey} {_item.id} COULD NOT BE LOADED ##')
+    return _result
+
+
+def _resolveStreamdetails(_items: List[records.Record], _method: str, _idkey: str,
+                          _detailskey: str) -> None:
+    """Makes sure every widget item has its streamdetails
+
+    Items read with the full property list already carry streamdetails.  The
+    others get them from one batched Get*Details request.
+
+    Args:
+        _items (List[records.Record]): items shown by the widget, updated in place
+        _method (str): VideoLibrary.Get*Details method
+        _idkey (str): item id key (movieid, episodeid...)
+        _detailskey (str): result key of the details (moviedetails...)
+    """
+    _shown = _items[:_RALI_GLOBALS['LIMIT']]
+    _missing = [_item for _item in _shown if 'streamdetails' not in _item]
+    if _missing:
+        _responses = _RPC.batch(
+            [(_method, {_idkey: _item.id, 'properties': ['streamdetails']})
+             for _item in _missing])
+        for _item, _response in zip(_missing, _responses):
+            _details = _response.get('result', {}).get(_detailskey, {})
+            _item['streamdetails'] = _details.get(
+                'streamdetails', {'video': [], 'audio': [], 'subtitle': []})
+    # one Get*Details request per item was sent before, a batch counts as one
+    _avoided = len(_shown) - (1 if _missing else 0)
+    _STREAMDETAILS_AVOIDED[0] += _avoided
+    log(f'Streamdetails: {_avoided} round-trips avoided '
+        f'({_STREAMDETAILS_AVOIDED[0]} since start), '
+        f'{len(_missing)} items fetched in one batch')
+
+
+def _sourceIndex(_key: tuple, _source: dict) -> Optional[index.ItemIndex]:
+    """Gets the index of a cached playlist
+
+    Args:
+        _key (tuple): cache key of the playlist
+        _source (dict): playlist data
+
+    Returns:
+        Optional[index.ItemIndex]: the index, None if the playlist is not cached
+    """
+    if _SOURCE_CACHE is None or _key not in _SOURCE_CACHE:
+        return None
+    _index = _SOURCE_INDEX.get(_key)
+    if _index is None:
+        _index = _SOURCE_INDEX[_key] = index.ItemIndex(_source['items'])
+    return _index
+
+
+def _selectItems(_key: tuple, _source: dict) -> List[records.Record]:
+    """Filters and orders playlist items for the widget
+
+    Cached playlists are filtered and ordered on the columns of their index
+    (see resources/lib/index.py).  Otherwise the candidates are not copied
+    nor sorted, only LIMIT of them are kept (see resources/lib/selection.py).
+
+    Args:
+        _key (tuple): cache key of the playlist
+        _source (dict): playlist data
+
+    Returns:
+        List[records.Record]: up to LIMIT items in widget order
+    """
+    _index = _sourceIndex(_key, _source)
+    if _index is not None:
+        return _index.select(_RALI_GLOBALS['METHOD'], _RALI_GLOBALS['LIMIT'],
+                             _RALI_GLOBALS['UNWATCHED'] == 'True',
+                             _RALI_GLOBALS['RESUME'] == 'True',
+                             _RALI_GLOBALS['REVERSE'])
+    _result = (_item for _item in _source['items'] if _isCandidate(_item))
+    if _RALI_GLOBALS['METHOD'] == 'Last':
+        return selection.top(_result, _RALI_GLOBALS['LIMIT'],
+                             attrgetter('dateadded'), reverse=True)
+    if _RALI_GLOBALS['METHOD'] == 'Playlist':
+        return selection.top(_result, _RALI_GLOBALS['LIMIT'], attrgetter('order'),
+                             reverse=_RALI_GLOBALS['REVERSE'])
+    return selection.sample(_result, _RALI_GLOBALS['LIMIT'])
+
+
+def _openListing(_params: dict) -> Tuple[Optional[dict], Iterator[dict]]:
+    """Lists a playlist with Files.GetDirectory, with its first item
+
+    The items are decoded as they are consumed, see resources/lib/streaming.py
+
+    Args:
+        _params (dict): Files.GetDirectory parameters
+
+    Returns:
+        Tuple[Optional[dict], Iterator[dict]]: first item, None if the
+        playlist is empty or could not be loaded, and every playlist item
+    """
+    _files = _RPC.items('Files.GetDirectory', _params, 'files') or iter(())
+    _first = next(_files, None)
+    if _first is None:
+        log(f'## PLAYLIST {_params["directory"]} COULD NOT BE LOADED ##')
+        return None, _files
+    return _first, itertools.chain((_first,), _files)
+
+
+def _readListing(_params: dict) -> Optional[Iterator[dict]]:
+    """Lists a playlist with Files.GetDirectory, see _openListing
+
+    Args:
+        _params (dict): Files.GetDirectory parameters
+
+    Returns:
+        Optional[Iterator[dict]]: playlist items, None if the playlist is
+        empty or could not be loaded
+    """
+    _first, _files = _openListing(_params)
+    return None if _first is None else _files
+
+
+def _positionKey(_field: str, _reverse: bool) -> Callable[[tuple], tuple]:
+    """Gets the sort key of (listing position, item) pairs
+
+    Items expanded from a movie set or a tv show come after the rest of the
+    listing, their listing position breaks ties so the widget shows the same
+    items as when the whole listing is sorted.
+
+    Args:
+        _field (str): record attribute to sort on (dateadded, order)
+        _reverse (bool): descending order
+
+    Returns:
+        Callable[[tuple], tuple]: sort key
+    """
+    if _reverse:
+        return lambda _pair: (getattr(_pair[1], _field), tuple(-_n for _n in _pair[0]))
+    return lambda _pair: (getattr(_pair[1], _field), _pair[0])
+
+
+def _pickItems(_positioned: Iterable[Tuple[tuple, records.Record]]
+               ) -> List[records.Record]:
+    """Picks the widget items out of a playlist read one item at a time
+
+    Same items as _selectItems, only LIMIT of them are held
+
+    Args:
+        _positioned (Iterable[Tuple[tuple, records.Record]]): candidate
+            items with their listing position
+
+    Returns:
+        List[records.Record]: up to LIMIT items in widget order
+    """
+    if _RALI_GLOBALS['METHOD'] == 'Last':
+        _picked = selection.top(_positioned, _RALI_GLOBALS['LIMIT'],
+                                _positionKey('dateadded', True), reverse=True)
+    elif _RALI_GLOBALS['METHOD'] == 'Playlist':
+        _picked = selection.top(_positioned, _RALI_GLOBALS['LIMIT'],
+                                _positionKey('order', _RALI_GLOBALS['REVERSE']),
+                                reverse=_RALI_GLOBALS['REVERSE'])
+    else:
+        _picked = selection.sample(_positioned, _RALI_GLOBALS['LIMIT'])
+    return [_item for _, _item in _picked]
+
+
+def _readItems(_positioned: Iterator[Tuple[tuple, dict]], _record: type,
+               _pick: bool) -> Optional[dict]:
+    """Counts the video items of a playlist, keeping them all or the widget items
+
+    Args:
+        _positioned (Iterator[Tuple[tuple, dict]]): playlist items with their
+            listing position, (index in the listing, index in the movie set
+            or tv show)
+        _record (type): records.Record subclass the items are kept as
+        _pick (bool): keep only the items shown by the widget
+
+    Returns:
+        Optional[dict]: counters and records, every item in listing order or
+        the widget items in widget order, None if Kodi shut down meanwhile
+    """
+    _counts = {'total': 0, 'watched': 0}
+
+    def _counted() -> Iterator[Tuple[tuple, records.Record]]:
+        for _position, _item in _positioned:
+            _item = _record(_item, _RALI_GLOBALS['SORTBY'])
+            _counts['total'] += 1
+            if _item.playcount != 0:
+                _counts['watched'] += 1
+            yield _position, _item
+
+    if _pick:
+        _items = _pickItems(_pair for _pair in _counted() if _isCandidate(_pair[1]))
+    else:
+        _items = [_item for _, _item in sorted(_counted(), key=itemgetter(0))]
+    if MONITOR.abortRequested():
+        return None
+    return {'total': _counts['total'],
+            'watched': _counts['watched'],
+            'unwatched': _counts['total'] - _counts['watched'],
+            'items': _items}
+
+
+def _getPlaylistItems(_kind: str, _fetch: Callable[..., Optional[dict]]
+                      ) -> Tuple[Optional[dict], List[records.Record]]:
+    """Gets the counters of a video playlist and the items shown by the widget
+
+    The service keeps every playlist item to select from on the next runs.  A
+    one-shot run reads the listing one item at a time and only keeps LIMIT
+    items, its memory does not grow with the playlist.
+
+    The records hold the value of the SORTBY field in `order`, the field is
+    part of the cache key: widgets on the same playlist with another method
+    or order do not share records.
+
+    Args:
+        _kind (str): result key of the items (movies, episodes...)
+        _fetch (Callable[..., Optional[dict]]): reads the playlist, picking
+            the widget items when called with True
+
+    Returns:
+        Tuple[Optional[dict], List[records.Record]]: playlist data, None if it could
+        not be loaded, and the widget items in widget order
+    """
+    if _SOURCE_CACHE is None:
+        _library = _fetch(True)
+        return _library, _library['items'] if _library else []
+    _key = (_kind, _RALI_GLOBALS['PLAYLIST'], _RALI_GLOBALS['SORTBY'])
+    _library = _getSource(_key, _fetch)
+    return _library, _selectItems(_key, _library) if _library else []
+
+
+def _isVolatilePlaylist(_playlist: str) -> bool:
+    """Tells whether playing or rating an item may change a playlist content
+
+    Args:
+        _playlist (str): playlist path, may be a library node
+
+    Returns:
+        bool: True if the playlist rules or order use playback fields, or
+        cannot be read.  The library nodes have no rules and a fixed order
+    """
+    if _playlist == MUSIC_LIBRARY or _playlist in _LIBRARY_NODES.values():
+        return False
+    if not _playlist.endswith('.xsp'):
+        return True
+    _xsp = _readPlaylist(_playlist)
+    if _xsp is None:
+        return True
+    _fields = [_rule.field for _rule in _xsp.rules] + [_xsp.order]
+    return any(_field in _VOLATILE_FIELDS for _field in _fields)
+
+
+def _fetchItemState(_type: str, _id: int,
+                    _orders: Optional[Iterable[str]] = None) -> Optional[dict]:
+    """retrieves the playcount and resume point of a library item
+
+    Args:
+        _type (str): item type (movie, episode, musicvideo)
+        _id (int): library id of the item
+        _orders (Optional[Iterable[str]]): order fields of the cached data
+            a new item is added to, its date added and these fields are read
+            too (see _addItem)
+
+    Returns:
+        Optional[dict]: playcount and resume (and setid for movies), None if
+        the item is not in the library
+    """
+    _method, _idkey, _detailskey = _ITEM_DETAILS[_type]
+    _properties = ['playcount', 'resume']
+    if _orders is not None:
+        _properties += ['dateadded'] + [_field for _field in _orders
+                                        if _field in _ITEM_FIELDS[_type]]
+    if _type == 'movie':
+        # tells whether the movie joined or left a set, see _applyMovieSetChange
+        _properties.append('setid')
+    _json_response = _RPC.call(_method, {_idkey: _id, 'properties': _properties})
+    return _json_response.get('result', {}).get(_detailskey)
+
+
+def _updateItem(_key: tuple, _id: int, _state: dict) -> bool:
+    """Applies a new playcount / resume point to cached library data
+
+    Args:
+        _key (tuple): cache key of the library data
+        _id (int): library id of the item
+        _state (dict): playcount and resume of the item
+
+    Returns:
+        bool: False if the data may no longer be right and must be dropped
+    """
+    _source = _SOURCE_CACHE[_key][1]
+    if _key[1] == '':
+        # library counters, or LIMIT items chosen by Kodi among the unwatched
+        # or in progress items, need a new query.  The LIMIT items are kept
+        # with their details, an edit of one of them does too
+        if len(_key) == 2 or 'True' in _key[4:]:
+            return False
+        return all(_item.id != _id for _item in _source)
+    if _isVolatilePlaylist(_key[1]):
+        return False
+    _delta = _sourceIndex(_key, _source).update(_id, _state['playcount'],
+                                                _state['resume'])
+    if _delta:
+        _source['watched'] += _delta
+        _source['unwatched'] -= _delta
+    return True
+
+
+def _removeItem(_key: tuple, _id: int) -> bool:
+    """Removes a deleted library item from cached library data
+
+    Args:
+        _key (tuple): cache key of the library data
+        _id (int): library id of the item
+
+    Returns:
+        bool: False if the data may no longer be right and must be dropped
+    """
+    _source = _SOURCE_CACHE[_key][1]
+    if _key[1] == '':
+        return len(_key) > 2 and all(_item.id != _id for _item in _source)
+    _index = _sourceIndex(_key, _source)
+    if _id not in _index.items:
+        return True
+    if _key[0] == 'episodes':
+        # the TV show may have no episode left in the playlist
+        return False
+    _item = _index.remove(_id)
+    _source['items'].remove(_item)
+    _source['total'] -= 1
+    if _item.playcount == 0:
+        _source['unwatched'] -= 1
+    else:
+        _source['watched'] -= 1
+    return True
+
+
+def _addItem(_key: tuple, _state: dict) -> bool:
+    """Adds a new library item to cached library data
+
+    Only the movie and music video library nodes list every item of their
+    kind: whether a new item belongs to a smart playlist takes a new query,
+    and a new episode may add a TV show.  The item goes to the recency index
+    in O(log N) (see resources/lib/index.py).
+
+    Args:
+        _key (tuple): cache key of the library data
+        _state (dict): candidate properties of the item
+
+    Returns:
+        bool: False if the data may no longer be right and must be dropped
+    """
+    if _key[1] not in _GROWING_NODES:
+        return False
+    _source = _SOURCE_CACHE[_key][1]
+    # the order field the cached records were read with
+    _item = _RECORD_TYPES[_key[0]](_state, _key[2])
+    if not _sourceIndex(_key, _source).add(_item):
+        return False
+    _source['items'].append(_item)
+    _source['total'] += 1
+    if _item.playcount == 0:
+        _source['unwatched'] += 1
+    else:
+        _source['watched'] += 1
+    return True
+
+
+def _applyMovieSetChange(_type: str, _id: int, _removed: bool, _added: bool,
+                         _state: Optional[dict]) -> None:
+    """Updates the movie set index after a library notification
+
+    Played movies are updated and removed movies dropped in place.  The
+    index is read again when a set changed or a movie joined or left one.
+
+    Args:
+        _type (str): item type (movie, set)
+        _id (int): library id of the item
+        _removed (bool): the item was removed from the library
+        _added (bool): the item was added to the library
+        _state (Optional[dict]): playcount, resume and setid of an updated movie
+    """
+    global _MOVIE_SETS
+    if _type == 'set' or _added:
+        _MOVIE_SETS = None
+    elif _removed:
+        _MOVIE_SETS.remove(_id)
+    elif not _MOVIE_SETS.update(_id, _state):
+        _MOVIE_SETS = None
+
+
+def _applyLibraryChange(_method: str, _data: dict) -> None:
+    """Updates the cached library data after a library notification
+
+    Played or removed movies, episodes and music videos are updated in
+    place, new movies and music videos are added to the library nodes.  Data
+    that may have changed in a way only a new query can tell is dropped and
+    read again by the next widget needing it: other new items, TV show, set
+    and album changes, playlists using playback fields, library counters,
+    library queries filtered on unwatched / in progress items and library
+    queries showing the item (they hold its details).  Song listings hold
+    no playback data and are kept when a song is played.
+
+    Args:
+        _method (str): VideoLibrary / AudioLibrary OnUpdate or OnRemove
+        _data (dict): notification data
+    """
+    global _SOURCE_CACHE_DIRTY
+    _item = _data.get('item', _data)
+    _type = _item.get('type', '')
+    _id = _item.get('id')
+    _PAYLOADS.discard((_type, _id))
+    _kind = _ITEM_KINDS.get(_type)
+    _keys = [_key for _key in _SOURCE_CACHE if _key[0] == _kind]
+    _sets = _MOVIE_SETS is not None and _type in ('movie', 'set')
+    if not _keys and not _sets:
+        return
+    _removed = _method.endswith('OnRemove')
+    _added = bool(_data.get('added'))
+    _state = None
+    _orders = None
+    if _added:
+        _orders = {_key[2] for _key in _keys if _key[1] in _GROWING_NODES}
+    if _type in _ITEM_DETAILS and not _removed and (_orders or not _added):
+        _state = _fetchItemState(_type, _id, _orders)
+        _removed = _state is None
+    if _sets:
+        _applyMovieSetChange(_type, _id, _removed, _added, _state)
+    if not _keys:
+        return
+    _dropped = 0
+    for _key in _keys:
+        if _type == 'song':
+            _keep = not _removed and not _added and not _isVolatilePlaylist(_key[1])
+        elif _type not in _ITEM_DETAILS:
+            _keep = False
+        elif _removed:
+            _keep = _removeItem(_key, _id)
+        elif _added:
+            _keep = _addItem(_key, _state)
+        else:
+            _keep = _updateItem(_key, _id, _state)
+        if not _keep:
+            del _SOURCE_CACHE[_key]
+            _SOURCE_INDEX.pop(_key, None)
+            _dropped += 1
+    _SOURCE_CACHE_DIRTY = True
+    log(f'{_method} {_type} {_id}: {len(_keys) - _dropped} cached queries updated, '
+        f'{_dropped} dropped')
+
+
+def _dropLibraryData(_method: str) -> None:
+    """Drops the cached library data after a library scan or clean
+
+    Args:
+        _method (str): AudioLibrary OnScanFinished / OnCleanFinished or
+            VideoLibrary.OnCleanFinished
+    """
+    global _SOURCE_CACHE_DIRTY, _MOVIE_SETS
+    _kinds = LIBRARY_SWEEPS[_method]
+    _keys = [_key for _key in _SOURCE_CACHE if _key[0] in _kinds]
+    for _key in _keys:
+        del _SOURCE_CACHE[_key]
+        _SOURCE_INDEX.pop(_key, None)
+    if 'movies' in _kinds:
+        _MOVIE_SETS = None
+    if _keys:
+        _SOURCE_CACHE_DIRTY = True
+    log(f'{_method}: {len(_keys)} cached queries dropped')
+
+
+def _libraryFingerprint() -> List[Optional[int]]:
+    """Gets item counts telling whether the libraries changed
+
+    Returns:
+        List[Optional[int]]: video and music library counters
+    """
+    _queries = (stats.video_queries('VideoLibrary.GetMovies', 'movies')
+                + stats.video_queries('VideoLibrary.GetEpisodes', 'episodes')
+                + stats.video_queries('VideoLibrary.GetMusicVideos', 'musicvideos')
+                + stats.music_queries())
+    return [stats.total(_response) for _response in _RPC.batch(_queries)]
+
+
+def enable_source_cache(persistent: bool = False) -> None:
+    """Keeps library data in memory between runs (used by the service)
+
+    Args:
+        persistent (bool): start from the data saved by save_source_cache()
+
+    Returns: None
+    """
+    global _SOURCE_CACHE
+    if _SOURCE_CACHE is None:
+        _SOURCE_CACHE = {}
+    if persistent:
+        _entries = snapshot.load(SNAPSHOT_PATH, _libraryFingerprint())
+        if _entries:
+            _SOURCE_CACHE.update(_entries)
+            log(f'Loaded {len(_entries)} cached library queries from {SNAPSHOT_PATH}')
+
+
+def save_source_cache() -> None:
+    """Saves the library data kept in memory to the addon profile
+
+    Nothing is written when the data did not change since the last save.
+    The LIMIT items of library queries are left out: they hold their
+    details, and the library fingerprint does not tell a metadata edit.
+    They are read again by the first widget needing them.
+
+    Returns: None
+    """
+    global _SOURCE_CACHE_DIRTY
+    if not _SOURCE_CACHE_DIRTY or _SOURCE_CACHE is None:
+        return
+    _entries = {_key: _entry for _key, _entry in _SOURCE_CACHE.items()
+                if _key[1] != '' or len(_key) == 2}
+    try:
+        snapshot.save(SNAPSHOT_PATH, _entries, _libraryFingerprint())
+    except (OSError, TypeError, ValueError) as error:
+        log(f'Unable to save cached library data: {error}')
+    _SOURCE_CACHE_DIRTY = False
+
+
+def clear_source_cache() -> None:
+    """Drops library data kept in memory and on disk, eg after a library update
+
+    Returns: None
+    """
+    global _SOURCE_CACHE_DIRTY, _MOVIE_SETS
+    _SOURCE_INDEX.clear()
+    _PAYLOADS.clear()
+    _MOVIE_SETS = None
+    if _SOURCE_CACHE:
+        _SOURCE_CACHE.clear()
+        log('Cached library data cleared')
+    snapshot.remove(SNAPSHOT_PATH)
+    _SOURCE_CACHE_DIRTY = False
+
+
+def _listMovies(_files: Iterator[dict], _properties: List[str]
+                ) -> Iterator[Tuple[tuple, dict]]:
+    """Yields the movies of a playlist listing with their listing position
+
+    Movie sets returned by the playlist are expanded once the listing is
+    read, their movies come last with the position of the set.  The sets of
+    the library nodes are read from the movie set index (see _getMovieSets),
+    the sets of a smart playlist are browsed in batches (see
+    resources/lib/jsonrpc.py).
+
+    Args:
+        _files (Iterator[dict]): Files.GetDirectory items
+        _properties (List[str]): movie properties
+
+    Yields:
+        Tuple[tuple, dict]: listing position and movie
+    """
+    _sets = []
+    for _position, _item in enumerate(_files):
+        if _item['filetype'] == 'directory':
+            _sets.append((_position, _item['file'], moviesets.set_id(_item['file'])))
+        else:
+            yield (_position, 0), _item
+    _index = None
+    if any(_setid is not None for _, _, _setid in _sets):
+        _index = _getMovieSets(_properties)
+    _calls = {}
+    for _position, _file, _setid in _sets:
+        if _index is None or _setid is None:
+            _calls[_position] = _RPC.submit('Files.GetDirectory',
+                                            {'directory': _file,
+                                             'media': 'video',
+                                             'properties': _properties})
+    _responses = _RPC.collect()
+    if MONITOR.abortRequested():
+        return
+    for _position, _file, _setid in _sets:
+        if _position not in _calls:
+            _movies: List[dict] = _index.movies(_setid) or []
+            if not _movies:
+                log(f'## MOVIESET {_file} (setid {_setid}) NOT IN INDEX ##')
+        else:
+            _json_set_response = _responses[_calls[_position]]
+            _movies = _json_set_response.get('result', {}).get('files') or []
+            if not _movies:
+                log(f'## MOVIESET {_file} COULD NOT BE LOADED ##')
+                log(f'JSON RESULT {_json_set_response}')
+        for _offset, _movie in enumerate(_movies):
+            yield (_position, _offset), _movie
+
+
+def _getMovieSets(_properties: List[str]) -> Optional[moviesets.MovieSetIndex]:
+    """Gets the movies of every movie set, see resources/lib/moviesets.py
+
+    The members of all the sets are read with one VideoLibrary.GetMovies,
+    filtered on the movies belonging to a set and with the listing
+    properties only: the details are read for the widget items.  The
+    service keeps the index and applies the library notifications to it
+    (see _applyMovieSetChange), other runs read it once.
+
+    Library widgets use filtered library queries, this is only reached for
+    widgets naming videodb://movies/titles/ as their playlist.
+
+    Args:
+        _properties (List[str]): movie properties needed
+
+    Returns:
+        Optional[moviesets.MovieSetIndex]: movie sets, None if the sets must
+        be browsed one by one
+    """
+    global _MOVIE_SETS
+    if _MOVIE_SETS is not None and _MOVIE_SETS.covers(_properties):
+        return _MOVIE_SETS
+    _movies = _RPC.items('VideoLibrary.GetMovies',
+                         {'properties': _properties + ['setid'],
+                          'filter': moviesets.SET_MEMBERS}, 'movies')
+    if _movies is None:
+        log('## MOVIESETS COULD NOT BE LOADED ##')
+        return None
+    try:
+        _index = moviesets.MovieSetIndex(_properties, _movies)
+    except ValueError as error:
+        log(f'## MOVIESETS COULD NOT BE LOADED: {error} ##')
+        return None
+    if not _index.sets:
+        # no movie read with a set, Kodi returned an error
+        return None
+    if _SOURCE_CACHE is not None:
+        _MOVIE_SETS = _index
+    return _index
+
+
+def _fetchMovies(_pick: bool = False) -> Optional[dict]:
+    """retrieves the movies of a playlist from Kodi library
+
+    Only the properties needed to pick the widget items are requested, see
+    _candidateProperties.  Movie sets returned by the playlist are expanded
+    to their movies.  When picking, a smart playlist Kodi can filter on is
+    read with library queries instead, see _fetchFilteredPlaylist.
+
+    Args:
+        _pick (bool): keep only the movies shown by the widget
+
+    Returns:
+        Optional[dict]: movie counters and items, None if the playlist could
+        not be loaded
+    """
+    if _pick:
+        _library = _fetchFilteredPlaylist('VideoLibrary.GetMovies', 'movies',
+                                          _MOVIE_PROPERTIES)
+        if _library is not None:
+            return _library
+    _properties = _candidateProperties(_MOVIE_PROPERTIES)
+    _files = _readListing({'directory': _RALI_GLOBALS['PLAYLIST'],
+                           'media': 'video',
+                           'properties': _properties})
+    if _files is None:
+        return None
+    return _readItems(_listMovies(_files, _properties), records.Movie, _pick)
+
+
+def _renderMovie(_movie: records.Movie) -> payloads.Payload:
+    """Renders the window properties of a movie
+
+    Args:
+        _movie (records.Movie): movie with its details
+
+    Returns:
+        payloads.Payload: window properties of the item
+    """
+    resume, played = _resumeState(_movie['resume'])
+    if _movie['playcount'] >= 1:
+        watched = 'true'
+    else:
+        watched = 'false'
+    path = media_path(_movie['file'])
+    play = 'RunScript(' + __addonid__ + ',movieid=' + (
+        str(_movie.get('id')) + ')')
+    art = _movie['art']
+    streaminfo = media_streamdetails(_movie['file'].lower(),
+                                     _movie['streamdetails'])
+    # Get runtime from streamdetails or from NFO
+    if streaminfo['duration'] != 0:
+        runtime = str(int((streaminfo['duration'] / 60) + 0.5))
+    else:
+        if isinstance(_movie['runtime'], int):
+            runtime = str(int((_movie['runtime'] / 60) + 0.5))
+        else:
+            runtime = _movie['runtime']
+    # autopep8:off
+    return (('DBID',            str(_movie.get('id',''))),
+            ('Title',           _movie.get('title','')),
+            ('OriginalTitle',   _movie.get('originaltitle','')),
+            ('Year',            str(_movie.get('year',''))),
+            ('Genre',           ' / '.join(_movie.get('genre',''))),
+            ('Studio',          ' / '.join(_movie.get('studio',''))),
+            ('Country',         ' / '.join(_movie.get('country',''))),
+            ('Plot',            _movie.get('plot','')),
+            ('PlotOutline',     _movie.get('plotoutline','')),
+            ('Tagline',         _movie.get('tagline','')),
+            ('Runtime',         runtime),
+            ('Rating',          str(round(float(_movie.get('rating','0')),1))),
+            ('UserRating',      str(_movie.get('userrating','0'))),
+            ('Trailer',         _movie.get('trailer','')),
+            ('MPAA',            _movie.get('mpaa','')),
+            ('Director',        ' / '.join(_movie.get('director',''))),
+            ('Art(thumb)',      art.get('thumb','')),
+            ('Art(poster)',     art.get('poster','')),
+            ('Art(fanart)',     art.get('fanart','')),
+            ('Art(clearlogo)',  art.get('clearlogo','')),
+            ('Art(clearart)',   art.get('clearart','')),
+            ('Art(landscape)',  art.get('landscape','')),
+            ('Art(banner)',     art.get('banner','')),
+            ('Art(discart)',    art.get('discart','')),
+            ('Resume',          resume),
+            ('PercentPlayed',   played),
+            ('Watched',         watched),
+            ('File',            _movie.get('file','')),
+            ('Path',            path),
+            ('Play',            play),
+            ('VideoCodec',      streaminfo['videocodec']),
+            ('VideoResolution', streaminfo['videoresolution']),
+            ('VideoAspect',     streaminfo['videoaspect']),
+            ('AudioCodec',      streaminfo['audiocodec']),
+            ('AudioChannels',   str(streaminfo['audiochannels'])))
+    # autopep8:on
+
+
+def _getMovies() -> None:
+    """retrieves movie info from Kodi library and sets properties
+
+    If a movie playlist is not provided the whole movie library is queried
+
+    Returns:
+        None
+    """
+    _result = None
+    if _RALI_GLOBALS['PLAYLIST'] == '':
+        _library = _getLibraryCounts('VideoLibrary.GetMovies', 'movies')
+        _result = _getLibraryItems('VideoLibrary.GetMovies', 'movies',
+                                   'movieid', _MOVIE_PROPERTIES)
+    else:
+        _library, _result = _getPlaylistItems('movies', _fetchMovies)
+        if _library:
+            _result = _fetchDetails(_result,
+                                    'VideoLibrary.GetMovieDetails', 'movieid',
+                                    'moviedetails', _MOVIE_PROPERTIES)
+    if _library is None or _result is None:
+        return
+    _resolveStreamdetails(_result, 'VideoLibrary.GetMovieDetails', 'movieid',
+                          'moviedetails')
+    _setVideoProperties(_library['total'], _library['watched'],
+                        _library['unwatched'])
+    _count = 0
+    for _movie in _result:
+        if MONITOR.abortRequested():
+            return
+        if _count == _RALI_GLOBALS['LIMIT']:
+            break
+        _count += 1
+        _setItemProperties(_renderItem('movie', _movie, _renderMovie), _count)
+
+    if _count != _RALI_GLOBALS['LIMIT']:
+        while _count < _RALI_GLOBALS['LIMIT']:
+            _count += 1
+        _setProperty('%s.%d.Title' %
+                     (_RALI_GLOBALS['PROPERTY'], _count), '')
+
+
+def _fetchMusicVideos(_pick: bool = False) -> Optional[dict]:
+    """retrieves the music videos of a playlist from Kodi library
+
+    Only the properties needed to pick the widget items are requested, see
+    _candidateProperties.  When picking, a smart playlist Kodi can filter on
+    is read with library queries instead, see _fetchFilteredPlaylist.
+
+    Args:
+        _pick (bool): keep only the music videos shown by the widget
+
+    Returns:
+        Optional[dict]: music video counters and items, None if the playlist
+        could not be loaded
+    """
+    if _pick:
+        _library = _fetchFilteredPlaylist('VideoLibrary.GetMusicVideos', 'musicvideos',
+                                          _MUSICVIDEO_PROPERTIES)
+        if _library is not None:
+            return _library
+    _files = _readListing({'directory': _RALI_GLOBALS['PLAYLIST'],
+                           'media': 'video',
+                           'properties': _candidateProperties(_MUSICVIDEO_PROPERTIES)})
+    if _files is None:
+        return None
+    return _readItems((((_position, 0), _item) for _position, _item in enumerate(_files)),
+                      records.MusicVideo, _pick)
+
+
+def _renderMusicVideo(_musicvid: records.MusicVideo) -> payloads.Payload:
+    """Renders the window properties of a music video
+
+    Args:
+        _musicvid (records.MusicVideo): music video with its details
+
+    Returns:
+        payloads.Payload: window properties of the item
+    """
+    resume, played = _resumeState(_musicvid['resume'])
+    if _musicvid['playcount'] >= 1:
+        watched = 'true'
+    else:
+        watched = 'false'
+    path = media_path(_musicvid['file'])
+    play = 'RunScript(' + __addonid__ + \
+        ',musicvideoid=' + str(_musicvid.get('id')) + ')'
+    art = _musicvid['art']
+    streaminfo = media_streamdetails(_musicvid['file'].lower(),
+                                     _musicvid['streamdetails'])
+    # Get runtime from streamdetails or from NFO
+    if streaminfo['duration'] != 0:
+        runtime = str(int((streaminfo['duration'] / 60) + 0.5))
+        runtimesecs = (str(streaminfo['duration'] // 60) + ':'
+                       + '{:02d}'.format(streaminfo['duration'] % 60))
+    else:
+        if isinstance(_musicvid['runtime'], int):
+            runtime = str(int((_musicvid['runtime'] / 60) + 0.5))
+            runtimesecs = (str(_musicvid['runtime'] // 60) + ':'
+                           + '{:02d}'.format(_musicvid['runtime'] % 60))
+        else:
+            runtime = _musicvid['runtime']
+            runtimesecs = ''
+    # autopep8:off
+    return (('DBID',            str(_musicvid.get('id'))),
+            ('Title',           _musicvid.get('title','')),
+            ('Year',            str(_musicvid.get('year',''))),
+            ('Genre',           ' / '.join(_musicvid.get('genre',''))),
+            ('Studio',          ' / '.join(_musicvid.get('studio',''))),
+            ('Artist',          ' / '.join(_musicvid.get('artist',''))),
+            ('Album',           _musicvid.get('album','')),
+            ('Track',           str(_musicvid.get('track',''))),
+            ('Rating',          str(_musicvid.get('rating',''))),
+            ('UserRating',      str(_musicvid.get('userrating',''))),
+            ('Plot',            _musicvid.get('plot','')),
+            ('Tag',             ' / '.join(_musicvid.get('tag',''))),
+            ('Runtime',         runtime),
+            ('Runtimesecs',     runtimesecs),
+            ('Director',        ' / '.join(_musicvid.get('director',''))),
+            ('Art(thumb)',      art.get('thumb','')),
+            ('Art(poster)',     art.get('poster','')),
+            ('Art(fanart)',     art.get('fanart','')),
+            ('Art(clearlogo)',  art.get('clearlogo','')),
+            ('Art(clearart)',   art.get('clearart','')),
+            ('Art(landscape)',  art.get('landscape','')),
+            ('Art(banner)',     art.get('banner','')),
+            ('Art(discart)',    art.get('discart','')),
+            ('Resume',          resume),
+            ('PercentPlayed',   played),
+            ('Watched',         watched),
+            ('File',            _musicvid.get('file','')),
+            ('Path',            path),
+            ('Play',            play),
+            ('VideoCodec',      streaminfo['videocodec']),
+            ('VideoResolution', streaminfo['videoresolution']),
+            ('VideoAspect',     streaminfo['videoaspect']),
+            ('AudioCodec',      streaminfo['audiocodec']),
+            ('AudioChannels',   str(streaminfo['audiochannels'])))
+    # autopep8:on
+
+
+def _getMusicVideosFromPlaylist() -> None:
+    """ retrieves music video info from Kodi library and sets properties
+
+    If a music video playlist is not provided the whole music video library
+    is queried
+    """
+    _result = None
+    if _RALI_GLOBALS['PLAYLIST'] == '':
+        _library = _getLibraryCounts('VideoLibrary.GetMusicVideos', 'musicvideos')
+        _result = _getLibraryItems('VideoLibrary.GetMusicVideos', 'musicvideos',
+                                   'musicvideoid', _MUSICVIDEO_PROPERTIES)
+    else:
+        _library, _result = _getPlaylistItems('musicvideos', _fetchMusicVideos)
+        if _library:
+            _result = _fetchDetails(_result,
+                                    'VideoLibrary.GetMusicVideoDetails',
+                                    'musicvideoid', 'musicvideodetails',
+                                    _MUSICVIDEO_PROPERTIES)
+    if _library is None or _result is None:
+        return
+    _resolveStreamdetails(_result, 'VideoLibrary.GetMusicVideoDetails',
+                          'musicvideoid', 'musicvideodetails')
+    _setVideoProperties(_library['total'], _library['watched'],
+                        _library['unwatched'])
+    _count = 0
+    for _musicvid in _result:
+        if MONITOR.abortRequested():
+            return
+        if _count == _RALI_GLOBALS['LIMIT']:
+            break
+        _count += 1
+        _setItemProperties(_renderItem('musicvideo', _musicvid, _renderMusicVideo), _count)
+
+    if _count != _RALI_GLOBALS['LIMIT']:
+        while _count < _RALI_GLOBALS['LIMIT']:
+            _count += 1
+            _setProperty('%s.%d.Title' %
+                         (_RALI_GLOBALS['PROPERTY'], _count), '')
+
+
+def _listEpisodes(_files: Iterator[dict], _properties: List[str],
+                  _tvshows: set) -> Iterator[Tuple[tuple, dict]]:
+    """Yields the episodes of a playlist listing with their listing position
+
+    TV shows returned by the playlist are expanded once the listing is read,
+    their episodes come last with the position of the show (see
+    _listShowEpisodes).
+
+    Args:
+        _files (Iterator[dict]): Files.GetDirectory items
+        _properties (List[str]): episode properties
+        _tvshows (set): receives the ids of the tv shows listed
+
+    Yields:
+        Tuple[tuple, dict]: listing position and episode
     """
-    t = time.time() - t
-    if t >= 60:
-        return '%.3fm' % (t / 60.0)
-    return '%.3fs' % (t)
+    _shows = {}
+    for _position, _file in enumerate(_files):
+        if _file['type'] == 'tvshow':
+            _tvshows.add(_file['id'])
+            # Playlist return TV Shows - Need to get episodes
+            _shows[_file['id']] = (_position, _file['label'], _file['mpaa'],
+                                   _file['studio'])
+        if _file['type'] == 'episode':
+            _tvshows.add(_file['tvshowid'])
+            yield (_position, 0), _file
+    if not _shows or MONITOR.abortRequested():
+        return
+    if _capabilities().filters:
+        _shows = yield from _listShowEpisodes(_shows, _properties)
+    _requests = [(_tvshowid, _RPC.submit('VideoLibrary.GetEpisodes',
+                                         {'tvshowid': _tvshowid,
+                                          'properties': _properties}))
+                 for _tvshowid in _shows]
+    _responses = _RPC.collect()
+    if MONITOR.abortRequested():
+        return
+    for _tvshowid, _id in _requests:
+        _position, _, _mpaa, _studio = _shows[_tvshowid]
+        _json_response = _responses[_id]
+        _episodes = _json_response.get('result', {}).get('episodes')
+        if not _episodes:
+            log(f'## PLAYLIST {_RALI_GLOBALS["PLAYLIST"]} COULD NOT BE LOADED ##')
+            log(f'JSON RESULT {_json_response}')
+            continue
+        for _offset, _episode in enumerate(_episodes):
+            # Add episode ID when playlist type is TVShow
+            _episode['id'] = _episode['episodeid']
+            # MPAA and studio of the show, shared by all its episodes
+            _episode['mpaa'] = _mpaa
+            _episode['studio'] = _studio
+            yield (_position, _offset), _episode
+
+
+def _listShowEpisodes(_shows: Dict[int, tuple], _properties: List[str]
+                      ) -> Iterator[Tuple[tuple, dict]]:
+    """Yields the episodes of several tv shows read with one library query
+
+    VideoLibrary.GetEpisodes is filtered on the show titles and decoded one
+    episode at a time, the episodes are matched to the shows by tvshowid
+    (shows sharing a title are left out).  The MPAA rating and the studio
+    list of a show are shared by its episodes, not copied.  A show without
+    episodes is skipped, the shows are read one by one only when Kodi
+    refused the query.
 
+    Args:
+        _shows (Dict[int, tuple]): listing position, title, MPAA rating and
+            studios of the shows by tvshowid
+        _properties (List[str]): episode properties, with tvshowid
 
-def _watchedOrResume(_total: int, _watched: int, _unwatched: int, _result: list,
-                     _file: dict) -> Tuple[int, int, int, list]:
-    """Gets watched / in progress status for a library item and increments counters
+    Yields:
+        Tuple[tuple, dict]: listing position of the show and episode
 
-    RESUME and UNWATCHED are bools to determine when an item is valid for inclusion
-    in the _result item list.  eg, if UNWATCHED is true any watched item is
-    excluded.
+    Returns:
+        Dict[int, tuple]: the shows to read one by one, all of them if Kodi
+        refused the query, none otherwise
+    """
+    _titles = sorted({_show[1] for _show in _shows.values()})
+    _episodes = _RPC.items('VideoLibrary.GetEpisodes',
+                           {'properties': _properties,
+                            'filter': {'field': 'tvshow', 'operator': 'is',
+                                       'value': _titles}},
+                           'episodes')
+    if _episodes is None:
+        return _shows
+    _offsets = dict.fromkeys(_shows, 0)
+    for _episode in _episodes:
+        _tvshowid = _episode.get('tvshowid')
+        if _tvshowid not in _shows:
+            continue
+        _position, _, _mpaa, _studio = _shows[_tvshowid]
+        _episode['id'] = _episode['episodeid']
+        _episode['mpaa'] = _mpaa
+        _episode['studio'] = _studio
+        yield (_position, _offsets[_tvshowid]), _episode
+        _offsets[_tvshowid] += 1
+    return {}
+
+
+def _fetchEpisodesFromPlaylist(_pick: bool = False) -> Optional[dict]:
+    """retrieves the episodes of a playlist from Kodi library
+
+    Only the properties needed to pick the widget items are requested, see
+    _candidateProperties.  TV shows returned by the playlist are expanded to
+    their episodes.
 
     Args:
-        _total (int): cumulative number of items
-        _watched (int): cumulative number of watched items
-        _unwatched (int): cumulative number of unwatched items
-        _result (list): cumulative list of processed library items
-        _file (dict): a library item to evaluate watched / in progress status
+        _pick (bool): keep only the episodes shown by the widget
 
     Returns:
-        Tuple[int, int, int, list]: updated totals and item list
-    """
-    _total += 1
-    _playcount: int = _file['playcount']
-    _resume: int = _file['resume']['position']
-    # Add Watched flag and counter for episodes
-    if _playcount == 0:
-        _file['watched'] = 'False'
-        _unwatched += 1
-    else:
-        _file['watched'] = 'True'
-        _watched += 1
-    if ((_RALI_GLOBALS['UNWATCHED'] == 'False' and _RALI_GLOBALS['RESUME'] == 'False')
-        or (_RALI_GLOBALS['UNWATCHED'] == 'True' and _playcount == 0)
-            or (_RALI_GLOBALS['RESUME'] == 'True' and _resume != 0) and _file.get('dateadded')):
-        _result.append(_file)
-    return _total, _watched, _unwatched, _result
+        Optional[dict]: episode counters and items, None if the playlist could
+        not be loaded
+    """
+    _tvshows: set = set()
+    _properties = _candidateProperties(_EPISODE_PROPERTIES, 'tvshowid')
+    _files = _readListing({'directory': _RALI_GLOBALS['PLAYLIST'],
+                           'media': 'video',
+                           'properties': _properties + ['studio', 'mpaa']})
+    if _files is None:
+        return None
+    _library = _readItems(_listEpisodes(_files, _properties, _tvshows),
+                          records.Episode, _pick)
+    if _library is not None:
+        _library['tvshows'] = len(_tvshows)
+    return _library
 
 
-def _getMovies() -> None:
-    """retrieves movie info from Kodi library and sets properties
+def _getEpisodesFromPlaylist() -> None:
+    """retrieves episodes playlist info from Kodi library and sets properties
+
+    """
+    _library, _result = _getPlaylistItems('episodes', _fetchEpisodesFromPlaylist)
+    if _library is None:
+        return
+    _setVideoProperties(_library['total'], _library['watched'],
+                        _library['unwatched'])
+    _setTvShowsProperties(_library['tvshows'])
+    _result = _fetchDetails(_result,
+                            'VideoLibrary.GetEpisodeDetails', 'episodeid',
+                            'episodedetails', _EPISODE_PROPERTIES)
+    _resolveStreamdetails(_result, 'VideoLibrary.GetEpisodeDetails',
+                          'episodeid', 'episodedetails')
+    _count = 0
+    for _episode in _result:
+        if MONITOR.abortRequested():
+            return
+        if _count == _RALI_GLOBALS['LIMIT']:
+            break
+        _count += 1
+        '''
+        if _episode.get('tvshowid'):
+            _json_query = xbmc.executeJSONRPC('{"jsonrpc": "2.0", "method": "VideoLibrary.GetTVShowDetails", "params": { "tvshowid": %s, "properties": ["title", "fanart", "thumbnail"] }, "id": 1}' %(_episode['tvshowid']))
+            _json_pl_response = json.loads(_json_query)
+            _tvshow = _json_pl_response.get('result', {}).get('tvshowdetails')
+        '''
+        _setEpisodeProperties(_episode, _count)
+    if _count != _RALI_GLOBALS['LIMIT']:
+        while _count < _RALI_GLOBALS['LIMIT']:
+            _count += 1
+            _setEpisodeProperties(None, _count)
 
-    If a movie playlist is not provided uses movie titles library node
+
+def _getEpisodes() -> None:
+    """retrieves episode library node info from Kodi library and sets properties
 
     Returns:
         None
     """
-    _result: List[dict] = []
-    _total = 0
-    _unwatched = 0
-    _watched = 0
-    # Request database using JSON
-    if _RALI_GLOBALS['PLAYLIST'] == '':
-        _RALI_GLOBALS['PLAYLIST'] = 'videodb://movies/titles/'
-    if JSON_RPC_NEXUS:
-        _json_query = xbmc.executeJSONRPC(
-            '{"jsonrpc": "2.0", '
-            '"method": "Files.GetDirectory", '
-            f'"params": {{"directory": "{_RALI_GLOBALS["PLAYLIST"]}", '
-            '"media": "video", '
-            '"properties": '
-            '["title", '
-            '"originaltitle", '
-            '"playcount", '
-            '"year", '
-            '"genre", '
-            '"studio", '
-            '"country", '
-            '"tagline", '
-            '"plot", '
-            '"runtime", '
-            '"file", '
-            '"plotoutline", '
-            '"lastplayed", '
-            '"trailer", '
-            '"rating", '
-            '"userrating", '
-            '"resume", '
-            '"art", '
-            '"streamdetails", '
-            '"mpaa", '
-            '"director", '
-            '"dateadded"]'
-            '}, '
-            '"id": 1}')
-    else:
-        _json_query = xbmc.executeJSONRPC(
-            '{"jsonrpc": "2.0", '
-            '"method": "Files.GetDirectory", '
-            f'"params": {{"directory": "{_RALI_GLOBALS["PLAYLIST"]}", '
-            '"media": "video", '
-            '"properties": '
-            '["title", '
-            '"originaltitle", '
-            '"playcount", '
-            '"year", '
-            '"genre", '
-            '"studio", '
-            '"country", '
-            '"tagline", '
-            '"plot", '
-            '"runtime", '
-            '"file", '
-            '"plotoutline", '
-            '"lastplayed", '
-            '"trailer", '
-            '"rating", '
-            '"resume", '
-            '"art", '
-            '"streamdetails", '
-            '"mpaa", '
-            '"director", '
-            '"dateadded"]'
-            '}, '
-            '"id": 1}')
-    _json_pl_response: dict = json.loads(_json_query)
-    # If request return some results
-    _files: dict = _json_pl_response.get('result', {}).get('files')
-    if _files:
-        for _item in _files:
-            if MONITOR.abortRequested():
-                return
-            if _item['filetype'] == 'directory':
-                if JSON_RPC_NEXUS:
-                    _json_query = xbmc.executeJSONRPC(
-                        '{"jsonrpc": "2.0", '
-                        '"method": "Files.GetDirectory", '
-                        '"params": '
-                        f'{{"directory": "{_item["file"]}", '
-                        '"media": "video", '
-                        '"properties": '
-                        '["title", '
-                        '"originaltitle", '
-                        '"playcount", '
-                        '"year", '
-                        '"genre", '
-                        '"studio", '
-                        '"country", '
-                        '"tagline", '
-                        '"plot", '
-                        '"runtime", '
-                        '"file", '
-                        '"plotoutline", '
-                        '"lastplayed", '
-                        '"trailer", '
-                        '"rating", '
-                        '"userrating", '
-                        '"resume", '
-                        '"art", '
-                        '"streamdetails", '
-                        '"mpaa", '
-                        '"director", '
-                        '"dateadded"]'
-                        '}, '
-                        '"id": 1}')
-                else:
-                    _json_query = xbmc.executeJSONRPC(
-                        '{"jsonrpc": "2.0", '
-                        '"method": "Files.GetDirectory", '
-                        '"params": '
-                        f'{{"directory": "{_item["file"]}", '
-                        '"media": "video", '
-                        '"properties": '
-                        '["title", '
-                        '"originaltitle", '
-                        '"playcount", '
-                        '"year", '
-                        '"genre", '
-                        '"studio", '
-                        '"country", '
-                        '"tagline", '
-                        '"plot", '
-                        '"runtime", '
-                        '"file", '
-                        '"plotoutline", '
-                        '"lastplayed", '
-                        '"trailer", '
-                        '"rating", '
-                        '"resume", '
-                        '"art", '
-                        '"streamdetails", '
-                        '"mpaa", '
-                        '"director", '
-                        '"dateadded"]'
-                        '}, '
-                        '"id": 1}')
-                _json_set_response: dict = json.loads(_json_query)
-                _movies: List[dict] = _json_set_response.get(
-                    'result', {}).get('files') or []
-                if not _movies:
-                    log(f'## MOVIESET {_item["file"]} COULD NOT BE LOADED ##')
-                    log(f'JSON RESULT {_json_set_response}')
-                for _movie in _movies:
-                    if MONITOR.abortRequested():
-                        return
-                    _playcount: int = _movie['playcount']
-                    if _RALI_GLOBALS['RESUME'] == 'True':
-                        _resume: int = _movie['resume']['position']
-                    else:
-                        _resume = 0
-                    _total += 1
-                    if _playcount == 0:
-                        _unwatched += 1
-                    else:
-                        _watched += 1
-                    if ((_RALI_GLOBALS['UNWATCHED'] == 'False' and _RALI_GLOBALS['RESUME'] == 'False')
-                        or (_RALI_GLOBALS['UNWATCHED'] == 'True' and _playcount == 0)
-                            or (_RALI_GLOBALS['RESUME'] == 'True' and _resume != 0)):
-                        _result.append(_movie)
-            else:
-                _playcount = _item['playcount']
-                if _RALI_GLOBALS['RESUME'] == 'True':
-                    _resume = _item['resume']['position']
-                else:
-                    _resume = 0
-                _total += 1
-                if _playcount == 0:
-                    _unwatched += 1
-                else:
-                    _watched += 1
-                if ((_RALI_GLOBALS['UNWATCHED'] == 'False' and _RALI_GLOBALS['RESUME'] == 'False')
-                    or (_RALI_GLOBALS['UNWATCHED'] == 'True' and _playcount == 0)
-                        or (_RALI_GLOBALS['RESUME'] == 'True' and _resume != 0)):
-                    _result.append(_item)
-        _setVideoProperties(_total, _watched, _unwatched)
-        _count = 0
-        if _RALI_GLOBALS['METHOD'] == 'Last':
-            _result = sorted(_result, key=itemgetter(
-                'dateadded'), reverse=True)
-        elif _RALI_GLOBALS['METHOD'] == 'Playlist':
-            _result = sorted(_result, key=itemgetter(
-                _RALI_GLOBALS['SORTBY']), reverse=_RALI_GLOBALS['REVERSE'])
-        else:
-            random.shuffle(_result)
-        for _movie in _result:
-            if MONITOR.abortRequested():
-                return
-            if _count == _RALI_GLOBALS['LIMIT']:
-                break
+    _library = _getLibraryCounts('VideoLibrary.GetEpisodes', 'episodes')
+    _result = _getLibraryItems('VideoLibrary.GetEpisodes', 'episodes',
+                               'episodeid', _EPISODE_PROPERTIES)
+    if _library is None or _result is None:
+        return
+    _resolveStreamdetails(_result, 'VideoLibrary.GetEpisodeDetails',
+                          'episodeid', 'episodedetails')
+    _setVideoProperties(_library['total'], _library['watched'],
+                        _library['unwatched'])
+    _setTvShowsProperties(_library['tvshows'])
+    _count = 0
+    for _episode in _result:
+        if MONITOR.abortRequested():
+            return
+        if _count == _RALI_GLOBALS['LIMIT']:
+            break
+        _count += 1
+        _setEpisodeProperties(_episode, _count)
+    if _count != _RALI_GLOBALS['LIMIT']:
+        while _count < _RALI_GLOBALS['LIMIT']:
             _count += 1
-            _json_query = xbmc.executeJSONRPC(
-                '{"jsonrpc": "2.0", '
-                '"method": "VideoLibrary.GetMovieDetails", '
-                '"params": '
-                f'{{"properties": ["streamdetails"], "movieid":{_movie["id"]}}}, '
-                '"id": 1}')
-            _json_query = json.loads(_json_query)
-            if 'result' in _json_query and 'moviedetails' in _json_query['result']:
-                item = _json_query['result']['moviedetails']
-                _movie['streamdetails'] = item['streamdetails']
-            if _movie['resume']['position'] > 0 and float(_movie['resume']['total']) > 0:
-                resume = 'true'
-                played = f'{int((float(_movie["resume"]["position"]) / float(_movie["resume"]["total"])) * 100)}%'
-                playedasint = f'{int((float(_movie["resume"]["position"]) / float(_movie["resume"]["total"])) * 100)}'
-            else:
-                resume = 'false'
-                played = '0%'
-                playedasint = '0'
-            if _movie['playcount'] >= 1:
-                watched = 'true'
-            else:
-                watched = 'false'
-            path = media_path(_movie['file'])
-            play = 'RunScript(' + __addonid__ + ',movieid=' + (
-                str(_movie.get('id')) + ')')
-            art = _movie['art']
-            streaminfo = media_streamdetails(_movie['file'].lower(),
-                                             _movie['streamdetails'])
-            # Get runtime from streamdetails or from NFO
-            if streaminfo['duration'] != 0:
-                runtime = str(int((streaminfo['duration'] / 60) + 0.5))
-            else:
-                if isinstance(_movie['runtime'], int):
-                    runtime = str(int((_movie['runtime'] / 60) + 0.5))
-                else:
-                    runtime = _movie['runtime']
-            # Set window properties
-            # autopep8:off
-            _setProperty('%s.%d.DBID'            % (_RALI_GLOBALS['PROPERTY'], _count), str(_movie.get('id','')))
-            _setProperty('%s.%d.Title'           % (_RALI_GLOBALS['PROPERTY'], _count), _movie.get('title',''))
-            _setProperty('%s.%d.OriginalTitle'   % (_RALI_GLOBALS['PROPERTY'], _count), _movie.get('originaltitle',''))
-            _setProperty('%s.%d.Year'            % (_RALI_GLOBALS['PROPERTY'], _count), str(_movie.get('year','')))
-            _setProperty('%s.%d.Genre'           % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_movie.get('genre','')))
-            _setProperty('%s.%d.Studio'          % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_movie.get('studio','')))
-            _setProperty('%s.%d.Country'         % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_movie.get('country','')))
-            _setProperty('%s.%d.Plot'            % (_RALI_GLOBALS['PROPERTY'], _count), _movie.get('plot',''))
-            _setProperty('%s.%d.PlotOutline'     % (_RALI_GLOBALS['PROPERTY'], _count), _movie.get('plotoutline',''))
-            _setProperty('%s.%d.Tagline'         % (_RALI_GLOBALS['PROPERTY'], _count), _movie.get('tagline',''))
-            _setProperty('%s.%d.Runtime'         % (_RALI_GLOBALS['PROPERTY'], _count), runtime)
-            _setProperty('%s.%d.Rating'          % (_RALI_GLOBALS['PROPERTY'], _count), str(round(float(_movie.get('rating','0')),1)))
-            _setProperty('%s.%d.UserRating'      % (_RALI_GLOBALS['PROPERTY'], _count), str(_movie.get('userrating','0')))
-            _setProperty('%s.%d.Trailer'         % (_RALI_GLOBALS['PROPERTY'], _count), _movie.get('trailer',''))
-            _setProperty('%s.%d.MPAA'            % (_RALI_GLOBALS['PROPERTY'], _count), _movie.get('mpaa',''))
-            _setProperty('%s.%d.Director'        % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_movie.get('director','')))
-            _setProperty('%s.%d.Art(thumb)'      % (_RALI_GLOBALS['PROPERTY'], _count), art.get('thumb',''))
-            _setProperty('%s.%d.Art(poster)'     % (_RALI_GLOBALS['PROPERTY'], _count), art.get('poster',''))
-            _setProperty('%s.%d.Art(fanart)'     % (_RALI_GLOBALS['PROPERTY'], _count), art.get('fanart',''))
-            _setProperty('%s.%d.Art(clearlogo)'  % (_RALI_GLOBALS['PROPERTY'], _count), art.get('clearlogo',''))
-            _setProperty('%s.%d.Art(clearart)'   % (_RALI_GLOBALS['PROPERTY'], _count), art.get('clearart',''))
-            _setProperty('%s.%d.Art(landscape)'  % (_RALI_GLOBALS['PROPERTY'], _count), art.get('landscape',''))
-            _setProperty('%s.%d.Art(banner)'     % (_RALI_GLOBALS['PROPERTY'], _count), art.get('banner',''))
-            _setProperty('%s.%d.Art(discart)'    % (_RALI_GLOBALS['PROPERTY'], _count), art.get('discart',''))
-            _setProperty('%s.%d.Resume'          % (_RALI_GLOBALS['PROPERTY'], _count), resume)
-            _setProperty('%s.%d.PercentPlayed'   % (_RALI_GLOBALS['PROPERTY'], _count), played)
-            _setProperty('%s.%d.Watched'         % (_RALI_GLOBALS['PROPERTY'], _count), watched)
-            _setProperty('%s.%d.File'            % (_RALI_GLOBALS['PROPERTY'], _count), _movie.get('file',''))
-            _setProperty('%s.%d.Path'            % (_RALI_GLOBALS['PROPERTY'], _count), path)
-            _setProperty('%s.%d.Play'            % (_RALI_GLOBALS['PROPERTY'], _count), play)
-            _setProperty('%s.%d.VideoCodec'      % (_RALI_GLOBALS['PROPERTY'], _count), streaminfo['videocodec'])
-            _setProperty('%s.%d.VideoResolution' % (_RALI_GLOBALS['PROPERTY'], _count), streaminfo['videoresolution'])
-            _setProperty('%s.%d.VideoAspect'     % (_RALI_GLOBALS['PROPERTY'], _count), streaminfo['videoaspect'])
-            _setProperty('%s.%d.AudioCodec'      % (_RALI_GLOBALS['PROPERTY'], _count), streaminfo['audiocodec'])
-            _setProperty('%s.%d.AudioChannels'   % (_RALI_GLOBALS['PROPERTY'], _count), str(streaminfo['audiochannels']))
-            # autopep8:on
-
-        if _count != _RALI_GLOBALS['LIMIT']:
-            while _count < _RALI_GLOBALS['LIMIT']:
-                _count += 1
-            _setProperty('%s.%d.Title' %
-                         (_RALI_GLOBALS['PROPERTY'], _count), '')
-    else:
-        log(f'## PLAYLIST {_RALI_GLOBALS["PLAYLIST"]} COULD NOT BE LOADED ##')
-        log(f'JSON RESULT {_json_pl_response}')
+            _setEpisodeProperties(None, _count)
 
 
-def _getMusicVideosFromPlaylist() -> None:
-    """ retrieves music video info from Kodi library and sets properties
+def _fetchMusicCounts() -> Tuple[int, int, int]:
+    """gets the number of artists, albums and songs of the music library
 
-    If a music video playlist is not provided uses music video titles node
+    Only the limits.total of the queries is read, no item is returned
+
+    Returns:
+        Tuple[int, int, int]: artists, albums and songs in the library
     """
-    _result = []
-    _total = 0
-    _unwatched = 0
-    _watched = 0
-    # Request database using JSON
-    if _RALI_GLOBALS['PLAYLIST'] == '':
-        _RALI_GLOBALS['PLAYLIST'] = 'musicdb://musicvideos/titles'
-    if JSON_RPC_NEXUS:
-        _json_query = xbmc.executeJSONRPC(
-            '{"jsonrpc": "2.0", '
-            '"method": "Files.GetDirectory", '
-            '"params": '
-            f'{{"directory": "{_RALI_GLOBALS["PLAYLIST"]}", '
-            '"media": "video", '
-            '"properties": '
-            '["title", '
-            '"playcount", '
-            '"year", '
-            '"genre", '
-            '"studio", '
-            '"album", '
-            '"artist",  '
-            '"track", '
-            '"plot", '
-            '"tag", '
-            '"rating", '
-            '"userrating", '
-            '"runtime", '
-            '"file", '
-            '"lastplayed", '
-            '"resume", '
-            '"art", '
-            '"streamdetails", '
-            '"director", '
-            '"dateadded"]'
-            '}, '
-            '"id": 1}')
-    else:
-        _json_query = xbmc.executeJSONRPC(
-            '{"jsonrpc": "2.0", '
-            '"method": "Files.GetDirectory", '
-            '"params": '
-            f'{{"directory": "{_RALI_GLOBALS["PLAYLIST"]}", '
-            '"media": "video", '
-            '"properties": '
-            '["title", '
-            '"playcount", '
-            '"year", '
-            '"genre", '
-            '"studio", '
-            '"album", '
-            '"artist",  '
-            '"track", '
-            '"plot", '
-            '"tag", '
-            '"rating", '
-            '"runtime", '
-            '"file", '
-            '"lastplayed", '
-            '"resume", '
-            '"art", '
-            '"streamdetails", '
-            '"director", '
-            '"dateadded"]'
-            '}, '
-            '"id": 1}')
-    _json_pl_response: dict = json.loads(_json_query)
-    # If request return some results
-    _files = _json_pl_response.get('result', {}).get('files')
-    if _files:
-        for _item in _files:
-            if MONITOR.abortRequested():
-                return
-            _playcount = _item['playcount']
-            if _RALI_GLOBALS['RESUME'] == 'True':
-                _resume = _item['resume']['position']
-            else:
-                _resume = 0
-            _total += 1
-            if _playcount == 0:
-                _unwatched += 1
-            else:
-                _watched += 1
-            if ((_RALI_GLOBALS['UNWATCHED'] == 'False' and _RALI_GLOBALS['RESUME'] == 'False')
-                or (_RALI_GLOBALS['UNWATCHED'] == 'True' and _playcount == 0)
-                    or (_RALI_GLOBALS['RESUME'] == 'True' and _resume != 0)):
-                _result.append(_item)
-        _setVideoProperties(_total, _watched, _unwatched)
-        _count = 0
-        if _RALI_GLOBALS['METHOD'] == 'Last':
-            _result = sorted(_result, key=itemgetter(
-                'dateadded'), reverse=True)
-        elif _RALI_GLOBALS['METHOD'] == 'Playlist':
-            _result = sorted(_result, key=itemgetter(
-                _RALI_GLOBALS['SORTBY']), reverse=_RALI_GLOBALS['REVERSE'])
-        else:
-            random.shuffle(_result)
-        for _musicvid in _result:
-            if MONITOR.abortRequested():
-                return
-            if _count == _RALI_GLOBALS['LIMIT']:
-                break
-            _count += 1
-            _json_query = xbmc.executeJSONRPC(
-                '{"jsonrpc": "2.0", '
-                '"method": "VideoLibrary.GetMusicVideoDetails", '
-                '"params": '
-                f'{{"properties": ["streamdetails"], "musicvideoid":{_musicvid["id"]} }}, '
-                '"id": 1}')
-            _json_query = json.loads(_json_query)
-            if 'musicvideodetails' in _json_query['result']:
-                item = _json_query['result']['musicvideodetails']
-                _musicvid['streamdetails'] = item['streamdetails']
-            if _musicvid['resume']['position'] > 0 and float(_musicvid['resume']['total']) > 0:
-                resume = 'true'
-                played = f'{int((float(_musicvid["resume"]["position"]) / float(_musicvid["resume"]["total"])) * 100)}%'
-                playedasint = f'{int((float(_musicvid["resume"]["position"]) / float(_musicvid["resume"]["total"])) * 100)}'
-            else:
-                resume = 'false'
-                played = '0%'
-                playedasint = '0'
-            if _musicvid['playcount'] >= 1:
-                watched = 'true'
-            else:
-                watched = 'false'
-            path = media_path(_musicvid['file'])
-            play = 'RunScript(' + __addonid__ + \
-                ',musicvideoid=' + str(_musicvid.get('id')) + ')'
-            art = _musicvid['art']
-            streaminfo = media_streamdetails(_musicvid['file'].lower(),
-                                             _musicvid['streamdetails'])
-            # Get runtime from streamdetails or from NFO
-            if streaminfo['duration'] != 0:
-                runtime = str(int((streaminfo['duration'] / 60) + 0.5))
-                runtimesecs = (str(streaminfo['duration'] // 60) + ':'
-                               + '{:02d}'.format(streaminfo['duration'] % 60))
-            else:
-                if isinstance(_musicvid['runtime'], int):
-                    runtime = str(int((_musicvid['runtime'] / 60) + 0.5))
-                    runtimesecs = (str(_musicvid['runtime'] // 60) + ':'
-                                   + '{:02d}'.format(_musicvid['runtime'] % 60))
-                else:
-                    runtime = _musicvid['runtime']
-            # Set window properties
-            # autopep8:off
-            _setProperty('%s.%d.DBID'            % (_RALI_GLOBALS['PROPERTY'], _count), str(_musicvid.get('id')))
-            _setProperty('%s.%d.Title'           % (_RALI_GLOBALS['PROPERTY'], _count), _musicvid.get('title',''))
-            _setProperty('%s.%d.Year'            % (_RALI_GLOBALS['PROPERTY'], _count), str(_musicvid.get('year','')))
-            _setProperty('%s.%d.Genre'           % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_musicvid.get('genre','')))
-            _setProperty('%s.%d.Studio'          % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_musicvid.get('studio','')))
-            _setProperty('%s.%d.Artist'          % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_musicvid.get('artist','')))
-            _setProperty('%s.%d.Album'           % (_RALI_GLOBALS['PROPERTY'], _count), _musicvid.get('album',''))
-            _setProperty('%s.%d.Track'           % (_RALI_GLOBALS['PROPERTY'], _count), str(_musicvid.get('track','')))
-            _setProperty('%s.%d.Rating'          % (_RALI_GLOBALS['PROPERTY'], _count), str(_musicvid.get('rating','')))
-            _setProperty('%s.%d.UserRating'      % (_RALI_GLOBALS['PROPERTY'], _count), str(_musicvid.get('userrating','')))
-            _setProperty('%s.%d.Plot'            % (_RALI_GLOBALS['PROPERTY'], _count), _musicvid.get('plot',''))
-            _setProperty('%s.%d.Tag'             % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_musicvid.get('tag','')))
-            _setProperty('%s.%d.Runtime'         % (_RALI_GLOBALS['PROPERTY'], _count), runtime)
-            _setProperty('%s.%d.Runtimesecs'     % (_RALI_GLOBALS['PROPERTY'], _count), runtimesecs)
-            _setProperty('%s.%d.Director'        % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_musicvid.get('director','')))
-            _setProperty('%s.%d.Art(thumb)'      % (_RALI_GLOBALS['PROPERTY'], _count), art.get('thumb',''))
-            _setProperty('%s.%d.Art(poster)'     % (_RALI_GLOBALS['PROPERTY'], _count), art.get('poster',''))
-            _setProperty('%s.%d.Art(fanart)'     % (_RALI_GLOBALS['PROPERTY'], _count), art.get('fanart',''))
-            _setProperty('%s.%d.Art(clearlogo)'  % (_RALI_GLOBALS['PROPERTY'], _count), art.get('clearlogo',''))
-            _setProperty('%s.%d.Art(clearart)'   % (_RALI_GLOBALS['PROPERTY'], _count), art.get('clearart',''))
-            _setProperty('%s.%d.Art(landscape)'  % (_RALI_GLOBALS['PROPERTY'], _count), art.get('landscape',''))
-            _setProperty('%s.%d.Art(banner)'     % (_RALI_GLOBALS['PROPERTY'], _count), art.get('banner',''))
-            _setProperty('%s.%d.Art(discart)'    % (_RALI_GLOBALS['PROPERTY'], _count), art.get('discart',''))
-            _setProperty('%s.%d.Resume'          % (_RALI_GLOBALS['PROPERTY'], _count), resume)
-            _setProperty('%s.%d.PercentPlayed'   % (_RALI_GLOBALS['PROPERTY'], _count), played)
-            _setProperty('%s.%d.Watched'         % (_RALI_GLOBALS['PROPERTY'], _count), watched)
-            _setProperty('%s.%d.File'            % (_RALI_GLOBALS['PROPERTY'], _count), _musicvid.get('file',''))
-            _setProperty('%s.%d.Path'            % (_RALI_GLOBALS['PROPERTY'], _count), path)
-            _setProperty('%s.%d.Play'            % (_RALI_GLOBALS['PROPERTY'], _count), play)
-            _setProperty('%s.%d.VideoCodec'      % (_RALI_GLOBALS['PROPERTY'], _count), streaminfo['videocodec'])
-            _setProperty('%s.%d.VideoResolution' % (_RALI_GLOBALS['PROPERTY'], _count), streaminfo['videoresolution'])
-            _setProperty('%s.%d.VideoAspect'     % (_RALI_GLOBALS['PROPERTY'], _count), streaminfo['videoaspect'])
-            _setProperty('%s.%d.AudioCodec'      % (_RALI_GLOBALS['PROPERTY'], _count), streaminfo['audiocodec'])
-            _setProperty('%s.%d.AudioChannels'   % (_RALI_GLOBALS['PROPERTY'], _count), str(streaminfo['audiochannels']))
-            # autopep8:on
-
-        if _count != _RALI_GLOBALS['LIMIT']:
-            while _count < _RALI_GLOBALS['LIMIT']:
-                _count += 1
-                _setProperty('%s.%d.Title' %
-                             (_RALI_GLOBALS['PROPERTY'], _count), '')
-    else:
-        log(f'## PLAYLIST {_RALI_GLOBALS["PLAYLIST"]} COULD NOT BE LOADED ##')
-        log(f'JSON RESULT {_json_pl_response}')
+    _artists, _albums, _songs = (stats.total(_response) or 0 for _response
+                                 in _RPC.batch(stats.music_queries()))
+    return _artists, _albums, _songs
 
 
-def _getEpisodesFromPlaylist() -> None:
-    """retrieves episodes playlist info from Kodi library and sets properties
+def _listSongs(_files: Iterator[dict], _counts: dict) -> Iterator[dict]:
+    """Yields the songs of a playlist listing, counting artists and albums
+
+    Args:
+        _files (Iterator[dict]): Files.GetDirectory items
+        _counts (dict): receives the artist ids, album ids and songs count
 
+    Yields:
+        dict: songs in listing order
     """
-    _result = []
-    _total = 0
-    _unwatched = 0
-    _watched = 0
-    _tvshows = 0
-    _tvshowid = []
-    # Request database using JSON
-    if JSON_RPC_NEXUS:
-        _json_query = xbmc.executeJSONRPC(
-            '{"jsonrpc": "2.0", '
-            '"method": "Files.GetDirectory", '
-            '"params": '
-            f'{{"directory": "{_RALI_GLOBALS["PLAYLIST"]}", '
-            '"media": "video", '
-            '"properties": '
-            '["title", '
-            '"playcount", '
-            '"season", '
-            '"episode", '
-            '"showtitle", '
-            '"plot", '
-            '"file", '
-            '"studio", '
-            '"mpaa", '
-            '"rating", '
-            '"userrating", '
-            '"resume", '
-            '"runtime", '
-            '"tvshowid", '
-            '"art", '
-            '"streamdetails", '
-            '"firstaired", '
-            '"dateadded"] '
-            '}, '
-            '"id": 1}')
-    else:
-        _json_query = xbmc.executeJSONRPC(
-            '{"jsonrpc": "2.0", '
-            '"method": "Files.GetDirectory", '
-            '"params": '
-            f'{{"directory": "{_RALI_GLOBALS["PLAYLIST"]}", '
-            '"media": "video", '
-            '"properties": '
-            '["title", '
-            '"playcount", '
-            '"season", '
-            '"episode", '
-            '"showtitle", '
-            '"plot", '
-            '"file", '
-            '"studio", '
-            '"mpaa", '
-            '"rating", '
-            '"resume", '
-            '"runtime", '
-            '"tvshowid", '
-            '"art", '
-            '"streamdetails", '
-            '"firstaired", '
-            '"dateadded"] '
-            '}, '
-            '"id": 1}')
-    _json_pl_response = json.loads(_json_query)
-    _files = _json_pl_response.get('result', {}).get('files')
-    if _files:
-        for _file in _files:
-            if MONITOR.abortRequested():
-                return
-            if _file['type'] == 'tvshow':
-                _tvshows += 1
-                # Playlist return TV Shows - Need to get episodes
-                if JSON_RPC_NEXUS:
-                    _json_query = xbmc.executeJSONRPC(
-                        '{"jsonrpc": "2.0", '
-                        '"method": "VideoLibrary.GetEpisodes", '
-                        '"params": '
-                        f'{{ "tvshowid": {_file["id"]}, '
-                        '"properties": '
-                        '["title", '
-                        '"playcount", '
-                        '"season", '
-                        '"episode", '
-                        '"showtitle", '
-                        '"plot", '
-                        '"file", '
-                        '"rating", '
-                        '"userrating", '
-                        '"resume", '
-                        '"runtime", '
-                        '"tvshowid", '
-                        '"art", '
-                        '"streamdetails", '
-                        '"firstaired", '
-                        '"dateadded"] '
-                        '}, '
-                        '"id": 1}')
-                else:
-                    _json_query = xbmc.executeJSONRPC(
-                        '{"jsonrpc": "2.0", '
-                        '"method": "VideoLibrary.GetEpisodes", '
-                        '"params": '
-                        f'{{ "tvshowid": {_file["id"]}, '
-                        '"properties": '
-                        '["title", '
-                        '"playcount", '
-                        '"season", '
-                        '"episode", '
-                        '"showtitle", '
-                        '"plot", '
-                        '"file", '
-                        '"rating", '
-                        '"resume", '
-                        '"runtime", '
-                        '"tvshowid", '
-                        '"art", '
-                        '"streamdetails", '
-                        '"firstaired", '
-                        '"dateadded"] '
-                        '}, '
-                        '"id": 1}')
-                _json_response = json.loads(_json_query)
-                _episodes = _json_response.get('result', {}).get('episodes')
-                if _episodes:
-                    for _episode in _episodes:
-                        if MONITOR.abortRequested():
-                            return
-                        # Add TV Show fanart and thumbnail for each episode
-                        art = _episode['art']
-                        # Add episode ID when playlist type is TVShow
-                        _episode['id'] = _episode['episodeid']
-                        _episode['tvshowfanart'] = art.get('tvshow.fanart')
-                        _episode['tvshowthumb'] = art.get('thumb')
-                        # Set MPAA and studio for all episodes
-                        _episode['mpaa'] = _file['mpaa']
-                        _episode['studio'] = _file['studio']
-                        _total, _watched, _unwatched, _result = _watchedOrResume(
-                            _total, _watched, _unwatched, _result, _episode)
-                else:
-                    log(
-                        f'## PLAYLIST {_RALI_GLOBALS["PLAYLIST"]} COULD NOT BE LOADED ##')
-                    log(f'JSON RESULT {_json_response}')
-            if _file['type'] == 'episode':
-                _id = _file['tvshowid']
-                if _id not in _tvshowid:
-                    _tvshows += 1
-                    _tvshowid.append(_id)
-                # Playlist return TV Shows - Nothing else to do
-                _total, _watched, _unwatched, _result = _watchedOrResume(
-                    _total, _watched, _unwatched, _result, _file)
-        _setVideoProperties(_total, _watched, _unwatched)
-        _setTvShowsProperties(_tvshows)
-        _count = 0
-        if _RALI_GLOBALS['METHOD'] == 'Last':
-            _result = sorted(_result, key=itemgetter(
-                'dateadded'), reverse=True)
-        elif _RALI_GLOBALS['METHOD'] == 'Playlist':
-            _result = sorted(_result, key=itemgetter(
-                _RALI_GLOBALS['SORTBY']), reverse=_RALI_GLOBALS['REVERSE'])
-        else:
-            random.shuffle(_result)
-        for _episode in _result:
-            if MONITOR.abortRequested():
-                return
-            if _count == _RALI_GLOBALS['LIMIT']:
-                break
-            _count += 1
-            '''
-            if _episode.get('tvshowid'):
-                _json_query = xbmc.executeJSONRPC('{"jsonrpc": "2.0", "method": "VideoLibrary.GetTVShowDetails", "params": { "tvshowid": %s, "properties": ["title", "fanart", "thumbnail"] }, "id": 1}' %(_episode['tvshowid']))
-                _json_pl_response = json.loads(_json_query)
-                _tvshow = _json_pl_response.get('result', {}).get('tvshowdetails')
-            '''
-            _setEpisodeProperties(_episode, _count)
-        if _count != _RALI_GLOBALS['LIMIT']:
-            while _count < _RALI_GLOBALS['LIMIT']:
-                _count += 1
-                _setEpisodeProperties(None, _count)
-    else:
-        log(f'# 01 # PLAYLIST {_RALI_GLOBALS["PLAYLIST"]} COULD NOT BE LOADED ##')
-        log(f'JSON RESULT {_json_pl_response}')
+    for _file in _files:
+        _counts['songs'] += 1
+        _counts['artists'].update(_file.get('artistid', []))
+        _counts['albums'].add(_file.get('albumid'))
+        yield _file
 
 
-def _getEpisodes() -> None:
-    """retrieves episode library node info from Kodi library and sets properties
+def _fetchMusic(_pick: bool = False) -> Optional[dict]:
+    """gets albums/songs from an album/songs playlist and retrieves libary data for them
+
+    Songs are kept as listed by Files.GetDirectory, their details are only
+    read for the songs shown by the widget (see _getMusicFromPlaylist)
+
+    Args:
+        _pick (bool): keep only the songs shown by the widget, the listing
+            is not decoded past them when the library counters are read
+            from Kodi
 
     Returns:
-        None
+        Optional[dict]: music counters and albums or songs, None if the
+        playlist could not be loaded
     """
-    _result = []
-    _total = 0
-    _unwatched = 0
-    _watched = 0
-    _tvshows = 0
-    _tvshowid = []
     # Request database using JSON
-    if JSON_RPC_NEXUS:
-        _json_query = xbmc.executeJSONRPC(
-            '{"jsonrpc": "2.0", '
-            '"method": "VideoLibrary.GetEpisodes", '
-            '"params": '
-            '{ "properties": '
-            '["title", '
-            '"playcount", '
-            '"season", '
-            '"episode", '
-            '"showtitle", '
-            '"plot", '
-            '"file", '
-            '"studio", '
-            '"mpaa", '
-            '"rating", '
-            '"userrating", '
-            '"resume", '
-            '"runtime", '
-            '"tvshowid", '
-            '"art", '
-            '"streamdetails", '
-            '"firstaired", '
-            '"dateadded"]'
-            '}, '
-            '"id": 1}')
-    else:
-        _json_query = xbmc.executeJSONRPC(
-            '{"jsonrpc": "2.0", '
-            '"method": "VideoLibrary.GetEpisodes", '
-            '"params": '
-            '{ "properties": '
-            '["title", '
-            '"playcount", '
-            '"season", '
-            '"episode", '
-            '"showtitle", '
-            '"plot", '
-            '"file", '
-            '"studio", '
-            '"mpaa", '
-            '"rating", '
-            '"resume", '
-            '"runtime", '
-            '"tvshowid", '
-            '"art", '
-            '"streamdetails", '
-            '"firstaired", '
-            '"dateadded"]'
-            '}, '
-            '"id": 1}')
-    _json_pl_response = json.loads(_json_query)
-    # If request return some results
-    _episodes = _json_pl_response.get('result', {}).get('episodes')
-    if _episodes:
-        for _item in _episodes:
-            if MONITOR.abortRequested():
-                return
-            _id = _item['tvshowid']
-            if _id not in _tvshowid:
-                _tvshows += 1
-                _tvshowid.append(_id)
-            # Add episode ID
-            _item['id'] = _item['episodeid']
-            _total, _watched, _unwatched, _result = _watchedOrResume(
-                _total, _watched, _unwatched, _result, _item)
-        _setVideoProperties(_total, _watched, _unwatched)
-        _setTvShowsProperties(_tvshows)
-        _count = 0
-        if _RALI_GLOBALS['METHOD'] == 'Last':
-            _result = sorted(_result, key=itemgetter(
-                'dateadded'), reverse=True)
-        elif _RALI_GLOBALS['METHOD'] == 'Playlist':
-            _result = sorted(_result, key=itemgetter(
-                _RALI_GLOBALS['SORTBY']), reverse=_RALI_GLOBALS['REVERSE'])
+    _params = {'directory': _RALI_GLOBALS['PLAYLIST'],
+               'media': 'music',
+               'properties': ['dateadded']}
+    if _RALI_GLOBALS['PLAYLIST'] != MUSIC_LIBRARY:
+        # playlist artists and albums are counted from the listing
+        _params['properties'] += ['albumid', 'artistid']
+    _sort = planner.sort_clause(_RALI_GLOBALS['METHOD'], _RALI_GLOBALS['SORTBY'],
+                                _RALI_GLOBALS['REVERSE'])
+    if _sort:
+        _params['sort'] = _sort
+    _first, _files = _openListing(_params)
+    if _first is None:
+        return None
+    #  Music type can be either album or song based on playlist type
+    if _first.get('type') == 'album':
+        _albumslist = [_file for _file in _files if _file['type'] == 'album']
+        # Album playlist so count songs per album, artists from the listing
+        _responses = _RPC.batch(stats.album_songs_queries(
+            _album['id'] for _album in _albumslist))
+        if MONITOR.abortRequested():
+            return None
+        _songs = sum(stats.total(_response) or 0 for _response in _responses)
+        _artists = len({tuple(_album.get('artistid', [])) for _album in _albumslist})
+        return {'type': 'album',
+                'artists': _artists,
+                'albums': len(_albumslist),
+                'songs': _songs,
+                'items': [records.Album(_album) for _album in _albumslist]}
+    if _first.get('type') == 'song':
+        _counts = None
+        if _RALI_GLOBALS['PLAYLIST'] == MUSIC_LIBRARY:
+            _artists, _albums, _songs = _fetchMusicCounts()
         else:
-            random.shuffle(_result)
-        for _episode in _result:
-            if MONITOR.abortRequested():
-                return
-            if _count == _RALI_GLOBALS['LIMIT']:
-                break
-            _count += 1
-            _setEpisodeProperties(_episode, _count)
-        if _count != _RALI_GLOBALS['LIMIT']:
-            while _count < _RALI_GLOBALS['LIMIT']:
-                _count += 1
-                _setEpisodeProperties(None, _count)
-    else:
-        log(f'## PLAYLIST {_RALI_GLOBALS["PLAYLIST"]} COULD NOT BE LOADED ##')
-        log(f'JSON RESULT {_json_pl_response}')
+            _counts = {'artists': set(), 'albums': set(), 'songs': 0}
+            _files = _listSongs(_files, _counts)
+        # Files.GetDirectory listed the latest songs first for Last widgets
+        _songlist = (records.Song(_file) for _file in _files)
+        if not _pick:
+            _items = list(_songlist)
+        elif _RALI_GLOBALS['METHOD'] != 'Last':
+            # only Last widgets show the songs in listing order
+            _items = selection.sample(_songlist, _RALI_GLOBALS['LIMIT'])
+        else:
+            _items = list(itertools.islice(_songlist, _RALI_GLOBALS['LIMIT']))
+            if _counts is not None:
+                # the playlist counters need the rest of the listing
+                for _ in _files:
+                    pass
+        if _counts is not None:
+            _artists = len(_counts['artists'])
+            _albums = len(_counts['albums'])
+            _songs = _counts['songs']
+        return {'type': 'song',
+                'artists': _artists,
+                'albums': _albums,
+                'songs': _songs,
+                'items': _items}
+    log(f'## PLAYLIST {_RALI_GLOBALS["PLAYLIST"]} COULD NOT BE LOADED ##')
+    return None
 
 
 def _getMusicFromPlaylist() -> None:
-    """gets albums/songs from an album/songs playlist and retrieves libary data for them
+    """gets albums/songs from an album/songs playlist and sets properties
 
     The album details are provided as window properties.  If a playlist is not
     provided uses library songs node.  Artist and mixed playlists not supported
     """
-
-    _result = []
-    _artists = 0
-    _artistsid = []
-    _albums = 0
-    _albumslist = []
-    _albumsid = []
-    _songs = 0
-    _songslist = []
-    # Request database using JSON
     if _RALI_GLOBALS['PLAYLIST'] == '':
-        _RALI_GLOBALS['PLAYLIST'] = 'musicdb://songs/'
-    # _json_query = xbmc.executeJSONRPC('{"jsonrpc": "2.0", "method": "Files.GetDirectory", "params": {"directory": "%s", "media": "music", "properties": ["title", "description", "albumlabel", "artist", "genre", "year", "thumbnail", "fanart", "rating", "userrating", "playcount", "dateadded"]}, "id": 1}' %(PLAYLIST))
-    if _RALI_GLOBALS['METHOD'] == 'Random':
-        _json_query = xbmc.executeJSONRPC(
-            '{"jsonrpc": "2.0", '
-            '"method": "Files.GetDirectory", '
-            '"params": '
-            f'{{"directory": "{_RALI_GLOBALS["PLAYLIST"]}", '
-            '"media": "music", '
-            '"properties": ["dateadded"], '
-            '"sort": {"method": "random"}}, '
-            '"id": 1}')
-    elif _RALI_GLOBALS['METHOD'] == 'Last':
-        _json_query = xbmc.executeJSONRPC(
-            '{"jsonrpc": "2.0", '
-            '"method": "Files.GetDirectory", '
-            '"params": '
-            f'{{"directory": "{_RALI_GLOBALS["PLAYLIST"]}", '
-            '"media": "music", '
-            '"properties": ["dateadded"], '
-            '"sort": '
-            '{"order": "descending", '
-            '"method": "dateadded"}}, '
-            '"id": 1}')
-    elif _RALI_GLOBALS['METHOD'] == 'Playlist':
-        order = 'ascending'
-        if _RALI_GLOBALS['REVERSE']:
-            order = 'descending'
-        _json_query = xbmc.executeJSONRPC(
-            '{"jsonrpc": "2.0", '
-            '"method": "Files.GetDirectory", '
-            '"params": '
-            f'{{"directory": "{_RALI_GLOBALS["PLAYLIST"]}", '
-            '"media": "music", '
-            '"properties": ["dateadded"], '
-            '"sort": '
-            f'{{"order": "{order}", '
-            f'"method": "{_RALI_GLOBALS["SORTBY"]}"}}}}, '
-            '"id": 1}')
+        _RALI_GLOBALS['PLAYLIST'] = MUSIC_LIBRARY
+    _key = ('music', _RALI_GLOBALS['PLAYLIST'], _RALI_GLOBALS['METHOD'],
+            _RALI_GLOBALS['SORTBY'], _RALI_GLOBALS['REVERSE'])
+    if _SOURCE_CACHE is None:
+        # nothing is kept, only the songs shown are held (see _fetchMusic)
+        _library = _fetchMusic(True)
     else:
-        _json_query = xbmc.executeJSONRPC(
-            '{"jsonrpc": "2.0", '
-            '"method": "Files.GetDirectory", '
-            '"params": '
-            f'{{"directory": "{_RALI_GLOBALS["PLAYLIST"]}", '
-            '"media": "music", '
-            '"properties": ["dateadded"]}, '
-            '"id": 1}')
-    _json_pl_response = json.loads(_json_query)
-    # If request return some results
-    _files: List[dict] = _json_pl_response.get('result', {}).get('files')
-    #  Music type can be either album or song based on playlist type
-    if _files and _files[0].get('type') == 'album':
-        for _file in _files:
-            if MONITOR.abortRequested():
-                return
-            if _file['type'] == 'album':
-                _albumslist.append(_file)
-                _albumid = _file['id']
-                # Album playlist so get path from songs
-                _json_query = xbmc.executeJSONRPC(
-                    '{"jsonrpc":"2.0", '
-                    '"method":"AudioLibrary.GetSongs", '
-                    '"params":'
-                    f'{{"filter":{{"albumid": {_albumid}}}, '
-                    '"properties":["artistid"]}, '
-                    '"id": 1}')
-                _json_pl_response = json.loads(_json_query)
-                _result = _json_pl_response.get('result', {}).get('songs')
-                if _result:
-                    _songs += len(_result)
-                    _artistid = _result[0]['artistid']
-                    if _artistid not in _artistsid:
-                        _artists += 1
-                        _artistsid.append(_artistid)
-            # _albumid = _file.get('albumid', _file.get('id'))
-            # _albumpath = os.path.split(_file['file'])[0]
-            # _artistpath = os.path.split(_albumpath)[0]
-            # _songs += 1
-            '''
-            if _albumid not in _albumsid:
-                _file['id'] = _albumid
-                _file['albumPath'] = _albumpath
-                _file['artistPath'] = _artistpath
-                _albumslist.append(_file)
-                _albumsid.append(_albumid)
-            '''
-        _setMusicProperties(_artists, len(_files), _songs)
-        if _RALI_GLOBALS['METHOD'] == 'Last':
-            _albumslist = sorted(
-                _albumslist, key=itemgetter('dateadded'), reverse=True)
+        _library = _getSource(_key, _fetchMusic)
+    if _library is None:
+        return
+    _setMusicProperties(_library['artists'], _library['albums'],
+                        _library['songs'])
+    if _library['type'] == 'album':
+        _index = _sourceIndex(_key, _library)
+        if _RALI_GLOBALS['METHOD'] == 'Last' and _index is not None:
+            # cached albums are walked from the latest (see resources/lib/index.py)
+            _albumslist = _index.select('Last', _RALI_GLOBALS['LIMIT'])
+        elif _RALI_GLOBALS['METHOD'] == 'Last':
+            _albumslist = selection.top(_library['items'], _RALI_GLOBALS['LIMIT'],
+                                        attrgetter('dateadded'), reverse=True)
         else:
-            random.shuffle(_albumslist)
+            _albumslist = selection.sample(_library['items'], _RALI_GLOBALS['LIMIT'])
+        _responses = _RPC.batch(
+            [('AudioLibrary.GetAlbumDetails',
+              {'albumid': _album.id,
+               'properties': _propertyList(_ALBUM_PROPERTIES)})
+             for _album in _albumslist])
         _count = 0
-        for _album in _albumslist:
+        for _album, _json_pl_response in zip(_albumslist, _responses):
             if MONITOR.abortRequested():
                 return
-            if _count == _RALI_GLOBALS['LIMIT']:
-                break
             _count += 1
-            _albumid = _album['id']
-            if JSON_RPC_NEXUS:
-                _json_query = xbmc.executeJSONRPC(
-                    '{"jsonrpc": "2.0", '
-                    '"method": "AudioLibrary.GetAlbumDetails", '
-                    '"params":'
-                    f'{{"albumid": {_albumid}, '
-                    '"properties":'
-                    '["title", '
-                    '"description", '
-                    '"albumlabel", '
-                    '"theme", '
-                    '"mood", '
-                    '"style", '
-                    '"type", '
-                    '"artist", '
-                    '"genre", '
-                    '"year", '
-                    '"thumbnail", '
-                    '"fanart", '
-                    '"rating", '
-                    '"userrating", '
-                    '"playcount"]}, '
-                    '"id": 1}')
-            else:
-                _json_query = xbmc.executeJSONRPC(
-                    '{"jsonrpc": "2.0", '
-                    '"method": "AudioLibrary.GetAlbumDetails", '
-                    '"params":'
-                    f'{{"albumid": {_albumid}, '
-                    '"properties":'
-                    '["title", '
-                    '"description", '
-                    '"albumlabel", '
-                    '"theme", '
-                    '"mood", '
-                    '"style", '
-                    '"type", '
-                    '"artist", '
-                    '"genre", '
-                    '"year", '
-                    '"thumbnail", '
-                    '"fanart", '
-                    '"rating", '
-                    '"playcount"]}, '
-                    '"id": 1}')
-            _json_pl_response = json.loads(_json_query)
             # If request return some results
-            _album: dict = _json_pl_response.get(
+            _details: dict = _json_pl_response.get(
                 'result', {}).get('albumdetails')
-            _setAlbumPROPERTIES(_album, _count)
+            _setAlbumPROPERTIES(_album.with_details(_details) if _details else None,
+                                _count)
         if _count <= _RALI_GLOBALS['LIMIT']:
             while _count < _RALI_GLOBALS['LIMIT']:
                 _count += 1
                 _setAlbumPROPERTIES(None, _count)
-    elif _files and _files[0].get('type') == 'song':
-        for _file in _files:
-            if MONITOR.abortRequested():
-                return
-            _songid = _file['id']
-            if JSON_RPC_NEXUS:
-                _json_query = xbmc.executeJSONRPC(
-                    '{"jsonrpc": "2.0", '
-                    '"method": "AudioLibrary.GetSongDetails", '
-                    '"params":'
-                    f'{{"songid": {_songid}, '
-                    '"properties":'
-                    '["title", '
-                    '"artist", '
-                    '"artistid", '
-                    '"dateadded", '
-                    '"genre", '
-                    '"year", '
-                    '"rating", '
-                    '"album", '
-                    '"albumid", '
-                    '"track", '
-                    '"duration", '
-                    '"comment", '
-                    '"thumbnail", '
-                    '"fanart", '
-                    '"userrating", '
-                    '"playcount"]}, '
-                    '"id": 1}')
-            else:
-                _json_query = xbmc.executeJSONRPC(
-                    '{"jsonrpc": "2.0", '
-                    '"method": "AudioLibrary.GetSongDetails", '
-                    '"params":'
-                    f'{{"songid": {_songid}, '
-                    '"properties":'
-                    '["title", '
-                    '"artist", '
-                    '"artistid", '
-                    '"dateadded", '
-                    '"genre", '
-                    '"year", '
-                    '"rating", '
-                    '"album", '
-                    '"albumid", '
-                    '"track", '
-                    '"duration", '
-                    '"comment", '
-                    '"thumbnail", '
-                    '"fanart", '
-                    '"playcount"]}, '
-                    '"id": 1}')
-            _json_pl_response = json.loads(_json_query)
-            _result: dict = _json_pl_response.get(
-                'result', {}).get('songdetails')
-            if _result:
-                _songslist.append(_result)
-                for _artistid in _result['artistid']:
-                    if _artistid not in _artistsid:
-                        _artists += 1
-                        _artistsid.append(_artistid)
-                if _result['albumid'] not in _albumslist:
-                    _albums += 1
-                    _albumslist.append(_result['albumid'])
-        _setMusicProperties(_artists, _albums, len(_files))
+    else:
+        # Files.GetDirectory listed the latest songs first, other methods
+        # show random songs.  Only the songs shown are read with their details
         if _RALI_GLOBALS['METHOD'] == 'Last':
-            _songslist = sorted(_songslist, key=itemgetter(
-                'dateadded'), reverse=True)
+            _songslist = _library['items'][:_RALI_GLOBALS['LIMIT']]
         else:
-            random.shuffle(_songslist)
+            _songslist = selection.sample(_library['items'], _RALI_GLOBALS['LIMIT'])
+        _responses = _RPC.batch(
+            [('AudioLibrary.GetSongDetails',
+              {'songid': _song.id,
+               'properties': _propertyList(_SONG_PROPERTIES)})
+             for _song in _songslist])
         _count = 0
-        for _song in _songslist:
+        for _song, _json_pl_response in zip(_songslist, _responses):
             if MONITOR.abortRequested():
                 return
-            if _count == _RALI_GLOBALS['LIMIT']:
-                break
+            _details: dict = _json_pl_response.get(
+                'result', {}).get('songdetails')
+            if not _details:
+                continue
             _count += 1
-            _setSongPROPERTIES(_song, _count)
+            _setSongPROPERTIES(_song.with_details(_details), _count)
         if _count <= _RALI_GLOBALS['LIMIT']:
             while _count < _RALI_GLOBALS['LIMIT']:
                 _count += 1
                 _setSongPROPERTIES(None, _count)
-    else:
-        log(f'## PLAYLIST {_RALI_GLOBALS["PLAYLIST"]} COULD NOT BE LOADED ##')
-        log(f'JSON RESULT {_json_pl_response}')
 
 
 def _clearProperties() -> None:
-    """Clears any existing window properties for the current playlist
+    """Clears the summary window properties not set for the current playlist
 
     Returns:
         None
     """
     # Reset window Properties
-    WINDOW.clearProperty(f'{_RALI_GLOBALS["PROPERTY"]}.Loaded')
-    WINDOW.clearProperty(f'{_RALI_GLOBALS["PROPERTY"]}.Count')
-    WINDOW.clearProperty(f'{_RALI_GLOBALS["PROPERTY"]}.Watched')
-    WINDOW.clearProperty(f'{_RALI_GLOBALS["PROPERTY"]}.Unwatched')
-    WINDOW.clearProperty(f'{_RALI_GLOBALS["PROPERTY"]}.Artists')
-    WINDOW.clearProperty(f'{_RALI_GLOBALS["PROPERTY"]}.Albums')
-    WINDOW.clearProperty(f'{_RALI_GLOBALS["PROPERTY"]}.Songs')
-    WINDOW.clearProperty(f'{_RALI_GLOBALS["PROPERTY"]}.Type')
+    for _name in ('Count', 'Watched', 'Unwatched', 'Artists', 'Albums',
+                  'Songs', 'Type'):
+        _RESULT.setdefault(f'{_RALI_GLOBALS["PROPERTY"]}.{_name}', '')
 
 
 def _setMusicProperties(_artists: int, _albums: int, _songs: int) -> None:
@@ -1249,246 +1892,254 @@ def _setTvShowsProperties(_tvshows) -> None:
     _setProperty(f'{_RALI_GLOBALS["PROPERTY"]}.TvShows', str(_tvshows))
 
 
+def _renderEpisode(_episode: records.Episode) -> payloads.Payload:
+    """Renders the window properties of an episode
+
+    Args:
+        _episode (records.Episode): episode with its details
+
+    Returns:
+        payloads.Payload: window properties of the item
+    """
+    episode = ('%.2d' % float(_episode['episode']))
+    season = '%.2d' % float(_episode['season'])
+    episodeno = 's%se%s' % (season, episode)
+    rating = str(round(float(_episode['rating']), 1))
+    if 'userrating' in _episode:
+        userrating = str(_episode['userrating'])
+    else:
+        userrating = ''
+    resume, played = _resumeState(_episode['resume'])
+    art = _episode['art']
+    path = media_path(_episode['file'])
+    play = 'RunScript(' + __addonid__ + ',episodeid=' + \
+        str(_episode.get('id')) + ')'
+    runtime = str(int((_episode['runtime'] / 60) + 0.5))
+    streaminfo = media_streamdetails(_episode['file'].lower(),
+                                     _episode['streamdetails'])
+    # autopep8:off
+    return (('DBID',                  str(_episode.get('id'))),
+            ('Title',                 _episode.get('title','')),
+            ('Episode',               episode),
+            ('EpisodeNo',             episodeno),
+            ('Season',                season),
+            ('Plot',                  _episode.get('plot','')),
+            ('TVshowTitle',           _episode.get('showtitle','')),
+            ('Rating',                rating),
+            ('UserRating',            userrating),
+            ('Art(thumb)',            art.get('thumb','')),
+            ('Art(tvshow.fanart)',    art.get('tvshow.fanart','')),
+            ('Art(tvshow.poster)',    art.get('tvshow.poster','')),
+            ('Art(tvshow.banner)',    art.get('tvshow.banner','')),
+            ('Art(tvshow.clearlogo)', art.get('tvshow.clearlogo','')),
+            ('Art(tvshow.clearart)',  art.get('tvshow.clearart','')),
+            ('Art(tvshow.landscape)', art.get('tvshow.landscape','')),
+            ('Art(fanart)',           art.get('tvshow.fanart','')),
+            ('Art(poster)',           art.get('tvshow.poster','')),
+            ('Art(banner)',           art.get('tvshow.banner','')),
+            ('Art(clearlogo)',        art.get('tvshow.clearlogo','')),
+            ('Art(clearart)',         art.get('tvshow.clearart','')),
+            ('Art(landscape)',        art.get('tvshow.landscape','')),
+            ('Resume',                resume),
+            ('Watched',               _episode.get('watched','')),
+            ('Runtime',               runtime),
+            ('Premiered',             _episode.get('firstaired','')),
+            ('PercentPlayed',         played),
+            ('File',                  _episode.get('file','')),
+            ('MPAA',                  _episode.get('mpaa','')),
+            ('Studio',                ' / '.join(_episode.get('studio',''))),
+            ('Path',                  path),
+            ('Play',                  play),
+            ('VideoCodec',            streaminfo['videocodec']),
+            ('VideoResolution',       streaminfo['videoresolution']),
+            ('VideoAspect',           streaminfo['videoaspect']),
+            ('AudioCodec',            streaminfo['audiocodec']),
+            ('AudioChannels',         str(streaminfo['audiochannels'])))
+    # autopep8:on
+
+
 def _setEpisodeProperties(_episode, _count) -> None:
     """sets Kodi summary window properties for episodes
 
     Args:
-        _episode (dict): details for an episode
+        _episode (records.Episode): episode with its details
         _count (_type_): episode index
     """
     if _episode:
-        _json_query = xbmc.executeJSONRPC(
-            '{"jsonrpc": "2.0", '
-            '"method": "VideoLibrary.GetEpisodeDetails", '
-            '"params": '
-            '{"properties": ["streamdetails"], '
-            f'"episodeid":{_episode["id"]} }}, '
-            '"id": 1}')
-        _json_query = json.loads(_json_query)
-        if 'episodedetails' in _json_query['result']:
-            item = _json_query['result']['episodedetails']
-            _episode['streamdetails'] = item['streamdetails']
-        episode = ('%.2d' % float(_episode['episode']))
-        season = '%.2d' % float(_episode['season'])
-        episodeno = 's%se%s' % (season, episode)
-        rating = str(round(float(_episode['rating']), 1))
-        if 'userrating' in _episode:
-            userrating = str(_episode['userrating'])
-        else:
-            userrating = ''
-        if _episode['resume']['position'] > 0 and float(_episode['resume']['total']) > 0:
-            resume = 'true'
-            played = f'{int((float(_episode["resume"]["position"]) / float(_episode["resume"]["total"])) * 100)}%'
-            playedasint = f'{int((float(_episode["resume"]["position"]) / float(_episode["resume"]["total"])) * 100)}'
-        else:
-            resume = 'false'
-            played = '0%'
-            playedasint = '0'
-        art = _episode['art']
-        path = media_path(_episode['file'])
-        play = 'RunScript(' + __addonid__ + ',episodeid=' + \
-            str(_episode.get('id')) + ')'
-        runtime = str(int((_episode['runtime'] / 60) + 0.5))
-        streaminfo = media_streamdetails(_episode['file'].lower(),
-                                         _episode['streamdetails'])
-        # autopep8:off
-        _setProperty('%s.%d.DBID'                  % (_RALI_GLOBALS['PROPERTY'], _count), str(_episode.get('id')))
-        _setProperty('%s.%d.Title'                 % (_RALI_GLOBALS['PROPERTY'], _count), _episode.get('title',''))
-        _setProperty('%s.%d.Episode'               % (_RALI_GLOBALS['PROPERTY'], _count), episode)
-        _setProperty('%s.%d.EpisodeNo'             % (_RALI_GLOBALS['PROPERTY'], _count), episodeno)
-        _setProperty('%s.%d.Season'                % (_RALI_GLOBALS['PROPERTY'], _count), season)
-        _setProperty('%s.%d.Plot'                  % (_RALI_GLOBALS['PROPERTY'], _count), _episode.get('plot',''))
-        _setProperty('%s.%d.TVshowTitle'           % (_RALI_GLOBALS['PROPERTY'], _count), _episode.get('showtitle',''))
-        _setProperty('%s.%d.Rating'                % (_RALI_GLOBALS['PROPERTY'], _count), rating)
-        _setProperty('%s.%d.UserRating'            % (_RALI_GLOBALS['PROPERTY'], _count), userrating)
-        _setProperty('%s.%d.Art(thumb)'            % (_RALI_GLOBALS['PROPERTY'], _count), art.get('thumb',''))
-        _setProperty('%s.%d.Art(tvshow.fanart)'    % (_RALI_GLOBALS['PROPERTY'], _count), art.get('tvshow.fanart',''))
-        _setProperty('%s.%d.Art(tvshow.poster)'    % (_RALI_GLOBALS['PROPERTY'], _count), art.get('tvshow.poster',''))
-        _setProperty('%s.%d.Art(tvshow.banner)'    % (_RALI_GLOBALS['PROPERTY'], _count), art.get('tvshow.banner',''))
-        _setProperty('%s.%d.Art(tvshow.clearlogo)' % (_RALI_GLOBALS['PROPERTY'], _count), art.get('tvshow.clearlogo',''))
-        _setProperty('%s.%d.Art(tvshow.clearart)'  % (_RALI_GLOBALS['PROPERTY'], _count), art.get('tvshow.clearart',''))
-        _setProperty('%s.%d.Art(tvshow.landscape)' % (_RALI_GLOBALS['PROPERTY'], _count), art.get('tvshow.landscape',''))
-        _setProperty('%s.%d.Art(fanart)'           % (_RALI_GLOBALS['PROPERTY'], _count), art.get('tvshow.fanart',''))
-        _setProperty('%s.%d.Art(poster)'           % (_RALI_GLOBALS['PROPERTY'], _count), art.get('tvshow.poster',''))
-        _setProperty('%s.%d.Art(banner)'           % (_RALI_GLOBALS['PROPERTY'], _count), art.get('tvshow.banner',''))
-        _setProperty('%s.%d.Art(clearlogo)'        % (_RALI_GLOBALS['PROPERTY'], _count), art.get('tvshow.clearlogo',''))
-        _setProperty('%s.%d.Art(clearart)'         % (_RALI_GLOBALS['PROPERTY'], _count), art.get('tvshow.clearart',''))
-        _setProperty('%s.%d.Art(landscape)'        % (_RALI_GLOBALS['PROPERTY'], _count), art.get('tvshow.landscape',''))
-        _setProperty('%s.%d.Resume'                % (_RALI_GLOBALS['PROPERTY'], _count), resume)
-        _setProperty('%s.%d.Watched'               % (_RALI_GLOBALS['PROPERTY'], _count), _episode.get('watched',''))
-        _setProperty('%s.%d.Runtime'               % (_RALI_GLOBALS['PROPERTY'], _count), runtime)
-        _setProperty('%s.%d.Premiered'             % (_RALI_GLOBALS['PROPERTY'], _count), _episode.get('firstaired',''))
-        _setProperty('%s.%d.PercentPlayed'         % (_RALI_GLOBALS['PROPERTY'], _count), played)
-        _setProperty('%s.%d.File'                  % (_RALI_GLOBALS['PROPERTY'], _count), _episode.get('file',''))
-        _setProperty('%s.%d.MPAA'                  % (_RALI_GLOBALS['PROPERTY'], _count), _episode.get('mpaa',''))
-        _setProperty('%s.%d.Studio'                % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_episode.get('studio','')))
-        _setProperty('%s.%d.Path'                  % (_RALI_GLOBALS['PROPERTY'], _count), path)
-        _setProperty('%s.%d.Play'                  % (_RALI_GLOBALS['PROPERTY'], _count), play)
-        _setProperty('%s.%d.VideoCodec'            % (_RALI_GLOBALS['PROPERTY'], _count), streaminfo['videocodec'])
-        _setProperty('%s.%d.VideoResolution'       % (_RALI_GLOBALS['PROPERTY'], _count), streaminfo['videoresolution'])
-        _setProperty('%s.%d.VideoAspect'           % (_RALI_GLOBALS['PROPERTY'], _count), streaminfo['videoaspect'])
-        _setProperty('%s.%d.AudioCodec'            % (_RALI_GLOBALS['PROPERTY'], _count), streaminfo['audiocodec'])
-        _setProperty('%s.%d.AudioChannels'         % (_RALI_GLOBALS['PROPERTY'], _count), str(streaminfo['audiochannels']))
-        # autopep8:on
-
+        _setItemProperties(_renderItem('episode', _episode, _renderEpisode), _count)
     else:
         _setProperty('%s.%d.Title' % (_RALI_GLOBALS['PROPERTY'], _count), '')
 
 
-def _setAlbumPROPERTIES(_album: dict, _count: int) -> None:
+def _renderAlbum(_album: records.Album) -> payloads.Payload:
+    """Renders the window properties of an album
+
+    Args:
+        _album (records.Album): album with its details
+
+    Returns:
+        payloads.Payload: window properties of the item
+    """
+    _rating = str(_album['rating'])
+    if 'userrating' in _album:
+        _userrating = str(_album['userrating'])
+    else:
+        _userrating = ''
+    if _rating == '48':
+        _rating = ''
+    play = 'RunScript(' + __addonid__ + ',albumid=' + \
+        str(_album.get('albumid')) + ')'
+    path = 'musicdb://albums/' + str(_album.get('albumid')) + '/'
+    # autopep8:off
+    return (('Title',       _album.get('title','')),
+            ('Artist',      ' / '.join(_album.get('artist',''))),
+            ('Genre',       ' / '.join(_album.get('genre',''))),
+            ('Theme',       ' / '.join(_album.get('theme',''))),
+            ('Mood',        ' / '.join(_album.get('mood',''))),
+            ('Style',       ' / '.join(_album.get('style',''))),
+            ('Type',        _album.get('type','')),
+            ('Year',        str(_album.get('year',''))),
+            ('RecordLabel', _album.get('albumlabel','')),
+            ('Description', _album.get('description','')),
+            ('Rating',      _rating),
+            ('UserRating',  _userrating),
+            ('Art(thumb)',  _album.get('thumbnail','')),
+            ('Art(fanart)', _album.get('fanart','')),
+            ('Play',        play),
+            ('LibraryPath', path))
+    # autopep8:on
+
+
+def _setAlbumPROPERTIES(_album: Optional[records.Album], _count: int) -> None:
     """Sets the window properties for playlist albums
     """
     if _album:
-        # Set window Properties
-        _rating = str(_album['rating'])
-        if 'userrating' in _album:
-            _userrating = str(_album['userrating'])
-        else:
-            _userrating = ''
-        if _rating == '48':
-            _rating = ''
-        play = 'RunScript(' + __addonid__ + ',albumid=' + \
-            str(_album.get('albumid')) + ')'
-        path = 'musicdb://albums/' + str(_album.get('albumid')) + '/'
-        # autopep8:off
-        _setProperty('%s.%d.Title'       % (_RALI_GLOBALS['PROPERTY'], _count), _album.get('title',''))
-        _setProperty('%s.%d.Artist'      % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_album.get('artist','')))
-        _setProperty('%s.%d.Genre'       % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_album.get('genre','')))
-        _setProperty('%s.%d.Theme'       % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_album.get('theme','')))
-        _setProperty('%s.%d.Mood'        % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_album.get('mood','')))
-        _setProperty('%s.%d.Style'       % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_album.get('style','')))
-        _setProperty('%s.%d.Type'        % (_RALI_GLOBALS['PROPERTY'], _count), _album.get('type',''))
-        _setProperty('%s.%d.Year'        % (_RALI_GLOBALS['PROPERTY'], _count), str(_album.get('year','')))
-        _setProperty('%s.%d.RecordLabel' % (_RALI_GLOBALS['PROPERTY'], _count), _album.get('albumlabel',''))
-        _setProperty('%s.%d.Description' % (_RALI_GLOBALS['PROPERTY'], _count), _album.get('description',''))
-        _setProperty('%s.%d.Rating'      % (_RALI_GLOBALS['PROPERTY'], _count), _rating)
-        _setProperty('%s.%d.UserRating'  % (_RALI_GLOBALS['PROPERTY'], _count), _userrating)
-        _setProperty('%s.%d.Art(thumb)'  % (_RALI_GLOBALS['PROPERTY'], _count), _album.get('thumbnail',''))
-        _setProperty('%s.%d.Art(fanart)' % (_RALI_GLOBALS['PROPERTY'], _count), _album.get('fanart',''))
-        _setProperty('%s.%d.Play'        % (_RALI_GLOBALS['PROPERTY'], _count), play)
-        _setProperty('%s.%d.LibraryPath' % (_RALI_GLOBALS['PROPERTY'], _count), path)
+        _setItemProperties(_renderItem('album', _album, _renderAlbum), _count)
+    else:
+        _setProperty('%s.%d.Title' % (_RALI_GLOBALS['PROPERTY'], _count), '')
+
+
+def _renderSong(_song: records.Song) -> payloads.Payload:
+    """Renders the window properties of a song
+
+    Args:
+        _song (records.Song): song with its details
+
+    Returns:
+        payloads.Payload: window properties of the item
+    """
+    _rating = str(_song['rating'])
+    if 'userrating' in _song:
+        _userrating = str(_song['userrating'])
     else:
-        _setProperty('%s.%d.Title'       % (_RALI_GLOBALS['PROPERTY'], _count), '')
+        _userrating = ''
+    if _rating == '48':
+        _rating = ''
+    play = 'RunScript(' + __addonid__ + ',songid=' + \
+        str(_song.get('songid')) + ')'
+    path = 'musicdb://songs/' + str(_song.get('songid')) + '/'
+    # autopep8:off
+    return (('Title',       _song.get('title','')),
+            ('Artist',      ' / '.join(_song.get('artist',''))),
+            ('Genre',       ' / '.join(_song.get('genre',''))),
+            ('Year',        str(_song.get('year',''))),
+            ('Description', _song.get('comment','')),
+            ('Rating',      _rating),
+            ('UserRating',  _userrating),
+            ('Art(thumb)',  _song.get('thumbnail','')),
+            ('Art(fanart)', _song.get('fanart','')),
+            ('Play',        play),
+            ('LibraryPath', path))
     # autopep8:on
 
 
-def _setSongPROPERTIES(_song: dict, _count: int) -> None:
+def _setSongPROPERTIES(_song: Optional[records.Song], _count: int) -> None:
     """Sets the window properties for playlist songs
     """
     if _song:
-        # Set window Properties
-        _rating = str(_song['rating'])
-        if 'userrating' in _song:
-            _userrating = str(_song['userrating'])
-        else:
-            _userrating = ''
-        if _rating == '48':
-            _rating = ''
-        play = 'RunScript(' + __addonid__ + ',songid=' + \
-            str(_song.get('songid')) + ')'
-        path = 'musicdb://songs/' + str(_song.get('songid')) + '/'
-        # autopep8:off
-        _setProperty('%s.%d.Title'       % (_RALI_GLOBALS['PROPERTY'], _count), _song.get('title',''))
-        _setProperty('%s.%d.Artist'      % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_song.get('artist','')))
-        _setProperty('%s.%d.Genre'       % (_RALI_GLOBALS['PROPERTY'], _count), ' / '.join(_song.get('genre','')))
-        _setProperty('%s.%d.Year'        % (_RALI_GLOBALS['PROPERTY'], _count), str(_song.get('year','')))
-        _setProperty('%s.%d.Description' % (_RALI_GLOBALS['PROPERTY'], _count), _song.get('comment',''))
-        _setProperty('%s.%d.Rating'      % (_RALI_GLOBALS['PROPERTY'], _count), _rating)
-        _setProperty('%s.%d.UserRating'  % (_RALI_GLOBALS['PROPERTY'], _count), _userrating)
-        _setProperty('%s.%d.Art(thumb)'  % (_RALI_GLOBALS['PROPERTY'], _count), _song.get('thumbnail',''))
-        _setProperty('%s.%d.Art(fanart)' % (_RALI_GLOBALS['PROPERTY'], _count), _song.get('fanart',''))
-        _setProperty('%s.%d.Play'        % (_RALI_GLOBALS['PROPERTY'], _count), play)
-        _setProperty('%s.%d.LibraryPath' % (_RALI_GLOBALS['PROPERTY'], _count), path)
+        _setItemProperties(_renderItem('song', _song, _renderSong), _count)
     else:
-        _setProperty('%s.%d.Title'       % (_RALI_GLOBALS['PROPERTY'], _count), '')
-    # autopep8:on
+        _setProperty('%s.%d.Title' % (_RALI_GLOBALS['PROPERTY'], _count), '')
+
+
+def _resumeState(_resume: dict) -> Tuple[str, str]:
+    """Gets the Resume and PercentPlayed properties of a video
+
+    Args:
+        _resume (dict): resume point (position, total)
+
+    Returns:
+        Tuple[str, str]: 'true' / 'false' and the percent played
+    """
+    if _resume['position'] > 0 and float(_resume['total']) > 0:
+        return 'true', f'{int((float(_resume["position"]) / float(_resume["total"])) * 100)}%'
+    return 'false', '0%'
+
+
+def _renderItem(_type: str, _item: records.Record,
+                _render: Callable[[Any], payloads.Payload]) -> payloads.Payload:
+    """Gets the rendered window properties of an item, see resources/lib/payloads.py
+
+    Args:
+        _type (str): item type (movie, episode...)
+        _item (records.Record): item with its details
+        _render (Callable[[Any], payloads.Payload]): renders the item
+
+    Returns:
+        payloads.Payload: window properties of the item
+    """
+    _stamp = tuple(_item.get(_field) for _field in _PAYLOAD_STAMP)
+    return _PAYLOADS.get((_type, _item.id), _stamp, lambda: _render(_item))
+
+
+def _setItemProperties(_payload: payloads.Payload, _count: int) -> None:
+    """Sets the window properties of the widget item at position _count
+
+    Args:
+        _payload (payloads.Payload): rendered window properties of the item
+        _count (int): position of the item in the widget
+    """
+    _prefix = f'{_RALI_GLOBALS["PROPERTY"]}.{_count}.'
+    for _suffix, _value in _payload:
+        _RESULT[_prefix + _suffix] = _value
 
 
 def _setProperty(_property: str, _value: str) -> None:
-    """Calls kodi setProperty method
+    """Sets a window property of the widget being read, see query()
 
     Args:
         _property (str): property key
         _value (str): value
     """
-    # global WINDOW
     # Set window Properties
-    WINDOW.setProperty(_property, _value)
+    _RESULT[_property] = _value
 
 
-def _parse_argv() -> None:
-    """Gets arguments pass by skin call to RunScript()
+def _playItem(argv: List[str]) -> None:
+    """Starts playback of the library item passed by a skin to RunScript()
 
-        Arguments are retrieved into a dict for processing.
-        -  If a library item id is passed, starts playback of item
-        -  Otherwise will set script global variables
-        -  If passed playlist will determine type and order
+    Args:
+        argv (List[str]): script arguments as found in sys.argv
     """
     try:
-        params = dict(arg.split('=') for arg in sys.argv[1].split('&'))
+        params = dict(arg.split('=') for arg in argv[1].split('&'))
     except:
         params = {}
+    # Playback of a library item, resume only applies to movies and episodes
+    _resume = params.get('resume', 'true') != 'false'
     if params.get('movieid'):
-        # xbmc.executeJSONRPC('{ "jsonrpc": "2.0", "method": "Player.Open", "params": { "item": { "movieid": %d }, "options":{ "resume": true } }, "id": 1 }' % int(params.get("movieid")))
-        xbmc.executeJSONRPC('{ "jsonrpc": "2.0", '
-                            '"method": "Player.Open", '
-                            '"params": '
-                            '{ "item": { "movieid": %d }, '
-                            '"options":{ "resume": %s } }, '
-                            '"id": 1 }' % (
-                                int(params.get("movieid", "")), params.get("resume", "true")))
+        _RPC.call('Player.Open', {'item': {'movieid': int(params['movieid'])},
+                                  'options': {'resume': _resume}})
     elif params.get('episodeid'):
-        # xbmc.executeJSONRPC('{ "jsonrpc": "2.0", "method": "Player.Open", "params": { "item": { "episodeid": %d }, "options":{ "resume": true }  }, "id": 1 }' % int(params.get("episodeid")))
-        xbmc.executeJSONRPC('{ "jsonrpc": "2.0", '
-                            '"method": "Player.Open", '
-                            '"params": '
-                            '{ "item": { "episodeid": %d }, '
-                            '"options":{ "resume": %s }  }, '
-                            '"id": 1 }' % (int(params.get("episodeid", "")), params.get("resume", "true")))
+        _RPC.call('Player.Open', {'item': {'episodeid': int(params['episodeid'])},
+                                  'options': {'resume': _resume}})
     elif params.get('musicvideoid'):
-        xbmc.executeJSONRPC('{ "jsonrpc": "2.0", '
-                            '"method": "Player.Open", '
-                            '"params": { "item": { "musicvideoid": %d } }, '
-                            '"id": 1 }' % int(params.get("musicvideoid")))
+        _RPC.call('Player.Open',
+                  {'item': {'musicvideoid': int(params['musicvideoid'])}})
     elif params.get('albumid'):
-        xbmc.executeJSONRPC('{ "jsonrpc": "2.0", '
-                            '"method": "Player.Open", '
-                            '"params": { "item": { "albumid": %d } }, '
-                            '"id": 1 }' % int(params.get("albumid")))
+        _RPC.call('Player.Open', {'item': {'albumid': int(params['albumid'])}})
     elif params.get('songid'):
-        xbmc.executeJSONRPC(
-            '{ "jsonrpc": "2.0", '
-            '"method": "Player.Open", '
-            '"params": { "item": { "songid": %d } }, '
-            '"id": 1 }' % int(params.get("songid")))
-    else:
-        # Extract parameters
-        for arg in sys.argv:
-            param = str(arg)
-            if 'limit=' in param:
-                _RALI_GLOBALS['LIMIT'] = int(param.replace('limit=', ''))
-            elif 'menu=' in param:
-                _RALI_GLOBALS['MENU'] = param.replace('menu=', '')
-            elif 'method=' in param:
-                _RALI_GLOBALS['METHOD'] = param.replace('method=', '')
-            elif 'playlist=' in param:
-                _RALI_GLOBALS['PLAYLIST'] = param.replace('playlist=', '')
-                _RALI_GLOBALS['PLAYLIST'] = _RALI_GLOBALS['PLAYLIST'].replace(
-                    '"', '')
-            elif 'property=' in param:
-                _RALI_GLOBALS['PROPERTY'] = param.replace('property=', '')
-            elif 'type=' in param:
-                _RALI_GLOBALS['TYPE'] = param.replace('type=', '')
-            elif 'unwatched=' in param:
-                _RALI_GLOBALS['UNWATCHED'] = param.replace('unwatched=', '')
-                if _RALI_GLOBALS['UNWATCHED'] == '':
-                    _RALI_GLOBALS['UNWATCHED'] = 'False'
-            elif 'resume=' in param:
-                RESUME = param.replace('resume=', '')
-        if _RALI_GLOBALS['PLAYLIST'] != '' and xbmcvfs.exists(xbmcvfs.translatePath(_RALI_GLOBALS['PLAYLIST'])):
-            _getPlaylistType()
-        if _RALI_GLOBALS['PROPERTY'] == '':
-            _RALI_GLOBALS['PROPERTY'] = f'Playlist{_RALI_GLOBALS["METHOD"]}{_RALI_GLOBALS["TYPE"]}{_RALI_GLOBALS["MENU"]}'
+        _RPC.call('Player.Open', {'item': {'songid': int(params['songid'])}})
 
 
 def media_streamdetails(filename: str, streamdetails: dict) -> dict:
@@ -1586,29 +2237,305 @@ def media_path(raw_path: str) -> str:
     return raw_pathlist[0]
 
 
-# Parse argv for any preferences
-_parse_argv()
-# Clear Properties for playlist PROPERTY from _parse_argv()
-_clearProperties()
-# Get movies and fill Properties
-if _RALI_GLOBALS['TYPE'] == 'Movie':
-    _getMovies()
-elif _RALI_GLOBALS['TYPE'] == 'Episode':
-    if _RALI_GLOBALS['PLAYLIST'] == '':
-        _getEpisodes()
+class WidgetQuery:
+    """A widget to fill, as described by the RunScript() arguments
+
+    Args:
+        type (str): Movie, Episode, MusicVideo or Music, read from the
+            playlist when one is given
+        method (str): Last, Random or Playlist
+        limit (int): number of items
+        playlist (str): smart playlist path, '' for the whole library
+        menu (str): menu name used in the default property prefix
+        unwatched (bool): only show unwatched items
+        resume (bool): only show partially watched items
+        property (str): window property prefix, by default
+            Playlist<method><type><menu>
+    """
+
+    def __init__(self, type: str = '', method: str = 'Random', limit: int = 20,
+                 playlist: str = '', menu: str = '', unwatched: bool = False,
+                 resume: bool = False, property: str = '') -> None:
+        self.type = type
+        self.method = method
+        self.limit = limit
+        self.playlist = playlist
+        self.menu = menu
+        self.unwatched = unwatched
+        self.resume = resume
+        self.property = property
+
+    @classmethod
+    def from_argv(cls, argv: List[str]) -> 'WidgetQuery':
+        """Gets arguments pass by skin call to RunScript()
+
+        Args:
+            argv (List[str]): script arguments as found in sys.argv
+
+        Returns:
+            WidgetQuery: the widget described by the arguments
+        """
+        _widget = cls()
+        # Extract parameters
+        for arg in argv:
+            param = str(arg)
+            if 'limit=' in param:
+                _widget.limit = int(param.replace('limit=', ''))
+            elif 'menu=' in param:
+                _widget.menu = param.replace('menu=', '')
+            elif 'method=' in param:
+                _widget.method = param.replace('method=', '')
+            elif 'playlist=' in param:
+                _widget.playlist = param.replace('playlist=', '').replace('"', '')
+            elif 'property=' in param:
+                _widget.property = param.replace('property=', '')
+            elif 'type=' in param:
+                _widget.type = param.replace('type=', '')
+            elif 'unwatched=' in param:
+                _widget.unwatched = param.replace('unwatched=', '') == 'True'
+            elif 'resume=' in param:
+                _widget.resume = param.replace('resume=', '') == 'True'
+        return _widget
+
+    def _globals(self) -> dict:
+        return {'LIMIT': self.limit,
+                'METHOD': self.method,
+                'MENU': self.menu,
+                'PLAYLIST': self.playlist,
+                'PROPERTY': self.property,
+                'RESUME': str(self.resume),
+                'TYPE': self.type,
+                'UNWATCHED': str(self.unwatched)}
+
+
+class WidgetResult:
+    """Window properties of a widget read by query()
+
+    Args:
+        property (str): window property prefix of the widget
+        type (str): media type, Invalid for an unsupported playlist
+        name (str): smart playlist name, '' without playlist
+        properties (Dict[str, str]): window properties by key, '' for a
+            property to clear
+    """
+
+    def __init__(self, property: str, type: str, name: str,
+                 properties: Dict[str, str]) -> None:
+        self.property = property
+        self.type = type
+        self.name = name
+        self.properties = properties
+        self.loaded = type != 'Invalid'
+
+    def items(self) -> List[Dict[str, str]]:
+        """Gets the properties of the widget items, in widget order
+
+        Returns:
+            List[Dict[str, str]]: properties of each item by name (Title,
+            Art(poster)...)
+        """
+        _items: Dict[int, Dict[str, str]] = {}
+        _prefix = f'{self.property}.'
+        for _key, _value in self.properties.items():
+            _number, _, _name = _key[len(_prefix):].partition('.')
+            if _key.startswith(_prefix) and _number.isdigit() and _name:
+                _items.setdefault(int(_number), {})[_name] = _value
+        return [_items[_number] for _number in sorted(_items)
+                if _items[_number].get('Title')]
+
+
+def query(widget: WidgetQuery) -> WidgetResult:
+    """Reads the library data shown by a widget
+
+    Nothing is written to the window, run() does it for RunScript().  When
+    the service keeps the library data (enable_source_cache), repeated
+    queries are served from memory.
+
+    Args:
+        widget (WidgetQuery): the widget to read
+
+    Returns:
+        WidgetResult: the widget window properties
+    """
+    global _RESULT
+    _RALI_GLOBALS.clear()
+    _RALI_GLOBALS.update(_DEFAULT_GLOBALS)
+    _RALI_GLOBALS.update(widget._globals())
+    _RESULT = {}
+    # If passed playlist will determine type and order
+    if _RALI_GLOBALS['PLAYLIST'] != '' and xbmcvfs.exists(xbmcvfs.translatePath(_RALI_GLOBALS['PLAYLIST'])):
+        _getPlaylistType()
+    if _RALI_GLOBALS['PROPERTY'] == '':
+        _RALI_GLOBALS['PROPERTY'] = f'Playlist{_RALI_GLOBALS["METHOD"]}{_RALI_GLOBALS["TYPE"]}{_RALI_GLOBALS["MENU"]}'
+    if _RALI_GLOBALS['NAME'] is not None:
+        _setProperty(f'{_RALI_GLOBALS["PROPERTY"]}.Name', _RALI_GLOBALS['NAME'])
+    if (_RALI_GLOBALS['PLAYLIST'] == '' and _RALI_GLOBALS['TYPE'] in _LIBRARY_NODES
+            and not _capabilities().filters):
+        # library queries would ignore sort and filter, select items in Python
+        _RALI_GLOBALS['PLAYLIST'] = _LIBRARY_NODES[_RALI_GLOBALS['TYPE']]
+        if _RALI_GLOBALS['METHOD'] == 'Playlist':
+            _RALI_GLOBALS['METHOD'] = ''
+    # Get movies and fill Properties
+    if _RALI_GLOBALS['TYPE'] == 'Movie':
+        _getMovies()
+    elif _RALI_GLOBALS['TYPE'] == 'Episode':
+        if _RALI_GLOBALS['PLAYLIST'] == '':
+            _getEpisodes()
+        else:
+            _getEpisodesFromPlaylist()
+    elif _RALI_GLOBALS['TYPE'] == 'Music':
+        _getMusicFromPlaylist()
+    elif _RALI_GLOBALS['TYPE'] == 'MusicVideo':
+        _getMusicVideosFromPlaylist()
+    # Clear Properties for playlist PROPERTY
+    _clearProperties()
+    return WidgetResult(_RALI_GLOBALS['PROPERTY'], _RALI_GLOBALS['TYPE'],
+                        _RALI_GLOBALS['NAME'] or '', _RESULT)
+
+
+def query_many(widgets: List[WidgetQuery]) -> List[WidgetResult]:
+    """Reads the library data of several widgets, reading each source once
+
+    Widgets on the same smart playlist (Random, Last, unwatched... views of
+    it) share one read of the playlist, as do the counters of the library
+    widgets of a media type.  The service keeps the data between calls, see
+    enable_source_cache(); otherwise it is dropped once the widgets are read.
+
+    Args:
+        widgets (List[WidgetQuery]): the widgets to read
+
+    Returns:
+        List[WidgetResult]: the widget window properties, in the same order
+    """
+    global _SOURCE_CACHE, _SOURCE_CACHE_DIRTY
+    _shared = _SOURCE_CACHE is None and len(widgets) > 1
+    if _shared:
+        _SOURCE_CACHE = {}
+    try:
+        return [query(_widget) for _widget in widgets]
+    finally:
+        if _shared:
+            _SOURCE_CACHE = None
+            _SOURCE_INDEX.clear()
+            _SOURCE_CACHE_DIRTY = False
+
+
+def _readWidgets(_path: str) -> List[WidgetQuery]:
+    """Reads a widgets spec file, a JSON list of RunScript() arguments
+
+    Example: [{"type": "Movie", "method": "Last", "limit": 10},
+    {"playlist": "special://profile/playlists/video/kids.xsp",
+    "method": "Random", "unwatched": "True", "property": "KidsWidget"}]
+
+    Args:
+        _path (str): spec file path
+
+    Returns:
+        List[WidgetQuery]: the widgets, empty if the file cannot be read
+    """
+    try:
+        with open(xbmcvfs.translatePath(_path), 'r', encoding='utf-8') as _file:
+            _specs = json.load(_file)
+        return [WidgetQuery.from_argv([f'{_key}={_value}' for _key, _value in _spec.items()])
+                for _spec in _specs]
+    except (OSError, ValueError, TypeError, AttributeError) as error:
+        log(f'## WIDGETS {_path} COULD NOT BE LOADED ## {error}')
+        return []
+
+
+def _writeResult(result: WidgetResult) -> None:
+    """Writes the window properties of a widget
+
+    Args:
+        result (WidgetResult): the widget read by query()
+    """
+    _PROPERTIES.begin(result.property)
+    for _key, _value in result.properties.items():
+        if _value:
+            _PROPERTIES.set(_key, _value)
+        else:
+            _PROPERTIES.clear(_key)
+    # skin can check .Loaded to verify properties available
+    _PROPERTIES.finish(result.loaded)
+
+
+def _isPlayback(argv: List[str]) -> bool:
+    """Checks if the script was called to play a library item
+
+    Args:
+        argv (List[str]): script arguments as found in sys.argv
+
+    Returns:
+        bool: True if argv holds a movieid, episodeid... to play
+    """
+    return len(argv) > 1 and argv[1].split('=')[0] in (
+        'movieid', 'episodeid', 'musicvideoid', 'albumid', 'songid')
+
+
+def _notifyService(argv: List[str]) -> None:
+    """Hands a widget request to the background service
+
+    The service receives it as an Other.RunScript notification
+
+    Args:
+        argv (List[str]): script arguments as found in sys.argv
+    """
+    _RPC.call('JSONRPC.NotifyAll', {'sender': __addonid__,
+                                    'message': 'RunScript',
+                                    'data': argv})
+
+
+def run(argv: List[str]) -> None:
+    """Fills the window properties of a widget, or of the widgets of a
+    widgets=<spec file> argument (see _readWidgets)
+
+    Args:
+        argv (List[str]): script arguments as found in sys.argv
+    """
+    _start_time = time.time()
+    _calls, _requests = _RPC.calls, _RPC.requests
+    _rendered = _PAYLOADS.misses
+    _reused = _PAYLOADS.hits
+    if _isPlayback(argv):
+        _playItem(argv)
+        return
+    _specs = [_arg[len('widgets='):] for _arg in argv[1:] if _arg.startswith('widgets=')]
+    if _specs:
+        _widgets = _readWidgets(_specs[0].replace('"', ''))
+    else:
+        _widgets = [WidgetQuery.from_argv(argv)]
+    _loaded = []
+    for _result in query_many(_widgets):
+        _writeResult(_result)
+        log(f'{_result.property} properties: {_PROPERTIES.written} written, '
+            f'{_PROPERTIES.skipped} unchanged')
+        if _result.loaded:
+            _loaded.append(_result.property)
+        else:
+            log(f'Unable to process the {_result.property} playlist')
+    if _loaded:
+        log(f'Loading {", ".join(_loaded)} '
+            f'started at {time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(_start_time))} '
+            f'and took {_timeTook(_start_time)} '
+            f'(JSON-RPC API {_CAPABILITIES.api if _CAPABILITIES else None}, '
+            f'{_RPC.calls - _calls} JSON-RPC calls in '
+            f'{_RPC.requests - _requests} requests, '
+            f'{_PAYLOADS.misses - _rendered} items rendered, '
+            f'{_PAYLOADS.hits - _reused} reused)')
+
+
+def main() -> None:
+    """RunScript() entry point
+
+    Widget requests go to the background service when it is running,
+    otherwise they are processed here.
+    """
+    if WINDOW.getProperty(SERVICE_PROPERTY) == 'running' and not _isPlayback(sys.argv):
+        _notifyService(sys.argv)
+        log(f'Request {sys.argv[1:]} handed to the service')
     else:
-        _getEpisodesFromPlaylist()
-elif _RALI_GLOBALS['TYPE'] == 'Music':
-    _getMusicFromPlaylist()
-elif _RALI_GLOBALS['TYPE'] == 'MusicVideo':
-    _getMusicVideosFromPlaylist()
-if _RALI_GLOBALS['TYPE'] != 'Invalid':
-    # skin can check this to verify properties available
-    WINDOW.setProperty(f'{_RALI_GLOBALS["PROPERTY"]}.Loaded', 'true')
-    log(f'Loading Playlist{_RALI_GLOBALS["METHOD"]}{_RALI_GLOBALS["TYPE"]}{_RALI_GLOBALS["MENU"]} '
-        f'started at {time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(START_TIME))} '
-        f'and took {_timeTook(START_TIME)} (Nexus {JSON_RPC_NEXUS})')
-else:
-    log(
-        f'Unable to process the {_RALI_GLOBALS["METHOD"]}{_RALI_GLOBALS["MENU"]} playlist')
-del WINDOW, MONITOR, __addon__
+        run(sys.argv)
+
+
+if __name__ == '__main__':
+    main()
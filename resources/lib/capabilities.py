@@ -0,0 +1,75 @@
+# This program is Free Software see LICENSE file for details
+""" Kodi features probed once per Kodi session
+
+Every RunScript() starts a new Python interpreter, so values read from Kodi
+are lost between widgets.  The JSON-RPC API version and the add-on metadata
+do not change while Kodi runs: they are kept in a Home window property,
+tagged with the Kodi build, and only the first run of a Kodi session reads
+them.  Capabilities turns the API version into the feature flags consulted
+by the query builders.
+"""
+
+import json
+from typing import Any, Callable, Sequence
+
+
+class Capabilities:
+    """Features of the Kodi JSON-RPC API
+
+    Args:
+        api (Sequence[int]): JSON-RPC API version (major, minor, patch)
+    """
+
+    def __init__(self, api: Sequence[int]) -> None:
+        self.api = tuple(api)
+        # userrating item property, API 12.9.0 (Nexus)
+        self.userrating = self.api[:2] >= (12, 9)
+        # filter parameter of the library getters, API 6.0.0 (Frodo)
+        self.filters = self.api[:2] >= (6, 0)
+        # JSON-RPC 2.0 batch arrays, API 6.0.0 (Frodo)
+        self.batch = self.api[:2] >= (6, 0)
+
+
+class SessionCache:
+    """Values read from Kodi once per session, kept in a Home window property
+
+    Values cached by another Kodi build (after an update) are read again.
+
+    Args:
+        window: Kodi Home window (xbmcgui.Window)
+        key (str): window property holding the values
+        build (str): Kodi build version (System.BuildVersion)
+    """
+
+    def __init__(self, window, key: str, build: str) -> None:
+        self._window = window
+        self._key = key
+        self._build = build
+        self._values = None
+
+    def _load(self) -> dict:
+        try:
+            values = json.loads(self._window.getProperty(self._key) or '{}')
+        except ValueError:
+            values = {}
+        if not isinstance(values, dict) or values.get('build') != self._build:
+            values = {'build': self._build}
+        return values
+
+    def get(self, name: str, probe: Callable[[], Any]) -> Any:
+        """Gets a value, reading it from Kodi on first use in the session
+
+        Args:
+            name (str): name of the value
+            probe (Callable[[], Any]): reads the value from Kodi, the result
+                must be JSON serializable
+
+        Returns:
+            Any: the value
+        """
+        if self._values is None:
+            self._values = self._load()
+        if name not in self._values:
+            self._values[name] = probe()
+            self._window.setProperty(self._key, json.dumps(self._values))
+        return self._values[name]
@@ -0,0 +1,310 @@
+# This program is Free Software see LICENSE file for details
+""" In-memory columnar index of the items of a playlist kept by the service
+
+The service picks the widget items of a cached playlist on every refresh.
+ItemIndex keeps the fields used to filter, count and order them in columns:
+array.array columns of playcount, resume position, date added (epoch
+seconds) and playlist order, and byte masks of the unwatched, in
+progress and remaining (not removed) rows.  Filtering and counting are
+column operations running in C: masks are combined as big integers, rows
+are read with itertools.compress and counted with bytes.count().  When NumPy
+is importable the columns are viewed as NumPy arrays and the first LIMIT
+rows of a playlist order are found with numpy.partition; without it heapq
+does.
+
+Last widgets read the recency index, the rows sorted latest first and kept
+sorted with bisect: the walk from its head stops at the LIMIT-th qualifying
+row.  Each row is one int key, the negated date added above the row number.
+
+Playlist order values that are not numbers (titles...) are interned: every
+distinct value gets its rank in the sorted table of values, the order
+column holds the ranks.
+
+A library notification about one item updates its row in O(1), a new item
+is added in O(log N) and a removed item leaves a dead row.
+"""
+
+import calendar
+import heapq
+from bisect import bisect_left, insort
+import itertools
+from array import array
+from operator import attrgetter, neg
+from typing import Any, Dict, List, Optional, Tuple
+
+from resources.lib import selection
+from resources.lib.records import Record
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# NumPy type of the array.array columns
+_DTYPES = {'q': 'int64', 'd': 'float64'}
+# Bits of the row number in the recency keys
+_ROW_BITS = 32
+_ROW_MASK = (1 << _ROW_BITS) - 1
+
+
+def epoch(dateadded: str) -> int:
+    """Gets the epoch seconds of a Kodi date
+
+    Args:
+        dateadded (str): 'YYYY-MM-DD HH:MM:SS' or 'YYYY-MM-DD'
+
+    Returns:
+        int: seconds since 1970 (UTC), 0 if the date is empty or invalid
+    """
+    try:
+        return calendar.timegm((int(dateadded[0:4]), int(dateadded[5:7]),
+                                int(dateadded[8:10]), int(dateadded[11:13] or 0),
+                                int(dateadded[14:16] or 0), int(dateadded[17:19] or 0)))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _orderKey(value: Any) -> Any:
+    """Gets the hashable value of an order field (lists become tuples)"""
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _ranks(values: list) -> Tuple[Optional[array], Optional[Dict[Any, int]]]:
+    """Gets the order column: numbers as they are, other values by rank
+
+    Args:
+        values (list): order value of every row
+
+    Returns:
+        Tuple[Optional[array], Optional[Dict[Any, int]]]: order column, None
+        if the values cannot be compared, and rank by value, None if the
+        column holds the values
+    """
+    if values and all(isinstance(value, (int, float)) for value in values):
+        return array('d', values), None
+    keys = [_orderKey(value) for value in values]
+    try:
+        table = sorted(set(keys))
+    except TypeError:
+        return None, None
+    rank = {value: position for position, value in enumerate(table)}
+    return array('d', [rank[key] for key in keys]), rank
+
+
+def _comparable(value: Any, values: Dict[Any, int]) -> bool:
+    """Tells whether a new order value sorts with the ranked ones"""
+    try:
+        sorted([value, *itertools.islice(values, 1)])
+    except TypeError:
+        return False
+    return True
+
+
+def _recency(added: int, row: int) -> int:
+    """Gets the recency index key of a row: latest first, then row order"""
+    return (-added << _ROW_BITS) | row
+
+
+def _union(*masks: bytearray) -> bytes:
+    """Gets the rows set in any of the masks"""
+    bits = 0
+    for mask in masks:
+        bits |= int.from_bytes(mask, 'little')
+    return bits.to_bytes(len(masks[0]), 'little')
+
+
+class ItemIndex:
+    """Playlist items in columns, with their watched and in progress state
+
+    The items are the records of the playlist data, updates are made in place.
+
+    Args:
+        items (List[Record]): playlist items
+    """
+
+    def __init__(self, items: List[Record]) -> None:
+        self.items: Dict[int, Record] = {item.id: item for item in items}
+        self._records = list(self.items.values())
+        self._rows = {item.id: row for row, item in enumerate(self._records)}
+        records = self._records
+        self.playcount = array('q', [item.playcount for item in records])
+        self.position = array('d', [item.position for item in records])
+        self.added = array('q', [epoch(item.dateadded) for item in records])
+        self.order, self._rank = _ranks([item.order for item in records])
+        self.alive = bytearray(b'\x01') * len(records)
+        self.unwatched = bytearray(item.playcount == 0 for item in records)
+        self.inprogress = bytearray(item.position != 0 for item in records)
+        self.recent = sorted(_recency(added, row) for row, added in enumerate(self.added))
+
+    def _mask(self, unwatched: bool, resume: bool) -> bytes:
+        """Gets the rows allowed by the unwatched / resume options"""
+        masks = []
+        if unwatched:
+            masks.append(self.unwatched)
+        if resume:
+            masks.append(self.inprogress)
+        return _union(*masks) if masks else self.alive
+
+    def count(self, unwatched: bool = False, resume: bool = False) -> int:
+        """Counts the items allowed by the unwatched / resume options
+
+        Args:
+            unwatched (bool): items never played qualify
+            resume (bool): partially watched items qualify
+
+        Returns:
+            int: number of items, every item if neither option is set
+        """
+        return self._mask(unwatched, resume).count(1)
+
+    def _latest(self, limit: int, unwatched: bool, resume: bool) -> List[int]:
+        """Gets the latest rows allowed by the unwatched / resume options
+
+        The recency index is walked from its head, rows failing the options
+        are skipped.
+        """
+        first = (self.unwatched if unwatched else self.inprogress if resume
+                 else self.alive)
+        second = self.inprogress if unwatched and resume else first
+        rows = []
+        for key in self.recent:
+            row = key & _ROW_MASK
+            if first[row] or second[row]:
+                rows.append(row)
+                if len(rows) == limit:
+                    break
+        return rows
+
+    def _top(self, column: array, mask: bytes, limit: int, reverse: bool) -> List[int]:
+        """Gets the first rows of a column order, equal values in row order"""
+        if numpy is not None:
+            rows = numpy.flatnonzero(numpy.frombuffer(mask, dtype=numpy.uint8))
+            keys = numpy.frombuffer(column, dtype=_DTYPES[column.typecode])[rows]
+            if reverse:
+                keys = -keys
+            if limit < len(rows):
+                # rows past the limit-th key cannot be picked, ties are kept
+                kept = keys <= numpy.partition(keys, limit - 1)[limit - 1]
+                rows, keys = rows[kept], keys[kept]
+            return rows[numpy.lexsort((rows, keys))[:limit]].tolist()
+        rows = itertools.compress(range(len(mask)), mask)
+        values = itertools.compress(column, mask)
+        if reverse:
+            # largest values first, then smallest rows: rows are negated
+            return [-row for _, row in heapq.nlargest(limit, zip(values, map(neg, rows)))]
+        return [row for _, row in heapq.nsmallest(limit, zip(values, rows))]
+
+    def select(self, method: str, limit: int, unwatched: bool = False,
+               resume: bool = False, reverse: bool = False) -> List[Record]:
+        """Picks the widget items
+
+        Same items as selection.top() / selection.sample() over the
+        qualifying items in playlist order.
+
+        Args:
+            method (str): Last, Playlist, anything else draws random items
+            limit (int): number of items shown by the widget
+            unwatched (bool): items never played qualify
+            resume (bool): partially watched items qualify
+            reverse (bool): descending playlist order
+
+        Returns:
+            List[Record]: up to limit items in widget order
+        """
+        if limit <= 0 or not self._records:
+            return []
+        if method == 'Last':
+            return [self._records[row] for row in self._latest(limit, unwatched, resume)]
+        mask = self._mask(unwatched, resume)
+        if method == 'Playlist' and self.order is not None:
+            rows = self._top(self.order, mask, limit, reverse)
+        elif method == 'Playlist':
+            return selection.top(itertools.compress(self._records, mask), limit,
+                                 attrgetter('order'), reverse=reverse)
+        else:
+            rows = selection.sample(list(itertools.compress(range(len(mask)), mask)),
+                                    limit)
+        return [self._records[row] for row in rows]
+
+    def update(self, itemid: int, playcount: int, resume: dict) -> Optional[int]:
+        """Applies a new playcount / resume point to an item
+
+        Args:
+            itemid (int): library id of the item
+            playcount (int): new playcount
+            resume (dict): new resume point
+
+        Returns:
+            Optional[int]: change of the number of watched items (-1, 0 or 1),
+            None if the item is not indexed
+        """
+        row = self._rows.get(itemid)
+        if row is None:
+            return None
+        item = self._records[row]
+        watched = item.playcount != 0
+        item.playcount = playcount
+        item['resume'] = resume
+        self.playcount[row] = playcount
+        self.position[row] = item.position
+        self.unwatched[row] = playcount == 0
+        self.inprogress[row] = item.position != 0
+        return (playcount != 0) - watched
+
+    def remove(self, itemid: int) -> Optional[Record]:
+        """Removes an item
+
+        Args:
+            itemid (int): library id of the item
+
+        Returns:
+            Optional[Record]: the removed item, None if the item is not indexed
+        """
+        row = self._rows.pop(itemid, None)
+        if row is None:
+            return None
+        self.alive[row] = self.unwatched[row] = self.inprogress[row] = 0
+        del self.recent[bisect_left(self.recent, _recency(self.added[row], row))]
+        return self.items.pop(itemid)
+
+    def add(self, item: Record) -> bool:
+        """Adds a new item, after the items indexed in playlist order
+
+        Args:
+            item (Record): item added to the playlist
+
+        Returns:
+            bool: False if the item is already indexed or its order value
+            cannot be compared with the others
+        """
+        if item.id in self._rows:
+            return False
+        order = _orderKey(item.order)
+        if self.order is None:
+            pass
+        elif self._rank is None:
+            if not isinstance(order, (int, float)):
+                return False
+        elif order not in self._rank and not _comparable(order, self._rank):
+            return False
+        row = len(self._records)
+        self._records.append(item)
+        self.items[item.id] = item
+        self._rows[item.id] = row
+        self.playcount.append(item.playcount)
+        self.position.append(item.position)
+        self.added.append(epoch(item.dateadded))
+        self.alive.append(1)
+        self.unwatched.append(item.playcount == 0)
+        self.inprogress.append(item.position != 0)
+        if self.order is not None:
+            if self._rank is None:
+                self.order.append(order)
+            elif order in self._rank:
+                self.order.append(self._rank[order])
+            else:
+                # ranks of a new value are unknown, Playlist picks compare
+                # the records until the playlist is read again
+                self.order = self._rank = None
+        insort(self.recent, _recency(self.added[row], row))
+        return True
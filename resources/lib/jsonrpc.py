@@ -0,0 +1,177 @@
+# This program is Free Software see LICENSE file for details
+""" Kodi JSON-RPC client sending queued calls as batch requests
+
+Every xbmc.executeJSONRPC() is a synchronous round-trip through the Kodi
+JSON-RPC server.  Loops that need one call per album, song or tv show
+submit() their calls instead and collect() the responses, which sends them
+as JSON-RPC 2.0 batch arrays of at most BATCH_SIZE calls.  Responses are
+matched back to their calls by id.  items() sends a single call whose
+result list is decoded one item at a time (see streaming.py).
+
+Kodi runs the calls of a batch one after the other, and executeJSONRPC()
+releases the Python interpreter while Kodi works.  A large collect() (the
+episodes of every tv show of a playlist, the movies of every set...) is
+split over up to WORKERS requests sent at the same time from worker
+threads, so Kodi answers them in parallel.  Responses are still returned
+by call id, whatever the order the requests complete in.  Once abort()
+tells Kodi is shutting down, requests not sent yet are dropped and their
+calls get no response.
+"""
+
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import xbmc
+
+from resources.lib import streaming
+
+# Calls sent in one batch request, bounds the size of a single response
+BATCH_SIZE = 200
+# Requests of one collect() sent at the same time
+WORKERS = 4
+# Fewer calls per request are not worth a request of their own
+MIN_CHUNK = 10
+
+
+class Client:
+    """Sends Kodi JSON-RPC calls, alone or queued into batch requests
+
+    Args:
+        batch_size (int): maximum number of calls in one batch request
+        workers (int): maximum number of requests of a collect() sent at
+            the same time, 1 sends them one after the other
+        abort (Callable[[], bool]): tells whether Kodi is shutting down
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, workers: int = WORKERS,
+                 abort: Callable[[], bool] = lambda: False) -> None:
+        self.batch_size = batch_size
+        self.workers = workers
+        self.abort = abort
+        # executeJSONRPC() round-trips and JSON-RPC calls sent so far
+        self.requests = 0
+        self.calls = 0
+        self._queue: List[dict] = []
+        self._next_id = 0
+
+    @staticmethod
+    def _send(request) -> object:
+        return json.loads(xbmc.executeJSONRPC(json.dumps(request)))
+
+    def _execute(self, request) -> object:
+        self.requests += 1
+        return self._send(request)
+
+    def call(self, method: str, params: Optional[dict] = None) -> dict:
+        """Sends a single call right away
+
+        Args:
+            method (str): JSON-RPC method
+            params (Optional[dict]): method parameters
+
+        Returns:
+            dict: decoded JSON-RPC response
+        """
+        request = {'jsonrpc': '2.0', 'method': method, 'id': 1}
+        if params is not None:
+            request['params'] = params
+        self.calls += 1
+        return self._execute(request)
+
+    def items(self, method: str, params: dict, key: str) -> Optional[Iterator[dict]]:
+        """Sends a single call right away, its result list is decoded lazily
+
+        Args:
+            method (str): JSON-RPC method
+            params (dict): method parameters
+            key (str): result member holding the list (files, episodes...)
+
+        Returns:
+            Optional[Iterator[dict]]: the items of the list, decoded as they
+            are consumed, empty if the result has no list.  None if Kodi
+            returned an error
+        """
+        request = {'jsonrpc': '2.0', 'method': method, 'id': 1, 'params': params}
+        self.calls += 1
+        self.requests += 1
+        response = xbmc.executeJSONRPC(json.dumps(request))
+        if not streaming.has(response, ('result',)):
+            return None
+        return streaming.items(response, ('result', key))
+
+    def submit(self, method: str, params: Optional[dict] = None) -> int:
+        """Queues a call until the next collect()
+
+        Args:
+            method (str): JSON-RPC method
+            params (Optional[dict]): method parameters
+
+        Returns:
+            int: id of the call, key of its response in collect()
+        """
+        self._next_id += 1
+        request = {'jsonrpc': '2.0', 'method': method, 'id': self._next_id}
+        if params is not None:
+            request['params'] = params
+        self._queue.append(request)
+        return self._next_id
+
+    def _chunks(self, queue: List[dict]) -> List[List[dict]]:
+        size = self.batch_size
+        if self.workers > 1:
+            # spread the calls over the workers, MIN_CHUNK calls at least
+            size = min(size, max(MIN_CHUNK, math.ceil(len(queue) / self.workers)))
+        return [queue[start:start + size] for start in range(0, len(queue), size)]
+
+    def _sendChunk(self, chunk: List[dict]) -> object:
+        if self.abort():
+            return None
+        if len(chunk) == 1:
+            return [self._send(chunk[0])]
+        return self._send(chunk)
+
+    def collect(self) -> Dict[int, dict]:
+        """Sends the queued calls and returns their responses
+
+        Returns:
+            Dict[int, dict]: decoded responses by call id.  A call left
+            without response by Kodi, or not sent because Kodi is shutting
+            down, gets an empty dict
+        """
+        queue, self._queue = self._queue, []
+        chunks = self._chunks(queue)
+        if len(chunks) > 1 and self.workers > 1:
+            with ThreadPoolExecutor(min(self.workers, len(chunks))) as pool:
+                answers = list(pool.map(self._sendChunk, chunks))
+        else:
+            answers = [self._sendChunk(chunk) for chunk in chunks]
+        responses: Dict[int, dict] = {}
+        for chunk, answer in zip(chunks, answers):
+            if answer is None:
+                continue
+            self.calls += len(chunk)
+            self.requests += 1
+            if isinstance(answer, list):
+                for response in answer:
+                    if isinstance(response, dict) and 'id' in response:
+                        responses[response['id']] = response
+        for request in queue:
+            responses.setdefault(request['id'], {})
+        return responses
+
+    def batch(self, calls: Iterable[Tuple[str, Optional[dict]]]) -> List[dict]:
+        """Sends several calls and returns their responses in the same order
+
+        Args:
+            calls (Iterable[Tuple[str, Optional[dict]]]): JSON-RPC methods and
+                their parameters
+
+        Returns:
+            List[dict]: decoded responses, an empty dict for a call left
+            without response
+        """
+        ids = [self.submit(method, params) for method, params in calls]
+        responses = self.collect()
+        return [responses[call_id] for call_id in ids]
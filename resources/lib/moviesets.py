@@ -0,0 +1,122 @@
+# This program is Free Software see LICENSE file for details
+""" Movies of every movie set, read with a single library query
+
+With "group movies in sets" on, browsing videodb://movies/titles/ returns
+one directory per set, and every set had to be browsed in turn for its
+movies.  MovieSetIndex holds the members of all the sets, read from one
+VideoLibrary.GetMovies filtered on the movies belonging to a set, with the
+setid property, so expanding a set is a dictionary lookup.  The service
+keeps the index between runs and applies the library notifications to it.
+
+Library widgets are read with filtered library queries: under xbmc.json 12
+the node is only browsed when a widget names videodb://movies/titles/ as
+its playlist.
+
+Only the set directories of the library nodes are served from the index:
+a set listed by a smart playlist carries the playlist filter in its path
+and holds only the movies matching the rules.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+from urllib.parse import parse_qsl, urlsplit
+
+# Path of the movie set directories returned by Files.GetDirectory
+SET_PATH = 'videodb://movies/sets/'
+# VideoLibrary.GetMovies filter of the movies belonging to a set, Kodi
+# leaves out the movies without a set name
+SET_MEMBERS = {'field': 'set', 'operator': 'isnot', 'value': ''}
+
+
+def set_id(path: str) -> Optional[int]:
+    """Gets the id of the set a directory lists every movie of
+
+    Args:
+        path (str): Files.GetDirectory path of a set
+
+    Returns:
+        Optional[int]: set id, None if the path is not a set directory or
+        also filters its movies
+    """
+    if not path.startswith(SET_PATH):
+        return None
+    url = urlsplit(path)
+    options = dict(parse_qsl(url.query))
+    setid = url.path.strip('/').split('/')[-1]
+    if not setid.isdigit() or set(options) - {'setid'}:
+        return None
+    return int(setid)
+
+
+class MovieSetIndex:
+    """Members of every movie set, in library order
+
+    Args:
+        properties (Sequence[str]): movie properties read
+        movies (Iterable[dict]): VideoLibrary.GetMovies items, with setid
+    """
+
+    def __init__(self, properties: Sequence[str], movies: Iterable[dict]) -> None:
+        self.properties = frozenset(properties)
+        self.sets: Dict[int, List[dict]] = {}
+        # set members by movie id
+        self.members: Dict[int, dict] = {}
+        for movie in movies:
+            if movie.get('setid'):
+                movie['id'] = movie['movieid']
+                self.sets.setdefault(movie['setid'], []).append(movie)
+                self.members[movie['id']] = movie
+
+    def covers(self, properties: Iterable[str]) -> bool:
+        """Tells whether the members were read with the given properties
+
+        Args:
+            properties (Iterable[str]): movie properties needed
+
+        Returns:
+            bool: True if every property was read
+        """
+        return self.properties.issuperset(properties)
+
+    def movies(self, setid: int) -> Optional[List[dict]]:
+        """Gets the movies of a set
+
+        Args:
+            setid (int): set id
+
+        Returns:
+            Optional[List[dict]]: movies of the set, None if the set has no
+            movie in the index
+        """
+        return self.sets.get(setid)
+
+    def update(self, movieid: int, fields: dict) -> bool:
+        """Applies new property values to a movie
+
+        Args:
+            movieid (int): library id of the movie
+            fields (dict): new values (playcount, resume, setid...)
+
+        Returns:
+            bool: False if the movie joined or left a set, the index must be
+            read again
+        """
+        movie = self.members.get(movieid)
+        setid = fields.get('setid', movie['setid'] if movie else 0)
+        if movie is None or setid != movie['setid']:
+            return not setid and movie is None
+        movie.update(fields)
+        return True
+
+    def remove(self, movieid: int) -> None:
+        """Removes a deleted movie
+
+        Args:
+            movieid (int): library id of the movie
+        """
+        movie = self.members.pop(movieid, None)
+        if movie is None:
+            return
+        members = self.sets[movie['setid']]
+        members.remove(movie)
+        if not members:
+            del self.sets[movie['setid']]
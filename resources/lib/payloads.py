@@ -0,0 +1,76 @@
+# This program is Free Software see LICENSE file for details
+""" Window properties of library items rendered once and reused
+
+Setting the properties of a widget item formats thirty odd values: paths,
+percent played, runtime, stream details, joined genre and studio lists.  A
+render function turns an item into a payload, an immutable tuple of
+(property suffix, value) pairs, and writing a widget item only prefixes the
+suffixes with "<property>.<position>.".
+
+Payloads are kept by item type and library id together with a stamp of the
+item fields that change without the item being edited (playcount, resume
+point...).  An item shown by several widgets, or again on the next refresh
+of a widget run by the service, is rendered once.  Edited items are dropped
+on the library notification (see randomandlastitems._applyLibraryChange).
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Tuple
+
+# Rendered properties of an item: (suffix, value) pairs
+Payload = Tuple[Tuple[str, str], ...]
+
+# Payloads kept, a few widgets worth of items
+CACHE_SIZE = 400
+
+
+class PayloadCache:
+    """Payloads of the last rendered items, least recently used dropped first
+
+    Args:
+        size (int): maximum number of payloads kept
+    """
+
+    def __init__(self, size: int = CACHE_SIZE) -> None:
+        self.size = size
+        # payloads reused and rendered so far
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[tuple, Tuple[Any, Payload]]' = OrderedDict()
+
+    def get(self, key: tuple, stamp: Any, render: Callable[[], Payload]) -> Payload:
+        """Gets the payload of an item, rendering it when needed
+
+        Args:
+            key (tuple): item type and library id
+            stamp (Any): item fields the payload depends on besides its
+                metadata, compared with ==
+            render (Callable[[], Payload]): renders the item
+
+        Returns:
+            Payload: rendered properties
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        payload = render()
+        self._entries[key] = (stamp, payload)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+        return payload
+
+    def discard(self, key: tuple) -> None:
+        """Drops the payload of an item
+
+        Args:
+            key (tuple): item type and library id
+        """
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drops every payload"""
+        self._entries.clear()
@@ -0,0 +1,225 @@
+# This program is Free Software see LICENSE file for details
+""" Builds library queries that let Kodi do the selection work
+
+VideoLibrary.GetMovies, GetEpisodes and GetMusicVideos accept sort, limits
+and filter parameters.  When the widget reads the whole library (no
+playlist) the Random / Last order, the unwatched / resume filters and the
+widget LIMIT are sent with the query, so Kodi only returns the items the
+widget shows.
+
+Smart playlists are browsed with Files.GetDirectory, which has no filter:
+Kodi returns every item of the playlist.  The rules of a movie or music
+video playlist are the rules of the library filters (same fields, same
+operators), playlist_params() sends them with the library getter instead.
+Playlists using a field or an operator not listed below, or a limit, stay
+on the Files.GetDirectory path.
+"""
+
+from typing import List, Optional
+
+from resources.lib.playlist import Rule, SmartPlaylist
+
+# Smart playlist fields accepted by the filter of the library getters, by
+# playlist type
+FILTER_FIELDS = {
+    'movies': frozenset(('title', 'originaltitle', 'plot', 'plotoutline',
+                         'tagline', 'genre', 'country', 'year', 'actor', 'director',
+                         'writers', 'studio', 'set', 'tag', 'mpaarating', 'rating',
+                         'userrating', 'votes', 'top250', 'time', 'playcount',
+                         'lastplayed', 'inprogress', 'dateadded', 'path', 'filename',
+                         'trailer', 'videoresolution', 'videocodec', 'videoaspect',
+                         'audiochannels', 'audiocodec', 'audiolanguage',
+                         'subtitlelanguage')),
+    'musicvideos': frozenset(('title', 'artist', 'album', 'genre', 'year', 'director',
+                              'studio', 'plot', 'tag', 'time', 'playcount',
+                              'lastplayed', 'inprogress', 'dateadded', 'path',
+                              'filename', 'videoresolution', 'videocodec',
+                              'videoaspect', 'audiochannels', 'audiocodec',
+                              'audiolanguage', 'subtitlelanguage')),
+}
+# Library filter field of the smart playlist fields named otherwise
+# (List.Filter.Fields.*)
+FILTER_NAMES = {'trailer': 'hastrailer'}
+# Operators of the smart playlist rules, shared with the library filters
+FILTER_OPERATORS = frozenset(('is', 'isnot', 'contains', 'doesnotcontain',
+                              'startswith', 'endswith', 'greaterthan', 'lessthan',
+                              'after', 'before', 'inthelast', 'notinthelast',
+                              'true', 'false', 'between'))
+# Library sort methods by smart playlist order, orders not listed are not sent
+SORT_METHODS = {'title': 'title', 'sorttitle': 'sorttitle',
+                'originaltitle': 'originaltitle', 'year': 'year',
+                'rating': 'rating', 'userrating': 'userrating', 'votes': 'votes',
+                'top250': 'top250', 'mpaarating': 'mpaa', 'time': 'time',
+                'genre': 'genre', 'country': 'country', 'studio': 'studio',
+                'artist': 'artist', 'album': 'album', 'playcount': 'playcount',
+                'lastplayed': 'lastplayed', 'dateadded': 'dateadded',
+                'random': 'random'}
+
+
+def sort_clause(method: str, sortby: str = '', reverse: bool = False) -> Optional[dict]:
+    """Gets the JSON-RPC sort for a widget method
+
+    Args:
+        method (str): Random, Last or Playlist
+        sortby (str): playlist order field, used by the Playlist method
+        reverse (bool): playlist order is descending
+
+    Returns:
+        Optional[dict]: sort parameter, None if the items are not ordered
+    """
+    if method == 'Last':
+        return {'method': 'dateadded', 'order': 'descending'}
+    if method == 'Random':
+        return {'method': 'random'}
+    if method == 'Playlist' and sortby:
+        return {'method': sortby,
+                'order': 'descending' if reverse else 'ascending'}
+    return None
+
+
+def watched_filter(unwatched: bool, resume: bool) -> Optional[dict]:
+    """Gets the JSON-RPC filter for the unwatched / resume options
+
+    Both options set means either condition qualifies, as in the Python path.
+
+    Args:
+        unwatched (bool): only items never played
+        resume (bool): only partially watched items
+
+    Returns:
+        Optional[dict]: filter parameter, None if every item qualifies
+    """
+    rules = []
+    if unwatched:
+        rules.append({'field': 'playcount', 'operator': 'is', 'value': '0'})
+    if resume:
+        rules.append({'field': 'inprogress', 'operator': 'true', 'value': ''})
+    if not rules:
+        return None
+    if len(rules) == 1:
+        return rules[0]
+    return {'or': rules}
+
+
+def combine(*rules: Optional[dict]) -> Optional[dict]:
+    """Gets the filter matching every given filter
+
+    Args:
+        rules (Optional[dict]): filters, None ones are left out
+
+    Returns:
+        Optional[dict]: filter parameter, None if there is no filter
+    """
+    rules = [rule for rule in rules if rule]
+    if not rules:
+        return None
+    if len(rules) == 1:
+        return rules[0]
+    return {'and': rules}
+
+
+def _filterRule(rule: Rule, fields: frozenset) -> dict:
+    if rule.field not in fields:
+        raise ValueError(f'no filter on {rule.field}')
+    if rule.operator not in FILTER_OPERATORS:
+        raise ValueError(f'no filter operator {rule.operator}')
+    if rule.operator in ('true', 'false'):
+        value = ''
+    elif not rule.values:
+        raise ValueError(f'no value for {rule.field} {rule.operator}')
+    elif len(rule.values) == 1:
+        value = rule.values[0]
+    else:
+        value = list(rule.values)
+    return {'field': FILTER_NAMES.get(rule.field, rule.field),
+            'operator': rule.operator, 'value': value}
+
+
+def playlist_filter(xsp: SmartPlaylist) -> Optional[dict]:
+    """Translates the rules of a smart playlist into a library filter
+
+    Args:
+        xsp (SmartPlaylist): movie or music video playlist
+
+    Returns:
+        Optional[dict]: filter parameter, None if the playlist has no rules
+
+    Raises:
+        ValueError: the playlist cannot be read with a library query
+    """
+    if xsp.type not in FILTER_FIELDS:
+        raise ValueError(f'no library filter for {xsp.type} playlists')
+    rules = [_filterRule(rule, FILTER_FIELDS[xsp.type]) for rule in xsp.rules]
+    if len(rules) > 1:
+        return {'or' if xsp.match == 'one' else 'and': rules}
+    return rules[0] if rules else None
+
+
+def playlist_params(xsp: SmartPlaylist, properties: List[str], method: str,
+                    limit: int, unwatched: bool = False,
+                    resume: bool = False) -> dict:
+    """Gets the params of a VideoLibrary.Get* query reading a smart playlist
+
+    The playlist rules, the widget order and the unwatched / resume filters
+    are all sent to Kodi, as for library_params().
+
+    Args:
+        xsp (SmartPlaylist): movie or music video playlist
+        properties (List[str]): item properties to return
+        method (str): Random, Last or Playlist
+        limit (int): number of items shown by the widget
+        unwatched (bool): only items never played
+        resume (bool): only partially watched items
+
+    Returns:
+        dict: params for the query
+
+    Raises:
+        ValueError: the playlist cannot be read with a library query
+    """
+    rules = playlist_filter(xsp)
+    if xsp.limit:
+        # the widget picks among the first items of the playlist
+        raise ValueError('playlist limit')
+    sortby = ''
+    if method not in ('Last', 'Playlist'):
+        # widgets on an unordered playlist pick their items at random
+        method = 'Random'
+    elif method == 'Playlist' and xsp.order:
+        if xsp.order not in SORT_METHODS:
+            raise ValueError(f'no sort method for {xsp.order}')
+        sortby = SORT_METHODS[xsp.order]
+    params = library_params(properties, method, limit, unwatched, resume,
+                            sortby, xsp.direction == 'descending')
+    rules = combine(rules, params.get('filter'))
+    if rules:
+        params['filter'] = rules
+    return params
+
+
+def library_params(properties: List[str], method: str, limit: int,
+                   unwatched: bool = False, resume: bool = False,
+                   sortby: str = '', reverse: bool = False) -> dict:
+    """Gets the params of a VideoLibrary.Get* query for a widget
+
+    Args:
+        properties (List[str]): item properties to return
+        method (str): Random, Last or Playlist
+        limit (int): number of items shown by the widget
+        unwatched (bool): only items never played
+        resume (bool): only partially watched items
+        sortby (str): playlist order field
+        reverse (bool): playlist order is descending
+
+    Returns:
+        dict: params for the query
+    """
+    params = {'properties': properties,
+              'limits': {'start': 0, 'end': limit}}
+    sort = sort_clause(method, sortby, reverse)
+    if sort:
+        params['sort'] = sort
+    rules = watched_filter(unwatched, resume)
+    if rules:
+        params['filter'] = rules
+    return params
@@ -0,0 +1,175 @@
+# This program is Free Software see LICENSE file for details
+""" Smart playlist (.xsp) metadata read once per edit of the file
+
+A widget on a smart playlist needs its type, name and order before querying
+the library, and the service needs its rules to tell whether playing an item
+may change the playlist.  read() gets them with a streaming ElementTree
+reader that keeps no document tree: each top level element is dropped once
+read.
+
+Several widgets usually point at the same few playlists, and every
+RunScript() starts a new interpreter.  PlaylistCache keeps the parsed
+playlists by path together with the modification time and size of the file,
+in memory and in a JSON file of the addon profile.  A playlist is parsed
+again only after it was edited.
+
+The rules are kept as read, so they can be turned into library filters.
+"""
+
+import json
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from xml.etree import ElementTree
+
+# Bump when the layout of SmartPlaylist changes
+CACHE_VERSION = 1
+
+
+class Rule(NamedTuple):
+    """Smart playlist rule: <rule field="genre" operator="is"><value>...</value></rule>"""
+    field: str
+    operator: str
+    values: Tuple[str, ...]
+
+
+class SmartPlaylist(NamedTuple):
+    """Smart playlist metadata"""
+    # smartplaylist type attribute: movies, episodes, tvshows, songs...
+    type: str
+    name: str
+    # 'all' when every rule must match, 'one' when any rule may
+    match: str
+    rules: Tuple[Rule, ...]
+    # sort field, '' if the playlist is not ordered
+    order: str
+    # 'ascending' or 'descending'
+    direction: str
+    # maximum number of items, 0 for no limit
+    limit: int
+
+
+def _text(element: ElementTree.Element) -> str:
+    return (element.text or '').strip()
+
+
+def _rule(element: ElementTree.Element) -> Rule:
+    values = tuple(_text(value) for value in element.iter('value'))
+    if not values and _text(element):
+        # before Kodi 14 the value is the text of the rule
+        values = (_text(element),)
+    return Rule(element.get('field', ''), element.get('operator', ''), values)
+
+
+def read(path: str) -> SmartPlaylist:
+    """Reads a smart playlist file
+
+    Args:
+        path (str): local path of the .xsp file
+
+    Returns:
+        SmartPlaylist: playlist metadata
+
+    Raises:
+        OSError: the file cannot be read
+        ValueError: the file is not a smart playlist
+    """
+    fields = {'type': '', 'name': '', 'match': 'all', 'order': '',
+              'direction': 'ascending', 'limit': 0}
+    rules: List[Rule] = []
+    depth = 0
+    try:
+        for event, element in ElementTree.iterparse(path, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == 1:
+                    if element.tag != 'smartplaylist':
+                        raise ValueError(f'{path} is not a smart playlist')
+                    fields['type'] = element.get('type', '')
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+            if element.tag == 'rule':
+                rules.append(_rule(element))
+            elif element.tag in ('name', 'match', 'order'):
+                fields[element.tag] = _text(element)
+                if element.tag == 'order':
+                    fields['direction'] = element.get('direction', 'ascending')
+            elif element.tag == 'limit':
+                fields['limit'] = int(_text(element) or 0)
+            # top level elements are not needed once read
+            element.clear()
+    except ElementTree.ParseError as error:
+        raise ValueError(f'{path}: {error}') from error
+    return SmartPlaylist(rules=tuple(rules), **fields)
+
+
+class PlaylistCache:
+    """Parsed smart playlists by path, see module docstring
+
+    Args:
+        path (str): JSON file keeping the playlists between runs
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # playlists parsed and read from the cache so far
+        self.hits = 0
+        self.misses = 0
+        self._entries: Optional[Dict[str, Tuple[float, int, SmartPlaylist]]] = None
+
+    def _load(self) -> Dict[str, Tuple[float, int, SmartPlaylist]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as cache:
+                data = json.load(cache)
+            if data.get('version') != CACHE_VERSION:
+                return {}
+            return {path: (mtime, size, SmartPlaylist(
+                        *playlist[:3], tuple(Rule(field, operator, tuple(values))
+                                             for field, operator, values in playlist[3]),
+                        *playlist[4:]))
+                    for path, mtime, size, playlist in data['entries']}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {}
+
+    def _save(self) -> None:
+        # playlists deleted since they were read are forgotten
+        data = {'version': CACHE_VERSION,
+                'entries': [[path, mtime, size, playlist]
+                            for path, (mtime, size, playlist) in self._entries.items()
+                            if os.path.exists(path)]}
+        # RunScript() instances may write at the same time
+        temp = f'{self.path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp, 'w', encoding='utf-8') as cache:
+                json.dump(data, cache, separators=(',', ':'))
+            os.replace(temp, self.path)
+        except OSError:
+            pass
+
+    def get(self, path: str) -> SmartPlaylist:
+        """Gets a smart playlist, parsing it if it is new or was edited
+
+        Args:
+            path (str): local path of the .xsp file
+
+        Returns:
+            SmartPlaylist: playlist metadata
+
+        Raises:
+            OSError: the file cannot be read
+            ValueError: the file is not a smart playlist
+        """
+        if self._entries is None:
+            self._entries = self._load()
+        stat = os.stat(path)
+        entry = self._entries.get(path)
+        if entry is not None and entry[:2] == (stat.st_mtime, stat.st_size):
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        playlist = read(path)
+        self._entries[path] = (stat.st_mtime, stat.st_size, playlist)
+        self._save()
+        return playlist
@@ -0,0 +1,97 @@
+# This program is Free Software see LICENSE file for details
+""" Window property writer skipping unchanged values
+
+Every setProperty() / clearProperty() makes the skin re-evaluate the labels
+using the property.  The writer remembers the last value of each property
+(the keys start with the widget PROPERTY prefix) and only calls Kodi for
+actual changes.  A property the writer did not write yet is compared with
+getProperty().
+
+The <prefix>.Loaded flag is only cleared before the first change of a run,
+so refreshing a widget with unchanged items writes nothing.
+"""
+
+from typing import Dict
+
+
+class PropertyWriter:
+    """Writes the window properties of one widget at a time
+
+    Args:
+        window: Kodi window holding the properties (xbmcgui.Window)
+    """
+
+    def __init__(self, window) -> None:
+        self._window = window
+        # last known values, keys are lower case like Kodi's
+        self._current: Dict[str, str] = {}
+        self._loaded = ''
+        self._unloaded = False
+        self.written = 0
+        self.skipped = 0
+
+    def begin(self, prefix: str) -> None:
+        """Starts writing the properties of a widget
+
+        Args:
+            prefix (str): widget PROPERTY prefix
+        """
+        self._loaded = f'{prefix}.Loaded'
+        self._unloaded = False
+        self.written = 0
+        self.skipped = 0
+
+    def _last(self, key: str) -> str:
+        lower = key.lower()
+        if lower not in self._current:
+            self._current[lower] = self._window.getProperty(key)
+        return self._current[lower]
+
+    def _unload(self) -> None:
+        # the skin must not read a half written widget as loaded
+        if not self._unloaded:
+            self._unloaded = True
+            if self._last(self._loaded):
+                self._window.clearProperty(self._loaded)
+                self._current[self._loaded.lower()] = ''
+                self.written += 1
+
+    def set(self, key: str, value: str) -> None:
+        """Sets a property if its value changed
+
+        Args:
+            key (str): property key
+            value (str): value
+        """
+        if self._last(key) == value:
+            self.skipped += 1
+            return
+        self._unload()
+        self._window.setProperty(key, value)
+        self._current[key.lower()] = value
+        self.written += 1
+
+    def clear(self, key: str) -> None:
+        """Clears a property if it has a value
+
+        Args:
+            key (str): property key
+        """
+        if not self._last(key):
+            self.skipped += 1
+            return
+        self._unload()
+        self._window.clearProperty(key)
+        self._current[key.lower()] = ''
+        self.written += 1
+
+    def finish(self, loaded: bool) -> None:
+        """Ends the widget, setting or clearing its Loaded flag
+
+        Args:
+            loaded (bool): the widget properties are available
+        """
+        if loaded:
+            self.set(self._loaded, 'true')
+        else:
+            self._unload()
@@ -0,0 +1,186 @@
+# This program is Free Software see LICENSE file for details
+""" Compact records of the library items picked from by the widgets
+
+A playlist item decoded from JSON is a dict of a dozen entries with a nested
+resume dict, and the service keeps one per playlist item.  A record keeps
+the fields used to count, filter and order the items in __slots__: id,
+playcount, resume point, date added and the value of the playlist order.
+Everything else read with Get*Details for the items shown (title, plot,
+art, streamdetails...) is attached to a copy of the record as `details`.
+
+Records read like the JSON item they come from: record['title'],
+record.get('art', {}) and 'userrating' in record look into the details
+first, so the property setters do not care which one they get.  The hot
+paths use the attributes.
+
+encode() and decode() turn records into JSON objects and back for the
+snapshot (see snapshot.py).
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+
+class Record:
+    """Library item, see module docstring
+
+    Args:
+        item (dict): JSON item (Files.GetDirectory, Get*Details or a
+            library query)
+        order (str): item property ordering the playlist, kept in `order`
+        details (Optional[dict]): full properties of the item
+    """
+
+    __slots__ = ('id', 'playcount', 'position', 'total', 'dateadded', 'order',
+                 'details')
+    # fields kept in slots under the JSON item key, besides the resume point
+    FIELDS: Tuple[str, ...] = ('id', 'playcount', 'dateadded')
+    # JSON key of the library id (movieid...), used when id is missing
+    IDKEY = ''
+
+    def __init__(self, item: dict, order: str = '',
+                 details: Optional[dict] = None) -> None:
+        self.id = item['id'] if 'id' in item else item.get(self.IDKEY)
+        self.playcount = item.get('playcount', 0)
+        resume = item.get('resume') or {}
+        self.position = resume.get('position', 0)
+        self.total = resume.get('total', 0)
+        self.dateadded = item.get('dateadded', '')
+        self.order = item.get(order) if order else None
+        self.details = details
+
+    def with_details(self, details: dict) -> 'Record':
+        """Gets a copy of the record with its full properties
+
+        The record itself is left alone, it may be kept by the service.
+
+        Args:
+            details (dict): Get*Details properties
+
+        Returns:
+            Record: same type of record, reading the details first
+        """
+        record = object.__new__(type(self))
+        for field in self._slots():
+            setattr(record, field, getattr(self, field))
+        record.details = details
+        return record
+
+    @classmethod
+    def _slots(cls) -> Tuple[str, ...]:
+        return tuple(field for klass in cls.__mro__
+                     for field in getattr(klass, '__slots__', ()))
+
+    def __getitem__(self, key: str) -> Any:
+        if self.details is not None and key in self.details:
+            return self.details[key]
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if key == 'resume':
+            return {'position': self.position, 'total': self.total}
+        if key == 'watched':
+            return 'True' if self.playcount else 'False'
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        slot = key in self.FIELDS or key == 'resume'
+        if key == 'resume':
+            self.position = value.get('position', 0)
+            self.total = value.get('total', 0)
+        elif slot:
+            setattr(self, key, value)
+        elif self.details is None:
+            self.details = {}
+        # the details are read first, they must not keep the old value
+        if self.details is not None and (not slot or key in self.details):
+            self.details[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return ((self.details is not None and key in self.details)
+                or key in self.FIELDS or key in ('resume', 'watched'))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Gets a field like dict.get()"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class Movie(Record):
+    """Movie record"""
+    __slots__ = ()
+    IDKEY = 'movieid'
+
+
+class MusicVideo(Record):
+    """Music video record"""
+    __slots__ = ()
+    IDKEY = 'musicvideoid'
+
+
+class Episode(Record):
+    """Episode record, with the tv show and the studio / MPAA rating of the show"""
+    __slots__ = ('tvshowid', 'mpaa', 'studio')
+    FIELDS = Record.FIELDS + __slots__
+    IDKEY = 'episodeid'
+
+    def __init__(self, item: dict, order: str = '',
+                 details: Optional[dict] = None) -> None:
+        super().__init__(item, order, details)
+        self.tvshowid = item.get('tvshowid')
+        self.mpaa = item.get('mpaa', '')
+        self.studio = item.get('studio', [])
+
+
+class Album(Record):
+    """Album record"""
+    __slots__ = ()
+    IDKEY = 'albumid'
+
+
+class Song(Record):
+    """Song record"""
+    __slots__ = ()
+    IDKEY = 'songid'
+
+
+# record classes by name, for decode()
+_TYPES: Dict[str, type] = {cls.__name__: cls
+                           for cls in (Movie, MusicVideo, Episode, Album, Song)}
+
+
+def encode(record: Any) -> dict:
+    """json.dump() default hook writing records as JSON objects
+
+    Args:
+        record (Any): object json cannot write
+
+    Returns:
+        dict: slots of the record, tagged with its type
+
+    Raises:
+        TypeError: not a record
+    """
+    if not isinstance(record, Record):
+        raise TypeError(f'{type(record).__name__} is not JSON serializable')
+    data = {field: getattr(record, field) for field in record._slots()}
+    data['record'] = type(record).__name__
+    return data
+
+
+def decode(data: dict) -> Any:
+    """json.load() object_hook turning objects written by encode() into records
+
+    Args:
+        data (dict): decoded JSON object
+
+    Returns:
+        Any: the record, or data if it is not a record
+    """
+    cls = _TYPES.get(data.get('record', ''))
+    if cls is None:
+        return data
+    record = object.__new__(cls)
+    for field in cls._slots():
+        setattr(record, field, data.get(field))
+    return record
@@ -0,0 +1,68 @@
+# This program is Free Software see LICENSE file for details
+""" Picks the items shown by a widget without sorting every candidate
+
+A widget shows LIMIT items out of a playlist that may hold tens of thousands
+of them.  top() keeps the first LIMIT items of an order in a heap and
+sample() draws LIMIT random items with reservoir sampling.  Both consume the
+candidates as they come, an iterator is never copied into a list, and hold
+O(LIMIT) items instead of sorting or shuffling all of them.
+"""
+
+import heapq
+import random
+from typing import Any, Callable, Iterable, List, TypeVar
+
+_T = TypeVar('_T')
+
+
+def top(items: Iterable[_T], limit: int, key: Callable[[_T], Any],
+        reverse: bool = False) -> List[_T]:
+    """Gets the first items of an order
+
+    Same result as sorted(items, key=key, reverse=reverse)[:limit], items
+    with equal keys keep their order.
+
+    Args:
+        items (Iterable[_T]): candidate items
+        limit (int): number of items to keep
+        key (Callable[[_T], Any]): sort key of an item
+        reverse (bool): descending order
+
+    Returns:
+        List[_T]: up to limit items, in order
+    """
+    if limit <= 0:
+        return []
+    if reverse:
+        return heapq.nlargest(limit, items, key=key)
+    return heapq.nsmallest(limit, items, key=key)
+
+
+def sample(items: Iterable[_T], limit: int, rng: random.Random = random) -> List[_T]:
+    """Draws random items, in random order
+
+    Lists are sampled with random.sample(), other iterables with reservoir
+    sampling in a single pass.
+
+    Args:
+        items (Iterable[_T]): candidate items
+        limit (int): number of items to draw
+        rng (random.Random): random generator
+
+    Returns:
+        List[_T]: up to limit items, every candidate with the same chance
+    """
+    if limit <= 0:
+        return []
+    if isinstance(items, list):
+        return rng.sample(items, min(limit, len(items)))
+    reservoir: List[_T] = []
+    for seen, item in enumerate(items):
+        if seen < limit:
+            reservoir.append(item)
+        else:
+            slot = rng.randrange(seen + 1)
+            if slot < limit:
+                reservoir[slot] = item
+    rng.shuffle(reservoir)
+    return reservoir
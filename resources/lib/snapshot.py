@@ -0,0 +1,83 @@
+# This program is Free Software see LICENSE file for details
+""" Library data saved to the addon profile between Kodi sessions
+
+The service keeps the library data of the widgets in memory.  It is written
+to a compact JSON file in the addon profile so the first widgets after a Kodi
+start or a profile switch are filled without querying the whole library
+again.
+
+Every entry carries the modification time of its smart playlist, an entry
+whose playlist was edited since is ignored.  The snapshot also records a
+fingerprint of the libraries (item and unwatched counts).  A snapshot taken
+before the library changed without the service seeing it is dropped.  Item
+records are written as tagged JSON objects, see records.py.
+
+The fingerprint does not change when an item is edited, the entries must
+not hold item details (title, plot, art...): they are read again for the
+items shown.
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from resources.lib import records
+
+# Bump when the layout of the cached library data changes
+SNAPSHOT_VERSION = 4
+
+# Cached library data by query key: (playlist mtime, data)
+Entries = Dict[tuple, Tuple[int, Any]]
+
+
+def load(path: str, fingerprint: list) -> Optional[Entries]:
+    """Reads a snapshot
+
+    Args:
+        path (str): snapshot file
+        fingerprint (list): current library fingerprint
+
+    Returns:
+        Optional[Entries]: cached entries, None if there is no usable snapshot
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as snapshot:
+            data = json.load(snapshot, object_hook=records.decode)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(data, dict) or data.get('version') != SNAPSHOT_VERSION
+            or data.get('fingerprint') != fingerprint):
+        return None
+    return {tuple(key): (mtime, source)
+            for key, mtime, source in data.get('entries', [])}
+
+
+def save(path: str, entries: Entries, fingerprint: list) -> None:
+    """Writes a snapshot, replacing the previous one in a single step
+
+    Args:
+        path (str): snapshot file
+        entries (Entries): cached entries
+        fingerprint (list): library fingerprint the entries were read with
+    """
+    data = {'version': SNAPSHOT_VERSION,
+            'fingerprint': fingerprint,
+            'entries': [[list(key), mtime, source]
+                        for key, (mtime, source) in entries.items()]}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp = path + '.tmp'
+    with open(temp, 'w', encoding='utf-8') as snapshot:
+        json.dump(data, snapshot, separators=(',', ':'), default=records.encode)
+    os.replace(temp, path)
+
+
+def remove(path: str) -> None:
+    """Deletes a snapshot
+
+    Args:
+        path (str): snapshot file
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,114 @@
+# This program is Free Software see LICENSE file for details
+""" Builds the queries behind the library summary properties
+
+.Count, .Watched, .Unwatched, .TvShows, .Artists, .Albums and .Songs only
+need item counts.  Kodi returns the number of items matching a query in
+limits.total, so each counter is read from a query asking for a single item
+without properties instead of walking every item of the library.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+from resources.lib import planner
+
+# The smallest page of a query, only limits.total is read
+COUNT_LIMITS = {'start': 0, 'end': 1}
+
+
+def count_params(rules: Optional[dict] = None, **params) -> dict:
+    """Gets the params of a query only used for its limits.total
+
+    Args:
+        rules (Optional[dict]): filter parameter of the query
+        params: other parameters of the query
+
+    Returns:
+        dict: params for the query
+    """
+    params['limits'] = dict(COUNT_LIMITS)
+    if rules:
+        params['filter'] = rules
+    return params
+
+
+def total(response: dict) -> Optional[int]:
+    """Gets the number of items matching a count query
+
+    Args:
+        response (dict): decoded JSON-RPC response
+
+    Returns:
+        Optional[int]: limits.total, None if the query failed
+    """
+    if 'result' not in response:
+        return None
+    return response['result'].get('limits', {}).get('total', 0)
+
+
+def video_queries(method: str, listkey: str,
+                  rules: Optional[dict] = None) -> List[Tuple[str, dict]]:
+    """Gets the count queries of a video library
+
+    Args:
+        method (str): VideoLibrary.Get* method
+        listkey (str): result key of the item list (movies, episodes...)
+        rules (Optional[dict]): filter of the counted items (a smart
+            playlist), the whole library if None
+
+    Returns:
+        List[Tuple[str, dict]]: JSON-RPC methods and params, to be read
+        with video_counts()
+    """
+    queries = [(method, count_params(rules)),
+               (method, count_params(planner.combine(
+                   rules, planner.watched_filter(True, False))))]
+    if listkey == 'episodes':
+        queries.append(('VideoLibrary.GetTVShows', count_params()))
+    return queries
+
+
+def video_counts(listkey: str, responses: Iterable[dict]) -> Optional[dict]:
+    """Gets the video library counters from the video_queries() responses
+
+    Args:
+        listkey (str): result key of the item list (movies, episodes...)
+        responses (Iterable[dict]): responses of the video_queries() calls
+
+    Returns:
+        Optional[dict]: total, watched, unwatched (and tvshows for episodes)
+        counters, None if a query failed
+    """
+    totals = [total(response) for response in responses]
+    if None in totals:
+        return None
+    counts = {'total': totals[0],
+              'watched': totals[0] - totals[1],
+              'unwatched': totals[1]}
+    if listkey == 'episodes':
+        counts['tvshows'] = totals[2]
+    return counts
+
+
+def music_queries() -> List[Tuple[str, dict]]:
+    """Gets the count queries of the music library
+
+    Returns:
+        List[Tuple[str, dict]]: JSON-RPC methods and params for the number of
+        artists, albums and songs
+    """
+    return [('AudioLibrary.GetArtists', count_params(albumartistsonly=False)),
+            ('AudioLibrary.GetAlbums', count_params()),
+            ('AudioLibrary.GetSongs', count_params())]
+
+
+def album_songs_queries(albumids: Iterable[int]) -> List[Tuple[str, dict]]:
+    """Gets the queries counting the songs of albums
+
+    Args:
+        albumids (Iterable[int]): album ids
+
+    Returns:
+        List[Tuple[str, dict]]: one AudioLibrary.GetSongs count per album
+    """
+    return [('AudioLibrary.GetSongs', count_params({'albumid': albumid}))
+            for albumid in albumids]
@@ -0,0 +1,102 @@
+# This program is Free Software see LICENSE file for details
+""" Reads the item list of a JSON-RPC response one item at a time
+
+json.loads() of a Files.GetDirectory response builds every item of the
+playlist before the first one can be looked at, which peaks at several times
+the size of the response on low memory devices.  items() walks the response
+text down to the item list and decodes the items one by one with the C
+scanner of the json module (JSONDecoder.raw_decode), so a caller keeping
+LIMIT of them never holds the whole list.
+
+Kodi returns the members of an object in alphabetical order: the item list
+("episodes", "files"...) comes before "limits" and is reached without
+decoding anything big.
+"""
+
+import json
+import re
+from typing import Iterator, Optional, Sequence
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def _skip(text: str, pos: int) -> int:
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _find(text: str, pos: int, path: Sequence[str]) -> Optional[int]:
+    """Gets the position of the value at path in the object starting at pos
+
+    Args:
+        text (str): JSON text
+        pos (int): position of the object
+        path (Sequence[str]): member names, from the outer object
+
+    Returns:
+        Optional[int]: position of the value, None if it is missing
+    """
+    pos = _skip(text, pos)
+    if text[pos:pos + 1] != '{':
+        return None
+    pos = _skip(text, pos + 1)
+    while text[pos:pos + 1] == '"':
+        key, pos = _DECODER.raw_decode(text, pos)
+        pos = _skip(text, pos)
+        if text[pos:pos + 1] != ':':
+            break
+        pos = _skip(text, pos + 1)
+        if key == path[0]:
+            if len(path) == 1:
+                return pos
+            return _find(text, pos, path[1:])
+        _, pos = _DECODER.raw_decode(text, pos)
+        pos = _skip(text, pos)
+        if text[pos:pos + 1] != ',':
+            break
+        pos = _skip(text, pos + 1)
+    return None
+
+
+def has(text: str, path: Sequence[str]) -> bool:
+    """Tells whether a JSON-RPC response holds a member, without decoding it
+
+    Args:
+        text (str): JSON-RPC response
+        path (Sequence[str]): member names, for example ('result',)
+
+    Returns:
+        bool: True if the member is there
+    """
+    return _find(text, 0, path) is not None
+
+
+def items(text: str, path: Sequence[str]) -> Iterator[dict]:
+    """Yields the items of a list of a JSON-RPC response
+
+    Args:
+        text (str): JSON-RPC response
+        path (Sequence[str]): member names leading to the list, for example
+            ('result', 'files')
+
+    Yields:
+        dict: the items, nothing if the list is missing (error response)
+
+    Raises:
+        ValueError: the response is not valid JSON
+    """
+    pos = _find(text, 0, path)
+    if pos is None or text[pos:pos + 1] != '[':
+        return
+    pos = _skip(text, pos + 1)
+    if text[pos:pos + 1] == ']':
+        return
+    while True:
+        item, pos = _DECODER.raw_decode(text, pos)
+        yield item
+        pos = _skip(text, pos)
+        if text[pos:pos + 1] == ']':
+            return
+        if text[pos:pos + 1] != ',':
+            raise ValueError(f'Expecting , or ] at {pos}')
+        pos = _skip(text, pos + 1)
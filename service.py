@@ -0,0 +1,76 @@
+# This program is Free Software see LICENSE file for details
+""" Background service keeping widget library data warm between RunScript() calls
+
+While the service runs, RunScript(script.randomandlastitems,...) does not
+query the library itself.  It hands its arguments to the service with a
+JSONRPC.NotifyAll call and exits.  The service fills the window properties
+from library data kept in memory, which randomandlastitems.MONITOR updates
+when Kodi reports a library change.  The data is saved to the addon profile
+once the requests are processed, and reloaded when the service starts again.
+"""
+
+import json
+from collections import deque
+from typing import Deque, List
+
+import xbmc
+
+import randomandlastitems
+
+# Seconds without widget request before the library data is saved
+SAVE_DELAY = 5.0
+
+
+class ServiceMonitor(xbmc.Monitor):
+    """Queues the widget requests handed over by RunScript()
+
+    Args:
+        requests (Deque[List[str]]): queue of script arguments to process
+    """
+
+    def __init__(self, requests: Deque[List[str]]) -> None:
+        super().__init__()
+        self._requests = requests
+
+    def onNotification(self, sender: str, method: str, data: str) -> None:
+        """Kodi callback for JSON-RPC notifications
+
+        Args:
+            sender (str): notification sender
+            method (str): notification name
+            data (str): JSON encoded notification data
+        """
+        if sender == randomandlastitems.__addonid__ and method == 'Other.RunScript':
+            self._requests.append(json.loads(data))
+
+
+def run() -> None:
+    """Service loop, processes queued widget requests until Kodi exits
+    """
+    requests: Deque[List[str]] = deque()
+    monitor = ServiceMonitor(requests)
+    randomandlastitems.enable_source_cache(persistent=True)
+    randomandlastitems.WINDOW.setProperty(randomandlastitems.SERVICE_PROPERTY, 'running')
+    randomandlastitems.log('Service started')
+    idle = 0.0
+    while not monitor.abortRequested():
+        while requests and not monitor.abortRequested():
+            argv = requests.popleft()
+            idle = 0.0
+            try:
+                randomandlastitems.run(argv)
+            except Exception as error:
+                randomandlastitems.log(f'Request {argv[1:]} failed: {error}')
+        if monitor.waitForAbort(0.1):
+            break
+        idle += 0.1
+        if idle >= SAVE_DELAY:
+            randomandlastitems.save_source_cache()
+            idle = 0.0
+    randomandlastitems.WINDOW.clearProperty(randomandlastitems.SERVICE_PROPERTY)
+    randomandlastitems.save_source_cache()
+    randomandlastitems.log('Service stopped')
+
+
+if __name__ == '__main__':
+    run()